@@ -20,7 +20,6 @@ import os
 import struct
 import stat
 import asyncio
-import aiofiles
 
 import aiohttp
 import socket
@@ -29,14 +28,12 @@ import re
 
 import logging
 
-from gns3server.utils.asyncio import cancellable_wait_run_in_executor
-
 log = logging.getLogger(__name__)
 
 from uuid import UUID, uuid4
 from gns3server.utils.interfaces import is_interface_up
 from ..config import Config
-from ..utils.asyncio import wait_run_in_executor
+from ..utils.asyncio import wait_run_in_executor, cancellable_wait_run_in_executor
 from ..utils import force_unix_path
 from .project_manager import ProjectManager
 from .port_manager import PortManager
@@ -45,10 +42,19 @@ from .nios.nio_udp import NIOUDP
 from .nios.nio_tap import NIOTAP
 from .nios.nio_ethernet import NIOEthernet
 from ..utils.images import md5sum, remove_checksum, images_directories, default_images_directory, list_images
+from ..utils.images import image_chunk_size, image_hashes, update_image_hashes, record_image_checksums
 from .error import NodeError, ImageMissingError
 
 CHUNK_SIZE = 1024 * 8  # 8KB
 
+# The chunks read from a capture file grow with the traffic
+# and the delay between two reads grows when there is no traffic, up to
+# the fixed delay used by the previous versions so the latency is never worse
+PCAP_CHUNK_SIZE_MIN = 1024 * 16  # 16KB
+PCAP_CHUNK_SIZE_MAX = 1024 * 1024  # 1MB
+PCAP_POLL_DELAY_MIN = 0.005
+PCAP_POLL_DELAY_MAX = 0.1
+
 
 class BaseManager:
 
@@ -65,6 +71,8 @@ class BaseManager:
         self._nodes = {}
         self._port_manager = None
         self._config = Config.instance()
+        self._image_checksum_paths = set()
+        self._image_checksum_tasks = set()
 
     @classmethod
     def node_types(cls):
@@ -147,6 +155,9 @@ class BaseManager:
                     log.error("Could not close node {}".format(e), exc_info=1)
                     continue
 
+        for task in self._image_checksum_tasks:
+            task.cancel()
+
         if hasattr(BaseManager, "_instance"):
             BaseManager._instance = None
         log.debug("Module {} unloaded".format(self.module_name))
@@ -458,17 +469,39 @@ class BaseManager:
         try:
             with open(path, "rb") as f:
                 await response.prepare(request)
-                while nio.capturing:
-                    data = f.read(CHUNK_SIZE)
-                    if not data:
-                        await asyncio.sleep(0.1)
-                        continue
+                async for data in self._follow_pcap_file(f, nio):
                     await response.write(data)
         except FileNotFoundError:
             raise aiohttp.web.HTTPNotFound()
         except PermissionError:
             raise aiohttp.web.HTTPForbidden()
 
+    async def _follow_pcap_file(self, f, nio):
+        """
+        Return the data appended to a capture file while the capture is active.
+
+        The file is read in the executor, the chunks grow when there is a lot
+        of traffic and the delay between two reads grows when there is none.
+
+        :param f: Capture file opened in binary mode
+        :param nio: NIO object
+        """
+
+        chunk_size = PCAP_CHUNK_SIZE_MIN
+        delay = PCAP_POLL_DELAY_MIN
+        while nio.capturing:
+            data = await wait_run_in_executor(f.read, chunk_size)
+            if not data:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, PCAP_POLL_DELAY_MAX)
+                continue
+            delay = PCAP_POLL_DELAY_MIN
+            if len(data) == chunk_size:
+                chunk_size = min(chunk_size * 2, PCAP_CHUNK_SIZE_MAX)
+            elif len(data) < chunk_size // 4:
+                chunk_size = max(chunk_size // 2, PCAP_CHUNK_SIZE_MIN)
+            yield data
+
     def get_abs_image_path(self, path, extra_dir=None):
         """
         Get the absolute path of an image
@@ -582,15 +615,44 @@ class BaseManager:
 
     async def list_images(self):
         """
-        Return the list of available images for this node type
+        Return the list of available images for this node type, the checksums
+        of the new images are computed in the background and are null until then.
 
         :returns: Array of hash
         """
 
+        unknown_images = []
         try:
-            return list_images(self._NODE_TYPE)
+            images = await wait_run_in_executor(list_images, self._NODE_TYPE, unknown_images=unknown_images)
         except OSError as e:
             raise aiohttp.web.HTTPConflict(text="Can not list images {}".format(e))
+        paths = [path for path in unknown_images if path not in self._image_checksum_paths]
+        if paths:
+            self._image_checksum_paths.update(paths)
+            task = asyncio.ensure_future(self._compute_image_checksums(paths))
+            self._image_checksum_tasks.add(task)
+            task.add_done_callback(self._image_checksums_done)
+        return images
+
+    async def _compute_image_checksums(self, paths):
+        """
+        Compute the checksums of images one at a time, they are saved in the image index.
+
+        :param paths: Paths of the images
+        """
+
+        try:
+            for path in paths:
+                log.debug("Computing the checksum of image {} in the background".format(path))
+                await cancellable_wait_run_in_executor(md5sum, path)
+        finally:
+            self._image_checksum_paths.difference_update(paths)
+
+    def _image_checksums_done(self, task):
+
+        self._image_checksum_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.error("Could not compute image checksums", exc_info=task.exception())
 
     def get_images_directory(self):
         """
@@ -601,6 +663,12 @@ class BaseManager:
             return default_images_directory(self._NODE_TYPE)
         raise NotImplementedError
 
+    @staticmethod
+    def _write_image_chunk(f, hashes, chunk):
+
+        f.write(chunk)
+        update_image_hashes(hashes, chunk)
+
     async def write_image(self, filename, stream):
 
         directory = self.get_images_directory()
@@ -613,15 +681,18 @@ class BaseManager:
             # We store the file under his final name only when the upload is finished
             tmp_path = path + ".tmp"
             os.makedirs(os.path.dirname(path), exist_ok=True)
-            async with aiofiles.open(tmp_path, 'wb') as f:
+            chunk_size = image_chunk_size()
+            # the checksums are computed while writing so the image is not read again once uploaded
+            hashes = image_hashes()
+            with open(tmp_path, 'wb') as f:
                 while True:
-                    chunk = await stream.read(CHUNK_SIZE)
+                    chunk = await stream.read(chunk_size)
                     if not chunk:
                         break
-                    await f.write(chunk)
+                    await wait_run_in_executor(self._write_image_chunk, f, hashes, chunk)
             os.chmod(tmp_path, stat.S_IWRITE | stat.S_IREAD | stat.S_IEXEC)
             shutil.move(tmp_path, path)
-            await cancellable_wait_run_in_executor(md5sum, path)
+            await wait_run_in_executor(record_image_checksums, path, hashes)
         except OSError as e:
             raise aiohttp.web.HTTPConflict(text="Could not write image: {} because {}".format(filename, e))
 
@@ -869,8 +869,7 @@ class BaseNode:
         """
 
         m = PortManager.instance()
-        lport = m.get_free_udp_port(self.project)
-        rport = m.get_free_udp_port(self.project)
+        lport, rport = m.get_free_udp_ports(self.project, 2)
         source_nio_settings = {'lport': lport, 'rhost': '127.0.0.1', 'rport': rport, 'type': 'nio_udp'}
         destination_nio_settings = {'lport': rport, 'rhost': '127.0.0.1', 'rport': lport, 'type': 'nio_udp'}
         source_nio = self.manager.create_nio(source_nio_settings)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import asyncio
+
+from gns3server.config import Config
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class BinaryRegistry:
+
+    """
+    Registry of the capabilities (version etc.) of the executables used by the compute.
+
+    An executable is probed once until its modification time or size changes, the
+    results are kept in memory and saved on disk to survive a server restart.
+    Concurrent probes of the same executable share a single execution.
+    """
+
+    def __init__(self):
+
+        self._entries = None
+        self._in_flight = {}
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def instance(cls):
+        """
+        Singleton to return only one instance of BinaryRegistry.
+
+        :returns: instance of BinaryRegistry
+        """
+
+        if not hasattr(cls, "_instance") or cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def _cache_path():
+
+        config = Config.instance()
+        server_config = config.get_section_config("Server")
+        return server_config.get("binaries_cache_path", os.path.join(config.config_dir, "binaries_cache.json"))
+
+    def _load(self):
+
+        if self._entries is not None:
+            return
+        self._entries = {}
+        path = self._cache_path()
+        try:
+            with open(path, encoding="utf-8") as f:
+                entries = json.load(f)
+            if isinstance(entries, dict):
+                self._entries = entries
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            log.warning("Could not load the binaries cache {}: {}".format(path, e))
+
+    def _save(self):
+
+        path = self._cache_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            log.warning("Could not save the binaries cache {}: {}".format(path, e))
+
+    def __json__(self):
+
+        self._load()
+        return [{"path": entry["path"], "probe": entry["probe"], "value": entry["value"]} for entry in self._entries.values()]
+
+    def stats(self):
+
+        self._load()
+        return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses}
+
+    def refresh(self):
+        """
+        Forgets all the results, the executables will be probed again.
+        """
+
+        self._entries = {}
+        try:
+            os.remove(self._cache_path())
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            log.warning("Could not delete the binaries cache: {}".format(e))
+        log.info("Binaries cache has been cleared")
+
+    async def get(self, probe, path, func):
+        """
+        Returns the cached result of a probe or runs it.
+
+        :param probe: probe name (e.g. qemu_version)
+        :param path: path to the executable
+        :param func: coroutine function probing the executable, its result must be serializable to JSON
+        :returns: probe result
+        """
+
+        try:
+            path = os.path.abspath(path)
+            st = os.stat(path)
+        except (OSError, TypeError):
+            # let the probe report the error
+            return await func()
+
+        self._load()
+        key = "{}:{}".format(probe, path)
+        entry = self._entries.get(key)
+        if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            self._hits += 1
+            return entry["value"]
+
+        in_flight_key = (key, st.st_mtime_ns, st.st_size)
+        future = self._in_flight.get(in_flight_key)
+        if future is not None:
+            self._hits += 1
+            return await asyncio.shield(future)
+
+        self._misses += 1
+        future = asyncio.ensure_future(func())
+        self._in_flight[in_flight_key] = future
+        try:
+            value = await asyncio.shield(future)
+        finally:
+            del self._in_flight[in_flight_key]
+
+        self._entries[key] = {"path": path, "probe": probe, "mtime_ns": st.st_mtime_ns, "size": st.st_size, "value": value}
+        self._save()
+        return value
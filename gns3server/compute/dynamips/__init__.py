@@ -24,12 +24,12 @@ import sys
 import os
 import shutil
 import socket
-import time
 import asyncio
 import tempfile
 import logging
 import subprocess
 import glob
+import json
 import re
 
 log = logging.getLogger(__name__)
@@ -37,12 +37,15 @@ log = logging.getLogger(__name__)
 from gns3server.utils.interfaces import interfaces, is_interface_up
 from gns3server.utils.asyncio import wait_run_in_executor, subprocess_check_output
 from gns3server.utils import parse_version
+from gns3server.utils.images import md5sum
 from uuid import uuid4
 from ..base_manager import BaseManager
+from ..binary_registry import BinaryRegistry
 from ..port_manager import PortManager
 from .dynamips_error import DynamipsError
 from .hypervisor import Hypervisor
 from .nodes.router import Router
+from .idlepc_search import IdlePCSearch
 from .dynamips_factory import DynamipsFactory
 
 # NIOs
@@ -123,6 +126,8 @@ class Dynamips(BaseManager):
         self._ghost_files = set()
         self._dynamips_path = None
         self._dynamips_ids = {}
+        self._hypervisor_pools = {}
+        self._hypervisor_pool_lock = asyncio.Lock()
 
     @classmethod
     def node_types(cls):
@@ -171,8 +176,10 @@ class Dynamips(BaseManager):
         await BaseManager.unload(self)
 
         tasks = []
-        for device in self._devices.values():
-            tasks.append(asyncio.ensure_future(device.hypervisor.stop()))
+        # a hypervisor can be shared by several devices
+        hypervisors = set(device.hypervisor for device in self._devices.values() if device.hypervisor)
+        for hypervisor in hypervisors:
+            tasks.append(asyncio.ensure_future(hypervisor.stop()))
 
         if tasks:
             done, _ = await asyncio.wait(tasks)
@@ -212,6 +219,7 @@ class Dynamips(BaseManager):
         :param project: Project instance
         """
         await super().project_closed(project)
+        self._hypervisor_pools.pop(project.id, None)
         # delete useless Dynamips files
         project_dir = project.module_working_path(self.module_name.lower())
 
@@ -275,16 +283,19 @@ class Dynamips(BaseManager):
         :param dynamips_path: path to Dynamips executable.
         """
 
-        try:
-            output = await subprocess_check_output(dynamips_path, "-P", "none")
-            match = re.search(r"Cisco Router Simulation Platform \(version\s+([\d.]+)", output)
-            if match:
-                version = match.group(1)
-                return version
-            else:
-                raise DynamipsError("Could not determine the Dynamips version for {}".format(dynamips_path))
-        except (OSError, subprocess.SubprocessError) as e:
-            raise DynamipsError("Error while looking for the Dynamips version: {}".format(e))
+        async def probe():
+            try:
+                output = await subprocess_check_output(dynamips_path, "-P", "none")
+                match = re.search(r"Cisco Router Simulation Platform \(version\s+([\d.]+)", output)
+                if match:
+                    version = match.group(1)
+                    return version
+                else:
+                    raise DynamipsError("Could not determine the Dynamips version for {}".format(dynamips_path))
+            except (OSError, subprocess.SubprocessError) as e:
+                raise DynamipsError("Error while looking for the Dynamips version: {}".format(e))
+
+        return await BinaryRegistry.instance().get("dynamips_version", dynamips_path, probe)
 
     async def start_new_hypervisor(self, working_dir=None):
         """
@@ -340,6 +351,64 @@ class Dynamips(BaseManager):
         await hypervisor.connect()
         return hypervisor
 
+    @staticmethod
+    def _hypervisor_memory_load(hypervisor):
+        """
+        Returns the amount of RAM in MB used by the devices of a hypervisor.
+
+        :param hypervisor: Hypervisor instance
+        """
+
+        return sum(getattr(device, "ram", 0) or 0 for device in hypervisor.devices)
+
+    async def allocate_hypervisor(self, device, working_dir, ram=0):
+        """
+        Allocates a hypervisor for a device.
+
+        By default each device has its own hypervisor. When allocate_hypervisor_per_device
+        is disabled, the devices of a project share a pool of hypervisors: a device is
+        placed on the least loaded hypervisor with enough room for its RAM. Devices
+        without RAM (switches, hubs etc.) fit on any hypervisor. A new hypervisor is
+        started when none has enough room, up to max_hypervisors per project.
+
+        :param device: device instance
+        :param working_dir: working directory
+        :param ram: amount of RAM in MB used by the device
+
+        :returns: Hypervisor instance
+        """
+
+        dynamips_config = self.config.get_section_config("Dynamips")
+        if dynamips_config.getboolean("allocate_hypervisor_per_device", True):
+            return await self.start_new_hypervisor(working_dir=working_dir)
+
+        max_hypervisors = dynamips_config.getint("max_hypervisors", 0)
+        max_ram = dynamips_config.getint("max_ram_per_hypervisor", 1024)
+        project_id = device.project.id
+        async with self._hypervisor_pool_lock:
+            pool = [hypervisor for hypervisor in self._hypervisor_pools.get(project_id, []) if hypervisor.is_running()]
+            candidates = [hypervisor for hypervisor in pool if self._hypervisor_memory_load(hypervisor) + ram <= max_ram]
+            if candidates:
+                hypervisor = min(candidates, key=lambda h: (self._hypervisor_memory_load(h), len(h.devices)))
+            elif pool and max_hypervisors and len(pool) >= max_hypervisors:
+                hypervisor = min(pool, key=lambda h: (self._hypervisor_memory_load(h), len(h.devices)))
+                log.warning("Maximum number of Dynamips hypervisors reached ({}), {} will exceed the RAM limit of hypervisor {}:{}".format(max_hypervisors,
+                                                                                                                                   device.name,
+                                                                                                                                   hypervisor.host,
+                                                                                                                                   hypervisor.port))
+            else:
+                hypervisor = await self.start_new_hypervisor(working_dir=working_dir)
+                pool.append(hypervisor)
+            self._hypervisor_pools[project_id] = pool
+            # reserve the room on the hypervisor until the device has been created
+            hypervisor.devices.append(device)
+        log.info("{} placed on hypervisor {}:{} ({} device(s), {} MB)".format(device.name,
+                                                                            hypervisor.host,
+                                                                            hypervisor.port,
+                                                                            len(hypervisor.devices),
+                                                                            self._hypervisor_memory_load(hypervisor)))
+        return hypervisor
+
     async def ghost_ios_support(self, vm):
 
         ghost_ios_support = self.config.get_section_config("Dynamips").getboolean("ghost_ios_support", True)
@@ -579,61 +648,65 @@ class Dynamips(BaseManager):
 
         return os.path.join("configs", os.path.basename(path))
 
+    def _idlepc_cache_path(self):
+
+        dynamips_config = self.config.get_section_config("Dynamips")
+        return dynamips_config.get("idlepc_cache_path", os.path.join(self.config.config_dir, "dynamips_idlepcs.json"))
+
+    def _load_idlepc_cache(self):
+        """
+        Loads the validated idle-PC values indexed by IOS image MD5.
+        """
+
+        path = self._idlepc_cache_path()
+        try:
+            with open(path, encoding="utf-8") as f:
+                idlepcs = json.load(f)
+            if isinstance(idlepcs, dict):
+                return idlepcs
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            log.warning("Could not load the idle-PC cache {}: {}".format(path, e))
+        return {}
+
+    def _save_idlepc_cache(self, idlepcs):
+
+        path = self._idlepc_cache_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(idlepcs, f)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            log.warning("Could not save the idle-PC cache {}: {}".format(path, e))
+
     async def auto_idlepc(self, vm):
         """
         Try to find the best possible idle-pc value.
 
+        A value validated for the IOS image of the router is reused
+        without searching again.
+
         :param vm: VM instance
         """
 
-        await vm.set_idlepc("0x0")
-        was_auto_started = False
-        old_priority = None
-        try:
-            status = await vm.get_status()
-            if status != "running":
-                await vm.start()
-                was_auto_started = True
-                await asyncio.sleep(20)  # leave time to the router to boot
-            validated_idlepc = None
-            idlepcs = await vm.get_idle_pc_prop()
-            if not idlepcs:
-                raise DynamipsError("No Idle-PC values found")
-
-            if sys.platform.startswith("win"):
-                old_priority = vm.set_process_priority_windows(vm.hypervisor.process.pid)
-            for idlepc in idlepcs:
-                match = re.search(r"^0x[0-9a-f]{8}$", idlepc.split()[0])
-                if not match:
-                   continue
-                await vm.set_idlepc(idlepc.split()[0])
-                log.debug("Auto Idle-PC: trying idle-PC value {}".format(vm.idlepc))
-                start_time = time.time()
-                initial_cpu_usage = await vm.get_cpu_usage()
-                log.debug("Auto Idle-PC: initial CPU usage is {}%".format(initial_cpu_usage))
-                await asyncio.sleep(3)  # wait 3 seconds to probe the cpu again
-                elapsed_time = time.time() - start_time
-                cpu_usage = await vm.get_cpu_usage()
-                cpu_elapsed_usage = cpu_usage - initial_cpu_usage
-                cpu_usage = abs(cpu_elapsed_usage * 100.0 / elapsed_time)
-                if cpu_usage > 100:
-                    cpu_usage = 100
-                log.debug("Auto Idle-PC: CPU usage is {}% after {:.2} seconds".format(cpu_usage, elapsed_time))
-                if cpu_usage < 70:
-                    validated_idlepc = vm.idlepc
-                    log.debug("Auto Idle-PC: idle-PC value {} has been validated".format(validated_idlepc))
-                    break
+        image_md5sum = await wait_run_in_executor(md5sum, vm.image)
+        if image_md5sum:
+            idlepc = self._load_idlepc_cache().get(image_md5sum)
+            if idlepc:
+                log.info("Auto Idle-PC: reusing idle-PC value {} validated for image {}".format(idlepc, vm.image))
+                await vm.set_idlepc(idlepc)
+                return idlepc
 
-            if validated_idlepc is None:
-                raise DynamipsError("Sorry, no idle-pc value was suitable")
+        dynamips_config = self.config.get_section_config("Dynamips")
+        instances = dynamips_config.getint("idlepc_search_instances", 2)
+        validated_idlepc = await IdlePCSearch(self, vm, instances=instances).run()
 
-        except DynamipsError:
-            raise
-        finally:
-            if old_priority is not None:
-                vm.set_process_priority_windows(vm.hypervisor.process.pid, old_priority)
-            if was_auto_started:
-                await vm.stop()
+        if image_md5sum:
+            idlepcs = self._load_idlepc_cache()
+            idlepcs[image_md5sum] = validated_idlepc
+            self._save_idlepc_cache(idlepcs)
         return validated_idlepc
 
     async def duplicate_node(self, source_node_id, destination_node_id):
@@ -58,6 +58,7 @@ class DynamipsHypervisor:
         self._reader = None
         self._writer = None
         self._io_lock = asyncio.Lock()
+        self._working_dir_lock = asyncio.Lock()
 
     async def connect(self, timeout=10):
         """
@@ -158,6 +159,16 @@ class DynamipsHypervisor:
         self._working_dir = working_dir
         log.debug("Working directory set to {}".format(self._working_dir))
 
+    @property
+    def working_dir_lock(self):
+        """
+        Returns the lock to hold while a command depends on the working directory.
+
+        :returns: asyncio.Lock instance
+        """
+
+        return self._working_dir_lock
+
     @property
     def working_dir(self):
         """
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Search of a suitable idle-PC value for a Dynamips router.
+"""
+
+import re
+import sys
+import time
+import asyncio
+import collections
+
+from uuid import uuid4
+from .dynamips_error import DynamipsError
+from .nodes.router import Router
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class IdlePCSearch:
+
+    """
+    Finds an idle-PC value for a router.
+
+    The idle-PC proposals of the router are tested in parallel on the router
+    itself and on throwaway instances running the same IOS image. The CPU
+    usage of each candidate is sampled until it is clearly below or above
+    the threshold, or for at most max_sample_time seconds.
+
+    :param manager: Dynamips manager instance
+    :param vm: router instance
+    :param instances: number of throwaway instances
+    :param threshold: maximum CPU usage (percent) of a suitable idle-PC value
+    :param max_sample_time: maximum time in seconds to sample the CPU usage of a candidate
+    :param sample_interval: time in seconds between two CPU usage samples
+    :param boot_time: time in seconds to leave to a router to boot
+    """
+
+    def __init__(self, manager, vm, instances=2, threshold=70, max_sample_time=3, sample_interval=0.25, boot_time=20):
+
+        self._manager = manager
+        self._vm = vm
+        self._instances = instances
+        self._threshold = threshold
+        self._max_sample_time = max_sample_time
+        self._sample_interval = sample_interval
+        self._boot_time = boot_time
+        self._validated_idlepc = None
+        self._errors = []
+
+    async def run(self):
+        """
+        Runs the search.
+
+        :returns: validated idle-PC value
+        """
+
+        vm = self._vm
+        await vm.set_idlepc("0x0")
+        was_auto_started = False
+        old_priority = None
+        instance_tasks = [asyncio.ensure_future(self._create_instance()) for _ in range(self._instances)]
+        instances = []
+        try:
+            status = await vm.get_status()
+            if status != "running":
+                await vm.start()
+                was_auto_started = True
+                await asyncio.sleep(self._boot_time)  # leave time to the router to boot
+            idlepcs = await vm.get_idle_pc_prop()
+            if not idlepcs:
+                raise DynamipsError("No Idle-PC values found")
+
+            candidates = []
+            for idlepc in idlepcs:
+                match = re.search(r"^0x[0-9a-f]{8}$", idlepc.split()[0])
+                if match:
+                    candidates.append(idlepc.split()[0])
+
+            # the throwaway instances have been booting while the proposals were computed
+            for future in asyncio.as_completed(instance_tasks):
+                try:
+                    instances.append(await future)
+                except DynamipsError as e:
+                    log.warning("Auto Idle-PC: could not start a throwaway instance: {}".format(e))
+
+            if sys.platform.startswith("win"):
+                old_priority = vm.set_process_priority_windows(vm.hypervisor.process.pid)
+
+            pending = collections.deque(candidates)
+            await asyncio.gather(*[self._worker(router, pending) for router in [vm] + instances])
+            if self._validated_idlepc is None:
+                if pending and self._errors:
+                    # no router was able to test the remaining values
+                    raise self._errors[0]
+                raise DynamipsError("Sorry, no idle-pc value was suitable")
+
+            # the value may have been validated by a throwaway instance
+            if vm.idlepc != self._validated_idlepc:
+                await vm.set_idlepc(self._validated_idlepc)
+        finally:
+            for task in instance_tasks:
+                task.cancel()
+            for future in asyncio.as_completed(instance_tasks):
+                try:
+                    router = await future
+                    if router not in instances:
+                        instances.append(router)
+                except (Exception, asyncio.CancelledError):
+                    pass
+            await asyncio.gather(*[self._delete_instance(router) for router in instances])
+            if old_priority is not None:
+                vm.set_process_priority_windows(vm.hypervisor.process.pid, old_priority)
+            if was_auto_started:
+                await vm.stop()
+        return self._validated_idlepc
+
+    async def _create_instance(self):
+        """
+        Starts a throwaway instance of the router on its own hypervisor.
+
+        :returns: router instance
+        """
+
+        vm = self._vm
+        module_workdir = vm.project.module_working_directory(self._manager.module_name.lower())
+        hypervisor = await self._manager.start_new_hypervisor(working_dir=module_workdir)
+        router = Router("idlepc-" + vm.name, str(uuid4()), vm.project, self._manager, platform=vm.platform, hypervisor=hypervisor, ghost_flag=True)
+        try:
+            await router.create()
+            await router.set_image(vm.image)
+            await router.set_ram(vm.ram)
+            if vm.ghost_status == 2 and vm.ghost_file:
+                # share the IOS memory with the router
+                await router.set_ghost_status(2)
+                await router.set_ghost_file(vm.ghost_file)
+            await router.start()
+            await asyncio.sleep(self._boot_time)  # leave time to the router to boot
+        except (Exception, asyncio.CancelledError):
+            await self._delete_instance(router)
+            raise
+        return router
+
+    async def _delete_instance(self, router):
+        """
+        Deletes a throwaway instance and stops its hypervisor.
+
+        :param router: router instance
+        """
+
+        hypervisor = router.hypervisor
+        try:
+            if await router.is_running():
+                await router.stop()
+            await router.clean_delete()
+        except (DynamipsError, ValueError) as e:
+            log.debug("Auto Idle-PC: could not delete throwaway instance: {}".format(e))
+        await hypervisor.stop()
+
+    async def _worker(self, router, pending):
+        """
+        Tests the pending candidates on a router until one is validated.
+
+        :param router: router instance
+        :param pending: deque of idle-PC values to test
+        """
+
+        while pending and self._validated_idlepc is None:
+            idlepc = pending.popleft()
+            try:
+                validated = await self._test(router, idlepc)
+            except DynamipsError as e:
+                log.warning("Auto Idle-PC: could not test idle-PC value {} on {}: {}".format(idlepc, router.name, e))
+                self._errors.append(e)
+                # let another router test this value
+                pending.appendleft(idlepc)
+                return
+            if validated is None:
+                # another value has been validated in the meantime
+                return
+            if validated:
+                self._validated_idlepc = idlepc
+                log.debug("Auto Idle-PC: idle-PC value {} has been validated".format(idlepc))
+
+    async def _test(self, router, idlepc):
+        """
+        Samples the CPU usage of a router with an idle-PC value.
+
+        :param router: router instance
+        :param idlepc: idle-PC value
+
+        :returns: True if the value is suitable, False if not, None if the test was interrupted
+        """
+
+        await router.set_idlepc(idlepc)
+        log.debug("Auto Idle-PC: trying idle-PC value {} on {}".format(idlepc, router.name))
+        start_time = time.time()
+        initial_cpu_usage = await router.get_cpu_usage()
+        while True:
+            await asyncio.sleep(self._sample_interval)
+            if self._validated_idlepc is not None:
+                return None
+            elapsed_time = time.time() - start_time
+            cpu_elapsed_usage = abs(await router.get_cpu_usage() - initial_cpu_usage)
+
+            # the CPU usage is reported in whole seconds
+            if (cpu_elapsed_usage + 1) * 100.0 / elapsed_time < self._threshold:
+                log.debug("Auto Idle-PC: CPU usage is below {}% after {:.2} seconds".format(self._threshold, elapsed_time))
+                return True
+            if (cpu_elapsed_usage - 1) * 100.0 / elapsed_time >= self._threshold:
+                log.debug("Auto Idle-PC: CPU usage is above {}% after {:.2} seconds".format(self._threshold, elapsed_time))
+                return False
+            if elapsed_time >= self._max_sample_time:
+                cpu_usage = min(cpu_elapsed_usage * 100.0 / elapsed_time, 100)
+                log.debug("Auto Idle-PC: CPU usage is {}% after {:.2} seconds".format(cpu_usage, elapsed_time))
+                return cpu_usage < self._threshold
@@ -68,11 +68,12 @@ class ATMSwitch(Device):
 
         if self._hypervisor is None:
             module_workdir = self.project.module_working_directory(self.manager.module_name.lower())
-            self._hypervisor = await self.manager.start_new_hypervisor(working_dir=module_workdir)
+            self._hypervisor = await self.manager.allocate_hypervisor(self, module_workdir)
 
         await self._hypervisor.send('atmsw create "{}"'.format(self._name))
         log.info('ATM switch "{name}" [{id}] has been created'.format(name=self._name, id=self._id))
-        self._hypervisor.devices.append(self)
+        if self not in self._hypervisor.devices:
+            self._hypervisor.devices.append(self)
 
     async def set_name(self, new_name):
         """
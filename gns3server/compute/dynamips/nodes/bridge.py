@@ -45,10 +45,11 @@ class Bridge(Device):
 
         if self._hypervisor is None:
             module_workdir = self.project.module_working_directory(self.manager.module_name.lower())
-            self._hypervisor = await self.manager.start_new_hypervisor(working_dir=module_workdir)
+            self._hypervisor = await self.manager.allocate_hypervisor(self, module_workdir)
 
         await self._hypervisor.send('nio_bridge create "{}"'.format(self._name))
-        self._hypervisor.devices.append(self)
+        if self not in self._hypervisor.devices:
+            self._hypervisor.devices.append(self)
 
     async def set_name(self, new_name):
         """
@@ -79,7 +80,8 @@ class Bridge(Device):
 
         if self._hypervisor and self in self._hypervisor.devices:
             self._hypervisor.devices.remove(self)
-        if self._hypervisor and not self._hypervisor.devices:
+        if self._hypervisor:
+            # the hypervisor may be shared with other devices
             await self._hypervisor.send('nio_bridge delete "{}"'.format(self._name))
 
     async def add_nio(self, nio):
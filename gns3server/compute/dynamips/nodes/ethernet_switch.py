@@ -181,7 +181,7 @@ class EthernetSwitch(Device):
 
         if self._hypervisor is None:
             module_workdir = self.project.module_working_directory(self.manager.module_name.lower())
-            self._hypervisor = await self.manager.start_new_hypervisor(working_dir=module_workdir)
+            self._hypervisor = await self.manager.allocate_hypervisor(self, module_workdir)
 
         await self._hypervisor.send('ethsw create "{}"'.format(self._name))
         log.info('Ethernet switch "{name}" [{id}] has been created'.format(name=self._name, id=self._id))
@@ -195,7 +195,8 @@ class EthernetSwitch(Device):
         #    self.project.emit("log.warning", {"message": "Could not start Telnet server on socket {}:{}: {}".format(self._manager.port_manager.console_host, self.console, e)})
         if self._console_type == "telnet":
             self.project.emit("log.warning", {"message": '"{name}": Telnet access for switches is not available in this version of GNS3'.format(name=self._name)})
-        self._hypervisor.devices.append(self)
+        if self not in self._hypervisor.devices:
+            self._hypervisor.devices.append(self)
 
     async def set_name(self, new_name):
         """
@@ -67,11 +67,12 @@ class FrameRelaySwitch(Device):
 
         if self._hypervisor is None:
             module_workdir = self.project.module_working_directory(self.manager.module_name.lower())
-            self._hypervisor = await self.manager.start_new_hypervisor(working_dir=module_workdir)
+            self._hypervisor = await self.manager.allocate_hypervisor(self, module_workdir)
 
         await self._hypervisor.send('frsw create "{}"'.format(self._name))
         log.info('Frame Relay switch "{name}" [{id}] has been created'.format(name=self._name, id=self._id))
-        self._hypervisor.devices.append(self)
+        if self not in self._hypervisor.devices:
+            self._hypervisor.devices.append(self)
 
     async def set_name(self, new_name):
         """
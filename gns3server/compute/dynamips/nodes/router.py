@@ -210,12 +210,12 @@ class Router(BaseNode):
         if not self._hypervisor:
             # We start the hypervisor is the dynamips folder and next we change to node dir
             # this allow the creation of common files in the dynamips folder
-            self._hypervisor = await self.manager.start_new_hypervisor(working_dir=self.project.module_working_directory(self.manager.module_name.lower()))
-            await self._hypervisor.set_working_dir(self._working_directory)
+            module_workdir = self.project.module_working_directory(self.manager.module_name.lower())
+            self._hypervisor = await self.manager.allocate_hypervisor(self, module_workdir, ram=self._ram)
 
-        await self._hypervisor.send('vm create "{name}" {id} {platform}'.format(name=self._name,
-                                                                                     id=self._dynamips_id,
-                                                                                     platform=self._platform))
+        await self._send_in_working_directory('vm create "{name}" {id} {platform}'.format(name=self._name,
+                                                                                              id=self._dynamips_id,
+                                                                                              platform=self._platform))
 
         if not self._ghost_flag:
 
@@ -234,7 +234,21 @@ class Router(BaseNode):
                                                                                                   name=self._name))
             self._mac_addr = mac_addr[0]
 
-        self._hypervisor.devices.append(self)
+        if self not in self._hypervisor.devices:
+            self._hypervisor.devices.append(self)
+
+    async def _send_in_working_directory(self, command):
+        """
+        Sends a command that creates or opens files relative to the working
+        directory of the hypervisor, which may be shared with other routers.
+
+        :param command: command to send
+        """
+
+        async with self._hypervisor.working_dir_lock:
+            if self._hypervisor.working_dir != self._working_directory:
+                await self._hypervisor.set_working_dir(self._working_directory)
+            return await self._hypervisor.send(command)
 
     async def get_status(self):
         """
@@ -293,7 +307,7 @@ class Router(BaseNode):
                 name=self._name,
                 startup=startup_config_path,
                 private=private_config_path))
-            await self._hypervisor.send('vm start "{name}"'.format(name=self._name))
+            await self._send_in_working_directory('vm start "{name}"'.format(name=self._name))
             self.status = "started"
             log.info('router "{name}" [{id}] has been started'.format(name=self._name, id=self._id))
 
@@ -388,12 +402,13 @@ class Router(BaseNode):
 
         if self in self._hypervisor.devices:
             self._hypervisor.devices.remove(self)
-        if self._hypervisor and not self._hypervisor.devices:
+            # the hypervisor may be shared with other devices
             try:
                 await self.stop()
                 await self._hypervisor.send('vm delete "{}"'.format(self._name))
             except DynamipsError as e:
                 log.warning("Could not stop and delete {}: {}".format(self._name, e))
+        if self._hypervisor and not self._hypervisor.devices:
             await self.hypervisor.stop()
 
         if self._auto_delete_disks:
@@ -16,6 +16,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import socket
+import itertools
 import ipaddress
 from aiohttp.web import HTTPConflict
 from gns3server.config import Config
@@ -30,6 +31,9 @@ BANNED_PORTS = set((1, 7, 9, 11, 13, 15, 17, 19, 20, 21, 22, 23, 25, 37, 42, 43,
                     530, 531, 532, 540, 556, 563, 587, 601, 636, 993, 995, 2049, 3659, 4045, 6000, 6665, 6666, 6667,
                     6668, 6669))
 
+# Maximum number of UDP ports allocated with one request
+MAX_UDP_PORTS_ALLOCATION = 1000
+
 
 class PortManager:
 
@@ -43,6 +47,8 @@ class PortManager:
         self._udp_host = "0.0.0.0"
         self._used_tcp_ports = set()
         self._used_udp_ports = set()
+        # next port to try for each (socket type, start port, end port) range
+        self._cursors = {}
 
         server_config = Config.instance().get_section_config("Server")
 
@@ -170,10 +176,7 @@ class PortManager:
                 return port
             except OSError as e:
                 last_exception = e
-                if port + 1 == end_port:
-                    break
-                else:
-                    continue
+                continue
 
         raise HTTPConflict(text="Could not find a free port between {} and {} on host {}, last exception: {}".format(start_port,
                                                                                                                      end_port,
@@ -199,6 +202,57 @@ class PortManager:
                 s.bind(sa)  # the port is available if bind is a success
             return True
 
+    def _allocate_ports(self, count, start_port, end_port, host, socket_type, used_ports):
+        """
+        Finds unused ports in a range and mark them as used.
+
+        The search starts after the last allocated port of the range and wraps around,
+        ports already used by the server are skipped without a system call and only
+        the candidates are checked with bind().
+
+        :param count: number of ports to allocate
+        :param start_port: first port in the range
+        :param end_port: last port in the range
+        :param host: host/address for bind()
+        :param socket_type: TCP or UDP
+        :param used_ports: set of ports used by the server
+        :returns: list of ports
+        """
+
+        if end_port < start_port:
+            raise HTTPConflict(text="Invalid port range {}-{}".format(start_port, end_port))
+
+        key = (socket_type, start_port, end_port)
+        cursor = self._cursors.get(key, start_port)
+        if cursor < start_port or cursor > end_port:
+            cursor = start_port
+
+        ports = []
+        last_exception = None
+        for port in itertools.chain(range(cursor, end_port + 1), range(start_port, cursor)):
+            if port in used_ports or port in BANNED_PORTS:
+                continue
+            try:
+                PortManager._check_port(host, port, socket_type)
+                if host != "0.0.0.0":
+                    PortManager._check_port("0.0.0.0", port, socket_type)
+            except OSError as e:
+                last_exception = e
+                continue
+            used_ports.add(port)
+            ports.append(port)
+            if len(ports) == count:
+                self._cursors[key] = port + 1 if port < end_port else start_port
+                return ports
+
+        # not enough free ports, the partial allocation is not kept
+        used_ports.difference_update(ports)
+        raise HTTPConflict(text="Could not find {} free port(s) between {} and {} on host {}, last exception: {}".format(count,
+                                                                                                                        start_port,
+                                                                                                                        end_port,
+                                                                                                                        host,
+                                                                                                                        last_exception))
+
     def get_free_tcp_port(self, project, port_range_start=None, port_range_end=None):
         """
         Get an available TCP port and reserve it
@@ -211,13 +265,13 @@ class PortManager:
             port_range_start = self._console_port_range[0]
             port_range_end = self._console_port_range[1]
 
-        port = self.find_unused_port(port_range_start,
-                                     port_range_end,
-                                     host=self._console_host,
-                                     socket_type="TCP",
-                                     ignore_ports=self._used_tcp_ports)
+        port = self._allocate_ports(1,
+                                    port_range_start,
+                                    port_range_end,
+                                    host=self._console_host,
+                                    socket_type="TCP",
+                                    used_ports=self._used_tcp_ports)[0]
 
-        self._used_tcp_ports.add(port)
         project.record_tcp_port(port)
         log.debug("TCP port {} has been allocated".format(port))
         return port
@@ -284,16 +338,30 @@ class PortManager:
 
         :param project: Project instance
         """
-        port = self.find_unused_port(self._udp_port_range[0],
+
+        return self.get_free_udp_ports(project, 1)[0]
+
+    def get_free_udp_ports(self, project, count):
+        """
+        Get several available UDP ports and reserve them,
+        no port is reserved if there are not enough available ports.
+
+        :param project: Project instance
+        :param count: number of ports
+        :returns: list of UDP ports
+        """
+
+        ports = self._allocate_ports(count,
+                                     self._udp_port_range[0],
                                      self._udp_port_range[1],
                                      host=self._udp_host,
                                      socket_type="UDP",
-                                     ignore_ports=self._used_udp_ports)
+                                     used_ports=self._used_udp_ports)
 
-        self._used_udp_ports.add(port)
-        project.record_udp_port(port)
-        log.debug("UDP port {} has been allocated".format(port))
-        return port
+        for port in ports:
+            project.record_udp_port(port)
+            log.debug("UDP port {} has been allocated".format(port))
+        return ports
 
     def reserve_udp_port(self, port, project):
         """
@@ -30,6 +30,7 @@ from ...utils import shlex_quote
 from ...utils.asyncio import subprocess_check_output
 from ...utils.get_resource import get_resource
 from ..base_manager import BaseManager
+from ..binary_registry import BinaryRegistry
 from ..error import NodeError, ImageMissingError
 from .qemu_error import QemuError
 from .qemu_vm import QemuVM
@@ -148,7 +149,7 @@ class Qemu(BaseManager):
         :returns: Array of dictionary {"path": Qemu binary path, "version": version of Qemu}
         """
 
-        qemus = []
+        qemu_paths = []
         for path in Qemu.paths_list():
             log.debug("Searching for Qemu binaries in '{}'".format(path))
             try:
@@ -159,24 +160,22 @@ class Qemu(BaseManager):
                         if archs is not None:
                             for arch in archs:
                                 if f.endswith(arch) or f.endswith("{}.exe".format(arch)) or f.endswith("{}w.exe".format(arch)):
-                                    qemu_path = os.path.join(path, f)
-                                    try:
-                                        version = await Qemu.get_qemu_version(qemu_path)
-                                    except QemuError as e:
-                                        log.warning(str(e))
-                                        continue
-                                    qemus.append({"path": qemu_path, "version": version})
+                                    qemu_paths.append(os.path.join(path, f))
                         else:
-                            qemu_path = os.path.join(path, f)
-                            try:
-                                version = await Qemu.get_qemu_version(qemu_path)
-                            except QemuError as e:
-                                log.warning(str(e))
-                                continue
-                            qemus.append({"path": qemu_path, "version": version})
+                            qemu_paths.append(os.path.join(path, f))
             except OSError:
                 continue
 
+        # the binaries are probed in parallel
+        qemus = []
+        versions = await asyncio.gather(*[Qemu.get_qemu_version(qemu_path) for qemu_path in qemu_paths], return_exceptions=True)
+        for qemu_path, version in zip(qemu_paths, versions):
+            if isinstance(version, QemuError):
+                log.warning(str(version))
+                continue
+            elif isinstance(version, BaseException):
+                raise version
+            qemus.append({"path": qemu_path, "version": version})
         return qemus
 
     @staticmethod
@@ -186,20 +185,20 @@ class Qemu(BaseManager):
 
         :returns: Array of dictionary {"path": Qemu-img binary path, "version": version of Qemu-img}
         """
-        qemu_imgs = []
+
+        qemu_img_paths = []
         for path in Qemu.paths_list():
             try:
                 for f in os.listdir(path):
                     if (f == "qemu-img" or f == "qemu-img.exe") and \
                             os.access(os.path.join(path, f), os.X_OK) and \
                             os.path.isfile(os.path.join(path, f)):
-                        qemu_path = os.path.join(path, f)
-                        version = await Qemu._get_qemu_img_version(qemu_path)
-                        qemu_imgs.append({"path": qemu_path, "version": version})
+                        qemu_img_paths.append(os.path.join(path, f))
             except OSError:
                 continue
 
-        return qemu_imgs
+        versions = await asyncio.gather(*[Qemu._get_qemu_img_version(qemu_img_path) for qemu_img_path in qemu_img_paths])
+        return [{"path": qemu_img_path, "version": version} for qemu_img_path, version in zip(qemu_img_paths, versions)]
 
     @staticmethod
     async def get_qemu_version(qemu_path):
@@ -224,16 +223,19 @@ class Qemu(BaseManager):
                     log.warning("could not read {}: {}".format(version_file, e))
             return ""
         else:
-            try:
-                output = await subprocess_check_output(qemu_path, "-version", "-nographic")
-                match = re.search(r"version\s+([0-9a-z\-\.]+)", output)
-                if match:
-                    version = match.group(1)
-                    return version
-                else:
-                    raise QemuError("Could not determine the Qemu version for '{}'".format(qemu_path))
-            except (OSError, subprocess.SubprocessError) as e:
-                raise QemuError("Error while looking for the Qemu version: {}".format(e))
+            async def probe():
+                try:
+                    output = await subprocess_check_output(qemu_path, "-version", "-nographic")
+                    match = re.search(r"version\s+([0-9a-z\-\.]+)", output)
+                    if match:
+                        version = match.group(1)
+                        return version
+                    else:
+                        raise QemuError("Could not determine the Qemu version for '{}'".format(qemu_path))
+                except (OSError, subprocess.SubprocessError) as e:
+                    raise QemuError("Error while looking for the Qemu version: {}".format(e))
+
+            return await BinaryRegistry.instance().get("qemu_version", qemu_path, probe)
 
     @staticmethod
     async def _get_qemu_img_version(qemu_img_path):
@@ -243,16 +245,19 @@ class Qemu(BaseManager):
         :param qemu_img_path: path to Qemu-img executable.
         """
 
-        try:
-            output = await subprocess_check_output(qemu_img_path, "--version")
-            match = re.search(r"version\s+([0-9a-z\-\.]+)", output)
-            if match:
-                version = match.group(1)
-                return version
-            else:
-                raise QemuError("Could not determine the Qemu-img version for '{}'".format(qemu_img_path))
-        except (OSError, subprocess.SubprocessError) as e:
-            raise QemuError("Error while looking for the Qemu-img version: {}".format(e))
+        async def probe():
+            try:
+                output = await subprocess_check_output(qemu_img_path, "--version")
+                match = re.search(r"version\s+([0-9a-z\-\.]+)", output)
+                if match:
+                    version = match.group(1)
+                    return version
+                else:
+                    raise QemuError("Could not determine the Qemu-img version for '{}'".format(qemu_img_path))
+            except (OSError, subprocess.SubprocessError) as e:
+                raise QemuError("Error while looking for the Qemu-img version: {}".format(e))
+
+        return await BinaryRegistry.instance().get("qemu_img_version", qemu_img_path, probe)
 
     @staticmethod
     async def get_swtpm_version(swtpm_path):
@@ -31,7 +31,6 @@ import asyncio
 import socket
 import gns3server
 import subprocess
-import time
 import json
 import psutil
 
@@ -39,6 +38,8 @@ from gns3server.utils import parse_version, shlex_quote
 from gns3server.utils.asyncio import subprocess_check_output, cancellable_wait_run_in_executor
 from .qemu_error import QemuError
 from .utils.qcow2 import Qcow2, Qcow2Error
+from .utils.qmp import QMPClient, QMPError
+from .utils.image_cache import QemuImageCache
 from .utils.ziputils import pack_zip, unpack_zip
 from ..adapters.ethernet_adapter import EthernetAdapter
 from ..error import NodeError, ImageMissingError
@@ -87,6 +88,9 @@ class QemuVM(BaseNode):
         self._cpulimit_process = None
         self._swtpm_process = None
         self._monitor = None
+        self._qmp = None
+        self._qmp_lock = asyncio.Lock()
+        self._vm_status = None
         self._stdout_file = ""
         self._qemu_img_stdout_file = ""
         self._execute_lock = asyncio.Lock()
@@ -1221,7 +1225,7 @@ class QemuVM(BaseNode):
 
                     if self.on_close == "save_vm_state":
                         await self._control_vm("stop")
-                        await self._control_vm("savevm GNS3_SAVED_STATE")
+                        await self._control_vm("savevm GNS3_SAVED_STATE", timeout=120)
                         wait_for_savevm = 120
                         while wait_for_savevm:
                             await asyncio.sleep(1)
@@ -1247,6 +1251,7 @@ class QemuVM(BaseNode):
                         if self._process.returncode is None:
                             log.warning('QEMU VM "{}" PID={} is still running'.format(self._name, self._process.pid))
             self._process = None
+            await self._close_qmp_client()
             self._stop_cpulimit()
             self._stop_swtpm()
             if self.on_close != "save_vm_state":
@@ -1254,111 +1259,92 @@ class QemuVM(BaseNode):
             await self._export_config()
             await super().stop()
 
-    async def _open_qemu_monitor_connection_vm(self, timeout=10):
+    async def _qmp_client(self):
         """
-        Opens a connection to the QEMU monitor.
+        Returns the QMP client of this VM, the connection is opened
+        the first time and kept open while the VM is running.
 
-        :param timeout: timeout to connect to the monitor TCP server
-        :returns: The reader returned is a StreamReader instance; the writer is a StreamWriter instance
+        :returns: QMPClient instance or None if the connection failed
         """
 
-        begin = time.time()
-        connection_success = False
-        last_exception = None
-        reader = writer = None
-        while time.time() - begin < timeout:
-            await asyncio.sleep(0.01)
+        if not self.is_running() or not self._monitor:
+            return None
+        async with self._qmp_lock:
+            if self._qmp and self._qmp.connected:
+                return self._qmp
+            self._vm_status = None
+            self._qmp = QMPClient(self._monitor_host, self._monitor, event_callback=self._qmp_event)
             try:
-                log.debug("Connecting to Qemu monitor on {}:{}".format(self._monitor_host, self._monitor))
-                reader, writer = await asyncio.open_connection(self._monitor_host, self._monitor)
-            except (asyncio.TimeoutError, OSError) as e:
-                last_exception = e
-                continue
-            connection_success = True
-            break
+                await self._qmp.connect()
+            except QMPError as e:
+                log.warning("Could not connect to QEMU monitor: {}".format(e))
+                self._qmp = None
+                return None
+        return self._qmp
 
-        if not connection_success:
-            log.warning("Could not connect to QEMU monitor on {}:{}: {}".format(self._monitor_host, self._monitor,
-                                                                                last_exception))
-        else:
-            log.info("Connected to QEMU monitor on {}:{} after {:.4f} seconds".format(self._monitor_host, self._monitor, time.time() - begin))
-        return reader, writer
+    async def _close_qmp_client(self):
 
-    async def _control_vm(self, command, expected=None):
+        if self._qmp:
+            await self._qmp.close()
+            self._qmp = None
+        self._vm_status = None
+
+    def _qmp_event(self, event, data):
+        """
+        Updates the status of this VM when QEMU sends an event.
+
+        :param event: QMP event name
+        :param data: event data
+        """
+
+        log.debug("QEMU VM '{}' event {}: {}".format(self._name, event, data))
+        if event in ("RESUME", "WAKEUP"):
+            self._vm_status = "running"
+            if self.status != "started":
+                self.status = "started"
+        elif event in ("STOP", "SUSPEND", "SHUTDOWN", "GUEST_PANICKED"):
+            # the exact run state (paused, io-error, save-vm etc.) is queried when needed
+            self._vm_status = None
+            if event == "STOP" and self.status == "started":
+                self.status = "suspended"
+
+    async def _control_vm(self, command, expected=None, timeout=30):
         """
         Executes a command with QEMU monitor when this VM is running.
 
         :param command: QEMU monitor command (e.g. info status, stop etc.)
         :param expected: An array of expected strings
+        :param timeout: timeout to wait for the result of the command
 
-        :returns: result of the command (matched object or None)
+        :returns: result of the command (matched line or None)
         """
 
-        result = None
-        if self.is_running() and self._monitor:
-            log.info("Execute QEMU monitor command: {}".format(command))
-            reader, writer = await self._open_qemu_monitor_connection_vm()
-            if reader is None and writer is None:
-                return result
-
-            try:
-                cmd_byte = command.encode('ascii')
-                writer.write(cmd_byte + b"\n")
-                if not expected:
-                    while True:
-                        line = await asyncio.wait_for(reader.readline(), timeout=3)  # echo of the command
-                        if not line or cmd_byte in line:
-                            break
-            except asyncio.TimeoutError:
-                log.warning("Missing echo of command '{}'".format(command))
-            except OSError as e:
-                log.warning("Could not write to QEMU monitor: {}".format(e))
-                writer.close()
-                return result
-            if expected:
-                try:
-                    while result is None:
-                        line = await asyncio.wait_for(reader.readline(), timeout=3)
-                        if not line:
-                            break
-                        for expect in expected:
-                            if expect in line:
-                                result = line.decode("utf-8").strip()
-                                break
-                except asyncio.TimeoutError:
-                    log.warning("Timeout while waiting for result of command '{}'".format(command))
-                except (ConnectionError, EOFError) as e:
-                    log.warning("Could not read from QEMU monitor: {}".format(e))
-            writer.close()
-        return result
+        qmp = await self._qmp_client()
+        if qmp is None:
+            return None
+        log.info("Execute QEMU monitor command: {}".format(command))
+        try:
+            output = await qmp.execute("human-monitor-command", {"command-line": command}, timeout=timeout)
+        except QMPError as e:
+            log.warning("Could not execute QEMU monitor command '{}': {}".format(command, e))
+            return None
+        if expected and output:
+            for line in output.splitlines():
+                for expect in expected:
+                    if expect.decode("utf-8") in line:
+                        return line.strip()
+        return None
 
     async def _control_vm_commands(self, commands):
         """
-        Executes commands with QEMU monitor when this VM is running.
+        Executes commands with QEMU monitor when this VM is running,
+        the commands are sent without waiting for the previous results.
 
         :param commands: a list of QEMU monitor commands (e.g. info status, stop etc.)
         """
 
-        if self.is_running() and self._monitor:
-
-            reader, writer = await self._open_qemu_monitor_connection_vm()
-            if reader is None and writer is None:
-                return
-
-            for command in commands:
-                log.info("Execute QEMU monitor command: {}".format(command))
-                try:
-                    cmd_byte = command.encode('ascii')
-                    writer.write(cmd_byte + b"\n")
-                    while True:
-                        line = await asyncio.wait_for(reader.readline(), timeout=3)  # echo of the command
-                        if not line or cmd_byte in line:
-                            break
-                except asyncio.TimeoutError:
-                    log.warning("Missing echo of command '{}'".format(command))
-                except OSError as e:
-                    log.warning("Could not write to QEMU monitor: {}".format(e))
-            writer.close()
+        if commands:
+            await asyncio.gather(*[self._control_vm(command) for command in commands])
 
     async def close(self):
         """
@@ -1388,21 +1374,24 @@ class QemuVM(BaseNode):
         """
         Returns this VM suspend status.
 
+        The status is queried once and then kept up to date by the QMP events.
         Status are extracted from:
-          https://github.com/qemu/qemu/blob/master/qapi-schema.json#L152
+          https://github.com/qemu/qemu/blob/master/qapi/run-state.json
 
         :returns: status (string)
         """
 
-        result = await self._control_vm("info status", [
-            b"debug", b"inmigrate", b"internal-error", b"io-error",
-            b"paused", b"postmigrate", b"prelaunch", b"finish-migrate",
-            b"restore-vm", b"running", b"save-vm", b"shutdown", b"suspended",
-            b"watchdog", b"guest-panicked"
-        ])
-        if result is None:
-            return result
-        status = result.rsplit(' ', 1)[1]
+        qmp = await self._qmp_client()
+        if qmp is None:
+            return None
+        if self._vm_status is None:
+            try:
+                result = await qmp.execute("query-status")
+            except QMPError as e:
+                log.warning("Could not get QEMU VM status: {}".format(e))
+                return None
+            self._vm_status = result.get("status")
+        status = self._vm_status
         if status == "running" or status == "prelaunch":
             self.status = "started"
         elif status == "suspended":
@@ -1736,7 +1725,7 @@ class QemuVM(BaseNode):
     def _monitor_options(self):
 
         if self._monitor:
-            return ["-monitor", "tcp:{}:{},server,nowait".format(self._monitor_host, self._monitor)]
+            return ["-qmp", "tcp:{}:{},server,nowait".format(self._monitor_host, self._monitor)]
         else:
             return []
 
@@ -1766,19 +1755,67 @@ class QemuVM(BaseNode):
         log.info("{} returned with {}".format(self._get_qemu_img(), retcode))
         return retcode
 
-    async def _find_disk_file_format(self, disk):
+    async def _qemu_img_info(self, disk):
+        """
+        Returns the information about a disk image given by qemu-img info,
+        the result is cached until the disk image is modified.
+
+        Only the shared images are cached, the disks in the working directory
+        of the VM (linked clones) are written by this VM (savevm, snapshots...).
+
+        :param disk: path to the disk image
+        :returns: dictionary
+        """
 
         qemu_img_path = self._get_qemu_img()
-        try:
+
+        async def info():
             output = await subprocess_check_output(qemu_img_path, "info", "--output=json", disk)
+            if not output:
+                return {}
+            return json.loads(output)
+
+        if os.path.abspath(disk).startswith(os.path.join(os.path.abspath(self.working_dir), "")):
+            return await info()
+        return await QemuImageCache.instance().get("info", disk, info)
+
+    async def _find_disk_file_format(self, disk):
+
+        try:
+            json_data = await self._qemu_img_info(disk)
         except subprocess.SubprocessError as e:
             raise QemuError("Error received while checking Qemu disk format: {}".format(e))
-        if output:
-            try:
-                json_data = json.loads(output)
-            except ValueError as e:
-                raise QemuError("Invalid JSON data returned by qemu-img: {}".format(e))
-            return json_data.get("format")
+        except ValueError as e:
+            raise QemuError("Invalid JSON data returned by qemu-img: {}".format(e))
+        return json_data.get("format")
+
+    async def _check_disk_image(self, disk_image):
+        """
+        Checks a disk image for corruption and tries to repair it. The image is only
+        checked once until it is modified, even if several VMs start at the same time.
+
+        :param disk_image: path to the disk image
+        """
+
+        qemu_img_path = self._get_qemu_img()
+
+        async def check():
+            retcode = await self._qemu_img_exec([qemu_img_path, "check", disk_image])
+            if retcode == 3:
+                # image has leaked clusters, but is not corrupted, let's try to fix it
+                log.warning("Qemu image {} has leaked clusters".format(disk_image))
+                if await self._qemu_img_exec([qemu_img_path, "check", "-r", "leaks", "{}".format(disk_image)]) == 3:
+                    self.project.emit("log.warning", {"message": "Qemu image '{}' has leaked clusters and could not be fixed".format(disk_image)})
+            elif retcode == 2:
+                # image is corrupted, let's try to fix it
+                log.warning("Qemu image {} is corrupted".format(disk_image))
+                if await self._qemu_img_exec([qemu_img_path, "check", "-r", "all", "{}".format(disk_image)]) == 2:
+                    self.project.emit("log.warning", {"message": "Qemu image '{}' is corrupted and could not be fixed".format(disk_image)})
+            # ignore retcode == 1.  One reason is that the image is encrypted and there is no encrypt.key-secret available
+            return retcode
+
+        # only keep the result of images which are consistent
+        return await QemuImageCache.instance().get("check", disk_image, check, cacheable=lambda retcode: retcode in (0, 1))
 
     async def _create_linked_clone(self, disk_name, disk_image, disk):
 
@@ -1950,18 +1987,7 @@ class QemuVM(BaseNode):
             else:
                 try:
                     # check for corrupt disk image
-                    retcode = await self._qemu_img_exec([qemu_img_path, "check", disk_image])
-                    if retcode == 3:
-                        # image has leaked clusters, but is not corrupted, let's try to fix it
-                        log.warning("Qemu image {} has leaked clusters".format(disk_image))
-                        if await self._qemu_img_exec([qemu_img_path, "check", "-r", "leaks", "{}".format(disk_image)]) == 3:
-                            self.project.emit("log.warning", {"message": "Qemu image '{}' has leaked clusters and could not be fixed".format(disk_image)})
-                    elif retcode == 2:
-                        # image is corrupted, let's try to fix it
-                        log.warning("Qemu image {} is corrupted".format(disk_image))
-                        if await self._qemu_img_exec([qemu_img_path, "check", "-r", "all", "{}".format(disk_image)]) == 2:
-                            self.project.emit("log.warning", {"message": "Qemu image '{}' is corrupted and could not be fixed".format(disk_image)})
-                    # ignore retcode == 1.  One reason is that the image is encrypted and there is no encrypt.key-secret available
+                    await self._check_disk_image(disk_image)
                 except (OSError, subprocess.SubprocessError) as e:
                     stdout = self.read_qemu_img_stdout()
                     raise QemuError("Could not check '{}' disk image: {}\n{}".format(disk_name, e, stdout))
@@ -1972,16 +1998,17 @@ class QemuVM(BaseNode):
                     # create the disk
                     await self._create_linked_clone(disk_name, disk_image, disk)
                 else:
-                    backing_file_format = await self._find_disk_file_format(disk_image)
-                    if not backing_file_format:
-                        raise QemuError("Could not detect format for disk image: {}".format(disk_image))
                     # Rebase the image. This is in case the base image moved to a different directory,
                     # which will be the case if we imported a portable project.  This uses
                     # get_abs_image_path(hdX_disk_image) and ignores the old base path embedded
                     # in the qcow2 file itself.
                     try:
                         qcow2 = Qcow2(disk)
-                        await qcow2.rebase(qemu_img_path, disk_image, backing_file_format)
+                        if qcow2.backing_file != Qcow2.backing_options(disk_image)[0]:
+                            backing_file_format = await self._find_disk_file_format(disk_image)
+                            if not backing_file_format:
+                                raise QemuError("Could not detect format for disk image: {}".format(disk_image))
+                            await qcow2.rebase(qemu_img_path, disk_image, backing_file_format)
                     except (Qcow2Error, OSError) as e:
                         raise QemuError("Could not use qcow2 disk image '{}' for {}: {}".format(disk_image, disk_name, e))
 
@@ -2379,30 +2406,27 @@ class QemuVM(BaseNode):
                     disk = disk_image
                 if not os.path.exists(disk):
                     continue
-                output = await subprocess_check_output(qemu_img_path, "info", "--output=json", disk)
-                if output:
-                    try:
-                        json_data = json.loads(output)
-                    except ValueError as e:
-                        raise QemuError("Invalid JSON data returned by qemu-img while looking for the Qemu VM saved state snapshot: {}".format(e))
-                    if "snapshots" in json_data:
-                        for snapshot in json_data["snapshots"]:
-                            if snapshot["name"] == snapshot_name:
-                                # delete the snapshot
-                                command = [qemu_img_path, "snapshot", "-d", snapshot_name, disk]
-                                retcode = await self._qemu_img_exec(command)
-                                if retcode:
-                                    stdout = self.read_qemu_img_stdout()
-                                    log.warning("Could not delete saved VM state from disk {}: {}".format(disk, stdout))
-                                else:
-                                    log.info("Deleted saved VM state from disk {}".format(disk))
+                try:
+                    json_data = await self._qemu_img_info(disk)
+                except ValueError as e:
+                    raise QemuError("Invalid JSON data returned by qemu-img while looking for the Qemu VM saved state snapshot: {}".format(e))
+                if "snapshots" in json_data:
+                    for snapshot in json_data["snapshots"]:
+                        if snapshot["name"] == snapshot_name:
+                            # delete the snapshot
+                            command = [qemu_img_path, "snapshot", "-d", snapshot_name, disk]
+                            retcode = await self._qemu_img_exec(command)
+                            if retcode:
+                                stdout = self.read_qemu_img_stdout()
+                                log.warning("Could not delete saved VM state from disk {}: {}".format(disk, stdout))
+                            else:
+                                log.info("Deleted saved VM state from disk {}".format(disk))
             except subprocess.SubprocessError as e:
                 raise QemuError("Error while looking for the Qemu VM saved state snapshot: {}".format(e))
 
     async def _saved_state_option(self, snapshot_name="GNS3_SAVED_STATE"):
 
         drives = ["a", "b", "c", "d"]
-        qemu_img_path = self._get_qemu_img()
         for disk_index, drive in enumerate(drives):
             disk_image = getattr(self, "_hd{}_disk_image".format(drive))
             if not disk_image:
@@ -2414,19 +2438,17 @@ class QemuVM(BaseNode):
                     disk = disk_image
                 if not os.path.exists(disk):
                     continue
-                output = await subprocess_check_output(qemu_img_path, "info", "--output=json", disk)
-                if output:
-                    try:
-                        json_data = json.loads(output)
-                    except ValueError as e:
-                        raise QemuError("Invalid JSON data returned by qemu-img while looking for the Qemu VM saved state snapshot: {}".format(e))
-                    if "snapshots" in json_data:
-                        for snapshot in json_data["snapshots"]:
-                            if snapshot["name"] == snapshot_name:
-                                log.info('QEMU VM "{name}" [{id}] VM saved state detected (snapshot name: {snapshot})'.format(name=self._name,
-                                                                                                                              id=self.id,
-                                                                                                                              snapshot=snapshot_name))
-                                return ["-loadvm", snapshot_name.replace(",", ",,")]
+                try:
+                    json_data = await self._qemu_img_info(disk)
+                except ValueError as e:
+                    raise QemuError("Invalid JSON data returned by qemu-img while looking for the Qemu VM saved state snapshot: {}".format(e))
+                if "snapshots" in json_data:
+                    for snapshot in json_data["snapshots"]:
+                        if snapshot["name"] == snapshot_name:
+                            log.info('QEMU VM "{name}" [{id}] VM saved state detected (snapshot name: {snapshot})'.format(name=self._name,
+                                                                                                                          id=self.id,
+                                                                                                                          snapshot=snapshot_name))
+                            return ["-loadvm", snapshot_name.replace(",", ",,")]
 
             except subprocess.SubprocessError as e:
                 raise QemuError("Error while looking for the Qemu VM saved state snapshot: {}".format(e))
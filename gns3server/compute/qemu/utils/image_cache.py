@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import asyncio
+
+import logging
+log = logging.getLogger(__name__)
+
+# maximum number of images with cached results
+MAX_ENTRIES = 1024
+
+
+class QemuImageCache:
+    """
+    Compute wide cache of the qemu-img results (check, info) for disk images.
+
+    Results are bound to the path, size, modification time and inode of the
+    image: they are discarded as soon as the image is modified. Concurrent
+    requests for the same result share a single qemu-img execution.
+    """
+
+    def __init__(self):
+
+        self._entries = {}  # path => (signature, {kind: result})
+        self._in_flight = {}  # (kind, path, signature) => future
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def instance(cls):
+        """
+        Singleton to return only one instance of QemuImageCache.
+
+        :returns: instance of QemuImageCache
+        """
+
+        if not hasattr(cls, "_instance") or cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def _signature(path):
+
+        st = os.stat(path)
+        return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+    def stats(self):
+
+        return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses}
+
+    def clear(self):
+
+        self._entries = {}
+
+    async def get(self, kind, path, func, cacheable=None):
+        """
+        Returns a cached result or computes it.
+
+        :param kind: result type (e.g. check or info)
+        :param path: path of the disk image
+        :param func: coroutine function computing the result
+        :param cacheable: function telling if a result can be kept, all results are kept by default
+        :returns: result
+        """
+
+        path = os.path.abspath(path)
+        signature = self._signature(path)
+        entry = self._entries.get(path)
+        if entry and entry[0] == signature and kind in entry[1]:
+            self._hits += 1
+            return entry[1][kind]
+
+        key = (kind, path, signature)
+        future = self._in_flight.get(key)
+        if future is not None:
+            self._hits += 1
+            return await asyncio.shield(future)
+
+        self._misses += 1
+        future = asyncio.ensure_future(func())
+        self._in_flight[key] = future
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            del self._in_flight[key]
+
+        try:
+            new_signature = self._signature(path)
+        except OSError:
+            return result
+        # do not keep a result if the image has been modified (e.g. repaired) meanwhile
+        if new_signature == signature and (cacheable is None or cacheable(result)):
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != signature:
+                entry = (signature, {})
+                self._entries.pop(path, None)
+                self._entries[path] = entry
+                if len(self._entries) > MAX_ENTRIES:
+                    # forget the least recently added image
+                    del self._entries[next(iter(self._entries))]
+            entry[1][kind] = result
+        elif path in self._entries and self._entries[path][0] != new_signature:
+            del self._entries[path]
+        return result
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import time
+import asyncio
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class QMPError(Exception):
+    pass
+
+
+class QMPClient:
+    """
+    Client for the QEMU Machine Protocol (QMP).
+
+    A single connection is kept open for the life of the VM, the capabilities
+    are negotiated once and commands are pipelined: each command has an id
+    and its response is matched by a reader task which also delivers the
+    asynchronous events (STOP, RESUME, SHUTDOWN etc.) to a callback.
+
+    :param host: QMP server host
+    :param port: QMP server port
+    :param event_callback: function called with the event name and data
+    """
+
+    def __init__(self, host, port, event_callback=None):
+
+        self._host = host
+        self._port = port
+        self._event_callback = event_callback
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._pending = {}
+        self._next_id = 0
+        self._version = None
+
+    @property
+    def connected(self):
+
+        return self._reader_task is not None and not self._reader_task.done()
+
+    @property
+    def version(self):
+        """
+        :returns: QEMU version announced in the QMP greeting
+        """
+
+        return self._version
+
+    async def connect(self, timeout=10):
+        """
+        Connects to the QMP server and negotiates the capabilities.
+        QEMU may not be listening yet just after its start, the connection
+        is retried with an increasing delay until the timeout.
+
+        :param timeout: timeout to connect to the QMP server
+        """
+
+        begin = time.time()
+        delay = 0.01
+        last_exception = None
+        while True:
+            try:
+                self._reader, self._writer = await asyncio.open_connection(self._host, self._port)
+                break
+            except OSError as e:
+                last_exception = e
+            if time.time() - begin >= timeout:
+                raise QMPError("Could not connect to QMP server on {}:{}: {}".format(self._host, self._port, last_exception))
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+        try:
+            greeting = await asyncio.wait_for(self._read_message(), timeout=timeout)
+            if "QMP" not in greeting:
+                raise QMPError("Invalid QMP greeting: {}".format(greeting))
+            self._version = greeting["QMP"].get("version", {}).get("qemu")
+            self._reader_task = asyncio.ensure_future(self._read_messages())
+            await self.execute("qmp_capabilities", timeout=timeout)
+        except (asyncio.TimeoutError, OSError, ValueError, QMPError) as e:
+            await self.close()
+            raise QMPError("Could not negotiate QMP capabilities with {}:{}: {}".format(self._host, self._port, e))
+        log.info("Connected to QMP server on {}:{} after {:.4f} seconds".format(self._host, self._port, time.time() - begin))
+
+    async def _read_message(self):
+
+        line = await self._reader.readline()
+        if not line:
+            raise QMPError("Connection closed by the QMP server")
+        return json.loads(line.decode("utf-8"))
+
+    async def _read_messages(self):
+        """
+        Dispatches the responses and events until the connection is closed.
+        """
+
+        try:
+            while True:
+                message = await self._read_message()
+                if "event" in message:
+                    if self._event_callback:
+                        try:
+                            self._event_callback(message["event"], message.get("data", {}))
+                        except Exception as e:
+                            log.error("Error while handling QMP event {}: {}".format(message["event"], e), exc_info=1)
+                    continue
+                future = self._pending.pop(message.get("id"), None)
+                if future is None or future.done():
+                    # response of a command which has timed out
+                    continue
+                if "error" in message:
+                    future.set_exception(QMPError(message["error"].get("desc", "Unknown QMP error")))
+                else:
+                    future.set_result(message.get("return"))
+        except (QMPError, OSError, ValueError) as e:
+            log.debug("QMP connection to {}:{} closed: {}".format(self._host, self._port, e))
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(QMPError("Connection closed by the QMP server"))
+            self._pending = {}
+
+    async def execute(self, command, arguments=None, timeout=30):
+        """
+        Executes a QMP command. Several commands can be sent without waiting
+        for the previous ones to complete.
+
+        :param command: QMP command name
+        :param arguments: Dictionary of command arguments
+        :param timeout: timeout to wait for the response
+        :returns: value returned by the command
+        """
+
+        if not self.connected:
+            raise QMPError("Not connected to the QMP server")
+        self._next_id += 1
+        command_id = self._next_id
+        message = {"execute": command, "id": command_id}
+        if arguments:
+            message["arguments"] = arguments
+        future = asyncio.get_running_loop().create_future()
+        self._pending[command_id] = future
+        try:
+            self._writer.write(json.dumps(message).encode("utf-8") + b"\n")
+            await self._writer.drain()
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise QMPError("Timeout while waiting for the result of QMP command '{}'".format(command))
+        except OSError as e:
+            raise QMPError("Could not send QMP command '{}': {}".format(command, e))
+        finally:
+            self._pending.pop(command_id, None)
+
+    async def close(self):
+
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+        self._reader = None
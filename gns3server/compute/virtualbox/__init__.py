@@ -22,6 +22,7 @@ VirtualBox server module.
 import os
 import re
 import sys
+import time
 import shutil
 import asyncio
 import subprocess
@@ -33,6 +34,9 @@ from ..base_manager import BaseManager
 from .virtualbox_vm import VirtualBoxVM
 from .virtualbox_error import VirtualBoxError
 
+# time in seconds the VM inventory entries are valid
+VM_INVENTORY_TTL = 30
+
 
 class VirtualBox(BaseManager):
 
@@ -42,7 +46,10 @@ class VirtualBox(BaseManager):
 
         super().__init__()
         self._vboxmanage_path = None
-        self._execute_lock = asyncio.Lock()
+        self._execute_semaphore = None
+        self._vm_locks = {}
+        self._vm_inventory = {}
+        self._system_properties = None
 
     @property
     def vboxmanage_path(self):
@@ -94,12 +101,49 @@ class VirtualBox(BaseManager):
         self._vboxmanage_path = vboxmanage_path
         return vboxmanage_path
 
-    async def execute(self, subcommand, args, timeout=60):
+    async def execute(self, subcommand, args, timeout=60, vm_key=None):
+        """
+        Executes a VBoxManage command.
+
+        :param subcommand: VBoxManage sub-command
+        :param args: command arguments
+        :param timeout: how long to wait for VBoxManage
+        :param vm_key: UUID of the VM the command operates on, None if the command is not specific to a VM
+
+        :returns: result of the command
+        """
 
-        # We use a lock prevent parallel execution due to strange errors
-        # reported by a user and reproduced by us.
+        # Commands on the same VM are serialized to prevent the strange errors
+        # reported by a user and reproduced by us when VBoxManage runs in parallel.
         # https://github.com/GNS3/gns3-gui/issues/261
-        async with self._execute_lock:
+        if vm_key is None:
+            return await self._execute(subcommand, args, timeout)
+
+        vm_lock = self._vm_locks.get(vm_key)
+        if vm_lock is None:
+            vm_lock = self._vm_locks[vm_key] = {"lock": asyncio.Lock(), "users": 0}
+        vm_lock["users"] += 1
+        try:
+            async with vm_lock["lock"]:
+                try:
+                    return await self._execute(subcommand, args, timeout)
+                finally:
+                    if subcommand not in ("showvminfo", "getextradata", "guestproperty"):
+                        # the VM may have been modified
+                        self.invalidate_vm_inventory(vm_key)
+        finally:
+            vm_lock["users"] -= 1
+            if vm_lock["users"] == 0:
+                # forget the lock once no command is running or waiting for this VM
+                del self._vm_locks[vm_key]
+
+    async def _execute(self, subcommand, args, timeout):
+
+        if self._execute_semaphore is None:
+            max_processes = self.config.get_section_config("VirtualBox").getint("vboxmanage_max_processes", 4)
+            self._execute_semaphore = asyncio.Semaphore(max(max_processes, 1))
+
+        async with self._execute_semaphore:
             vboxmanage_path = self.vboxmanage_path
             if not vboxmanage_path:
                 vboxmanage_path = self.find_vboxmanage()
@@ -133,6 +177,40 @@ class VirtualBox(BaseManager):
 
             return stdout_data.decode("utf-8", errors="ignore").splitlines()
 
+    async def get_system_properties(self):
+        """
+        Returns the VirtualBox system properties, they are cached once valid.
+
+        :returns: dict of properties
+        """
+
+        if self._system_properties is not None:
+            return self._system_properties
+
+        system_properties = {}
+        properties = await self.execute("list", ["systemproperties"])
+        for prop in properties:
+            try:
+                name, value = prop.split(':', 1)
+            except ValueError:
+                continue
+            system_properties[name.strip()] = value.strip()
+        if "API version" in system_properties:
+            self._system_properties = system_properties
+        return system_properties
+
+    def invalidate_vm_inventory(self, vm_key=None):
+        """
+        Forgets the cached information about a VM.
+
+        :param vm_key: VM UUID, all the VMs if None
+        """
+
+        if vm_key is None:
+            self._vm_inventory.clear()
+        else:
+            self._vm_inventory.pop(vm_key, None)
+
     async def _find_inaccessible_hdd_files(self):
         """
         Finds inaccessible disk files (to clean up the VirtualBox media manager)
@@ -175,12 +253,44 @@ class VirtualBox(BaseManager):
                 log.warning("Could not close VirtualBox VM disk file {}: {}".format(os.path.basename(hdd_file), e))
                 continue
 
+    async def _get_vm_inventory_entry(self, uuid, allow_clone):
+        """
+        Returns the cached information about a VM.
+
+        :param uuid: VM UUID
+        :param allow_clone: the amount of RAM is needed for clones
+
+        :returns: dict with the clone flag and the amount of RAM (None if unknown)
+        """
+
+        entry = self._vm_inventory.get(uuid)
+        if entry is None or time.monotonic() - entry["time"] > VM_INVENTORY_TTL:
+            extra_data = await self.execute("getextradata", [uuid, "GNS3/Clone"], vm_key=uuid)
+            clone = len(extra_data) > 0 and extra_data[0].strip() == "Value: yes"
+            entry = {"time": time.monotonic(), "clone": clone, "ram": None}
+            self._vm_inventory[uuid] = entry
+
+        if entry["ram"] is None and (allow_clone or not entry["clone"]):
+            # get the amount of RAM
+            info_results = await self.execute("showvminfo", [uuid, "--machinereadable"], vm_key=uuid)
+            ram = 0
+            for info in info_results:
+                try:
+                    name, value = info.split('=', 1)
+                    if name.strip() == "memory":
+                        ram = int(value.strip())
+                        break
+                except ValueError:
+                    continue
+            entry["ram"] = ram
+        return entry
+
     async def list_vms(self, allow_clone=False):
         """
         Gets VirtualBox VM list.
         """
 
-        vbox_vms = []
+        vms = []
         result = await self.execute("list", ["vms"])
         for line in result:
             if len(line) == 0 or line[0] != '"' or line[-1:] != "}":
@@ -192,20 +302,19 @@ class VirtualBox(BaseManager):
             uuid = match.group(2)
             if vmname == "<inaccessible>":
                 continue  # ignore inaccessible VMs
-            extra_data = await self.execute("getextradata", [uuid, "GNS3/Clone"])
-            if allow_clone or len(extra_data) == 0 or not extra_data[0].strip() == "Value: yes":
-                # get the amount of RAM
-                info_results = await self.execute("showvminfo", [uuid, "--machinereadable"])
-                ram = 0
-                for info in info_results:
-                    try:
-                        name, value = info.split('=', 1)
-                        if name.strip() == "memory":
-                            ram = int(value.strip())
-                            break
-                    except ValueError:
-                        continue
-                vbox_vms.append({"vmname": vmname, "ram": ram})
+            vms.append((vmname, uuid))
+
+        # forget the VMs which have been deleted
+        uuids = set(uuid for _, uuid in vms)
+        for uuid in list(self._vm_inventory):
+            if uuid not in uuids:
+                del self._vm_inventory[uuid]
+
+        entries = await asyncio.gather(*[self._get_vm_inventory_entry(uuid, allow_clone) for _, uuid in vms])
+        vbox_vms = []
+        for (vmname, _), entry in zip(vms, entries):
+            if allow_clone or not entry["clone"]:
+                vbox_vms.append({"vmname": vmname, "ram": entry["ram"]})
         return vbox_vms
 
     @staticmethod
@@ -25,6 +25,7 @@ import sys
 import json
 import uuid
 import shlex
+import time
 import shutil
 import asyncio
 import tempfile
@@ -46,6 +47,9 @@ if sys.platform.startswith('win'):
 import logging
 log = logging.getLogger(__name__)
 
+# time in seconds the info returned by showvminfo is shared by the queries on a VM
+VM_INFO_TTL = 0.5
+
 
 class VirtualBoxVM(BaseNode):
 
@@ -60,6 +64,9 @@ class VirtualBoxVM(BaseNode):
         self._uuid = None  # UUID in VirtualBox
         self._maximum_adapters = 8
         self._system_properties = {}
+        self._vm_info = None
+        self._vm_info_future = None
+        self._vm_info_generation = 0
         self._telnet_server = None
         self._local_udp_tunnels = {}
 
@@ -102,13 +109,35 @@ class VirtualBoxVM(BaseNode):
 
     async def _get_system_properties(self):
 
-        properties = await self.manager.execute("list", ["systemproperties"])
-        for prop in properties:
-            try:
-                name, value = prop.split(':', 1)
-            except ValueError:
-                continue
-            self._system_properties[name.strip()] = value.strip()
+        self._system_properties.update(await self.manager.get_system_properties())
+
+    async def _execute(self, subcommand, args):
+        """
+        Executes a VBoxManage command on this VM.
+
+        :param subcommand: VBoxManage sub-command
+        :param args: command arguments
+
+        :returns: result of the command
+        """
+
+        # the commands are serialized on the VM UUID, the name is only used
+        # before the UUID is known when the node is created
+        vm_key = self._uuid or self._vmname
+        if subcommand == "showvminfo":
+            return await self.manager.execute(subcommand, args, vm_key=vm_key)
+        # the command may change the VM info
+        self._invalidate_vm_info()
+        try:
+            return await self.manager.execute(subcommand, args, vm_key=vm_key)
+        finally:
+            self._invalidate_vm_info()
+
+    def _invalidate_vm_info(self):
+
+        self._vm_info = None
+        self._vm_info_future = None
+        self._vm_info_generation += 1
 
     async def _get_vm_state(self):
         """
@@ -117,12 +146,9 @@ class VirtualBoxVM(BaseNode):
         :returns: state (string)
         """
 
-        results = await self.manager.execute("showvminfo", [self._uuid, "--machinereadable"])
-        for info in results:
-            if '=' in info:
-                name, value = info.split('=', 1)
-                if name == "VMState":
-                    return value.strip('"')
+        vm_info = await self._get_vm_info()
+        if "VMState" in vm_info:
+            return vm_info["VMState"]
         raise VirtualBoxError("Could not get VM state for {}".format(self._vmname))
 
     async def _control_vm(self, params):
@@ -135,7 +161,7 @@ class VirtualBoxVM(BaseNode):
         """
 
         args = shlex.split(params)
-        result = await self.manager.execute("controlvm", [self._uuid] + args)
+        result = await self._execute("controlvm", [self._uuid] + args)
         return result
 
     async def _modify_vm(self, params):
@@ -146,7 +172,7 @@ class VirtualBoxVM(BaseNode):
         """
 
         args = shlex.split(params)
-        await self.manager.execute("modifyvm", [self._uuid] + args)
+        await self._execute("modifyvm", [self._uuid] + args)
 
     async def _check_duplicate_linked_clone(self):
         """
@@ -198,7 +224,7 @@ class VirtualBoxVM(BaseNode):
         if self.linked_clone:
             if self.id and os.path.isdir(os.path.join(self.working_dir, self._vmname)):
                 self._patch_vm_uuid()
-                await self.manager.execute("registervm", [self._linked_vbox_file()])
+                await self._execute("registervm", [self._linked_vbox_file()])
                 await self._refresh_vm_uuid()
                 await self._reattach_linked_hdds()
 
@@ -258,6 +284,10 @@ class VirtualBoxVM(BaseNode):
             machine.set("uuid", "{" + self.id + "}")
             tree.write(linked_vbox_file)
 
+        if machine is not None:
+            # the VM is registered with this UUID, its commands are serialized on it
+            self._uuid = self.id
+
     async def check_hw_virtualization(self):
         """
         Returns either hardware virtualization is activated or not.
@@ -287,11 +317,11 @@ class VirtualBoxVM(BaseNode):
 
         # VM must be powered off to start it
         if vm_state == "saved":
-            result = await self.manager.execute("guestproperty", ["get", self._uuid, "SavedByGNS3"])
+            result = await self._execute("guestproperty", ["get", self._uuid, "SavedByGNS3"])
             if result == ['No value set!']:
                 raise VirtualBoxError("VirtualBox VM was not saved from GNS3")
             else:
-                await self.manager.execute("guestproperty", ["delete", self._uuid, "SavedByGNS3"])
+                await self._execute("guestproperty", ["delete", self._uuid, "SavedByGNS3"])
         elif vm_state == "poweroff":
             await self._set_network_options()
             await self._set_serial_console()
@@ -304,15 +334,15 @@ class VirtualBoxVM(BaseNode):
         args = [self._uuid]
         if self._headless:
             args.extend(["--type", "headless"])
-        result = await self.manager.execute("startvm", args)
+        result = await self._execute("startvm", args)
         self.status = "started"
         log.info("VirtualBox VM '{name}' [{id}] started".format(name=self.name, id=self.id))
         log.debug("Start result: {}".format(result))
 
         # add a guest property to let the VM know about the GNS3 name
-        await self.manager.execute("guestproperty", ["set", self._uuid, "NameInGNS3", self.name])
+        await self._execute("guestproperty", ["set", self._uuid, "NameInGNS3", self.name])
         # add a guest property to let the VM know about the GNS3 project directory
-        await self.manager.execute("guestproperty", ["set", self._uuid, "ProjectDirInGNS3", self.working_dir])
+        await self._execute("guestproperty", ["set", self._uuid, "ProjectDirInGNS3", self.working_dir])
 
         await self._start_ubridge()
         for adapter_number in range(0, self._adapters):
@@ -342,7 +372,7 @@ class VirtualBoxVM(BaseNode):
 
             if self.on_close == "save_vm_state":
                 # add a guest property to know the VM has been saved
-                await self.manager.execute("guestproperty", ["set", self._uuid, "SavedByGNS3", "yes"])
+                await self._execute("guestproperty", ["set", self._uuid, "SavedByGNS3", "yes"])
                 result = await self._control_vm("savestate")
                 self.status = "stopped"
                 log.debug("Stop result: {}".format(result))
@@ -571,7 +601,7 @@ class VirtualBoxVM(BaseNode):
                     continue
 
             log.info("VirtualBox VM '{name}' [{id}] unregistering".format(name=self.name, id=self.id))
-            await self.manager.execute("unregistervm", [self._name])
+            await self._execute("unregistervm", [self._uuid])
 
         log.info("VirtualBox VM '{name}' [{id}] closed".format(name=self.name, id=self.id))
         self._closed = True
@@ -778,17 +808,33 @@ class VirtualBoxVM(BaseNode):
         """
         Returns this VM info.
 
+        The info is shared by the queries made within VM_INFO_TTL seconds
+        as long as no other command is sent for this VM.
+
         :returns: dict of info
         """
 
+        if self._vm_info is not None:
+            vmname, timestamp, vm_info = self._vm_info
+            if vmname == self._vmname and time.monotonic() - timestamp < VM_INFO_TTL:
+                return dict(vm_info)
+
+        if self._vm_info_future is None or self._vm_info_future.done():
+            self._vm_info_future = asyncio.ensure_future(self._query_vm_info(self._vmname, self._vm_info_generation))
+        return dict(await asyncio.shield(self._vm_info_future))
+
+    async def _query_vm_info(self, vmname, generation):
+
         vm_info = {}
-        results = await self.manager.execute("showvminfo", ["--machinereadable", "--", self._vmname])  # "--" is to protect against vm names containing the "-" character
+        results = await self._execute("showvminfo", ["--machinereadable", "--", vmname])  # "--" is to protect against vm names containing the "-" character
         for info in results:
             try:
                 name, value = info.split('=', 1)
             except ValueError:
                 continue
             vm_info[name.strip('"')] = value.strip('"')
+        if generation == self._vm_info_generation:
+            self._vm_info = (vmname, time.monotonic(), vm_info)
         return vm_info
 
     def _get_pipe_name(self):
@@ -819,7 +865,7 @@ class VirtualBoxVM(BaseNode):
         # set server mode with a pipe on the first serial port
         pipe_name = self._get_pipe_name()
         args = [self._uuid, "--uartmode1", "server", pipe_name]
-        await self.manager.execute("modifyvm", args)
+        await self._execute("modifyvm", args)
 
     async def _storage_attach(self, params):
         """
@@ -829,7 +875,7 @@ class VirtualBoxVM(BaseNode):
         """
 
         args = shlex.split(params)
-        await self.manager.execute("storageattach", [self._uuid] + args)
+        await self._execute("storageattach", [self._uuid] + args)
 
     async def _get_nic_attachements(self, maximum_adapters):
         """
@@ -894,7 +940,7 @@ class VirtualBoxVM(BaseNode):
                 if adapter_type == "Paravirtualized Network (virtio-net)":
                     vbox_adapter_type = "virtio"
                 args = [self._uuid, "--nictype{}".format(adapter_number + 1), vbox_adapter_type]
-                await self.manager.execute("modifyvm", args)
+                await self._execute("modifyvm", args)
 
                 if isinstance(nio, NIOUDP):
                     log.debug("setting UDP params on adapter {}".format(adapter_number))
@@ -931,7 +977,7 @@ class VirtualBoxVM(BaseNode):
                 gns3_snapshot_exists = True
 
         if not gns3_snapshot_exists:
-            result = await self.manager.execute("snapshot", [self._uuid, "take", "GNS3 Linked Base for clones"])
+            result = await self._execute("snapshot", [self._uuid, "take", "GNS3 Linked Base for clones"])
             log.debug("GNS3 snapshot created: {}".format(result))
 
         args = [self._uuid,
@@ -945,19 +991,19 @@ class VirtualBoxVM(BaseNode):
                 self.working_dir,
                 "--register"]
 
-        result = await self.manager.execute("clonevm", args)
+        result = await self._execute("clonevm", args)
         log.debug("VirtualBox VM: {} cloned".format(result))
 
         # refresh the UUID and vmname to match with the clone
         self._vmname = self._name
         await self._refresh_vm_uuid()
-        await self.manager.execute("setextradata", [self._uuid, "GNS3/Clone", "yes"])
+        await self._execute("setextradata", [self._uuid, "GNS3/Clone", "yes"])
 
         # We create a reset snapshot in order to simplify life of user who want to rollback their VM
         # Warning: Do not document this it's seem buggy we keep it because Raizo students use it.
         try:
             args = [self._uuid, "take", "reset"]
-            result = await self.manager.execute("snapshot", args)
+            result = await self._execute("snapshot", args)
             log.debug("Snapshot 'reset' created: {}".format(result))
         # It seem sometimes this failed due to internal race condition of Vbox
         # we have no real explanation of this.
@@ -38,6 +38,7 @@ from .vpcs_error import VPCSError
 from ..adapters.ethernet_adapter import EthernetAdapter
 from ..nios.nio_udp import NIOUDP
 from ..base_node import BaseNode
+from ..binary_registry import BinaryRegistry
 
 
 import logging
@@ -203,7 +204,12 @@ class VPCSVM(BaseNode):
         Checks if the VPCS executable version is >= 0.8b or == 0.6.1.
         """
         try:
-            output = await subprocess_check_output(self._vpcs_path(), "-v", cwd=self.working_dir)
+            vpcs_path = self._vpcs_path()
+
+            async def probe():
+                return await subprocess_check_output(vpcs_path, "-v", cwd=self.working_dir)
+
+            output = await BinaryRegistry.instance().get("vpcs_version", vpcs_path, probe)
             match = re.search(r"Welcome to Virtual PC Simulator, version ([0-9a-z\.]+)", output)
             if match:
                 version = match.group(1)
@@ -19,6 +19,7 @@ import os
 import sys
 import json
 import uuid
+import asyncio
 import socket
 import shutil
 import aiohttp
@@ -42,6 +43,7 @@ from .notification import Notification
 from .symbols import Symbols
 from ..version import __version__
 from .topology import load_topology
+from .project_catalog import ProjectCatalog, list_project_files
 from .gns3vm import GNS3VM
 from .gns3vm.gns3_vm_error import GNS3VMError
 
@@ -153,6 +155,7 @@ class Controller:
             except (ComputeError, aiohttp.web.HTTPError, OSError):
                 pass
         await self.gns3vm.exit_vm()
+        self._notification.close()
         #self.save()
         self._computes = {}
         self._projects = {}
@@ -277,18 +280,20 @@ class Controller:
         projects_path = os.path.expanduser(server_config.get("projects_path", "~/GNS3/projects"))
         os.makedirs(projects_path, exist_ok=True)
         try:
-            for project_path in os.listdir(projects_path):
-                project_dir = os.path.join(projects_path, project_path)
-                if os.path.isdir(project_dir):
-                    for file in os.listdir(project_dir):
-                        if file.endswith(".gns3"):
-                            try:
-                                await self.load_project(os.path.join(project_dir, file), load=False)
-                            except (aiohttp.web.HTTPConflict, aiohttp.web.HTTPNotFound, NotImplementedError):
-                                pass  # Skip not compatible projects
+            paths = await asyncio.get_event_loop().run_in_executor(None, list_project_files, projects_path)
         except OSError as e:
             log.error(str(e))
+            return
 
+        # only the projects added or modified since the last start are read,
+        # their topology is validated when they are opened
+        catalog = ProjectCatalog(projects_path)
+        projects = await catalog.read_projects(paths, workers=int(server_config.get("project_load_workers", 1)))
+        for path, settings in projects.items():
+            try:
+                await self.load_project(path, load=False, settings=settings)
+            except (aiohttp.web.HTTPConflict, aiohttp.web.HTTPNotFound, NotImplementedError):
+                pass  # Skip not compatible projects
 
     @staticmethod
     def install_resource_files(dst_path, resource_name, upgrade_resources=True):
@@ -533,19 +538,24 @@ class Controller:
         if project.id in self._projects:
             del self._projects[project.id]
 
-    async def load_project(self, path, load=True):
+    async def load_project(self, path, load=True, settings=None):
         """
         Load a project from a .gns3
 
         :param path: Path of the .gns3
         :param load: Load the topology
+        :param settings: Settings of the project read from the project catalog,
+        the .gns3 is read and validated if they are not provided
         """
 
-        topo_data = load_topology(path)
-        topo_data.pop("topology")
-        topo_data.pop("version")
-        topo_data.pop("revision")
-        topo_data.pop("type")
+        if settings is None:
+            topo_data = load_topology(path)
+            topo_data.pop("topology")
+            topo_data.pop("version")
+            topo_data.pop("revision")
+            topo_data.pop("type")
+        else:
+            topo_data = dict(settings)
 
         if topo_data["project_id"] in self._projects:
             project = self._projects[topo_data["project_id"]]
@@ -17,6 +17,7 @@
 
 import ipaddress
 import aiohttp
+import aiohttp.web
 import asyncio
 import socket
 import json
@@ -31,6 +32,7 @@ if sys.version_info >= (3, 11):
 else:
     from async_timeout import timeout as asynctimeout
 
+from ..config import Config
 from ..utils import parse_version
 from ..utils.asyncio import locking
 from ..controller.controller_error import ControllerError
@@ -65,6 +67,7 @@ class Compute:
     def __init__(self, compute_id, controller=None, protocol="http", host="localhost",
                  port=3080, user=None, password=None, name=None, console_host=None, ssl_context=None):
         self._http_session = None
+        self._stream_session = None
         assert controller is not None
         log.info("Create compute %s", compute_id)
 
@@ -99,11 +102,38 @@ class Compute:
 
     def _session(self):
         if self._http_session is None or self._http_session.closed is True:
-            self._http_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=None,
-                                                                                      force_close=True,
-                                                                                      ssl_context=self._ssl_context))
+            # connections are kept alive and reused to avoid a TCP (and TLS) handshake for each query
+            server_config = Config.instance().get_section_config("Server")
+            limit = server_config.getint("compute_connection_pool_size", 100)
+            if server_config.getboolean("keep_alive", True):
+                connector = aiohttp.TCPConnector(limit=limit,
+                                                 keepalive_timeout=server_config.getfloat("compute_keep_alive_timeout", 15),
+                                                 ssl_context=self._ssl_context)
+            else:
+                connector = aiohttp.TCPConnector(limit=limit, force_close=True, ssl_context=self._ssl_context)
+            self._http_session = aiohttp.ClientSession(connector=connector)
         return self._http_session
 
+    def stream_session(self):
+        """
+        HTTP session for the long-lived requests (notification and packet capture
+        streams, file transfers), they don't count in the limit of the pooled
+        connections so they cannot starve the API calls.
+
+        :returns: HTTP session without connection limit
+        """
+
+        if self._stream_session is None or self._stream_session.closed is True:
+            connector = aiohttp.TCPConnector(limit=0, force_close=True, ssl_context=self._ssl_context)
+            self._stream_session = aiohttp.ClientSession(connector=connector)
+        return self._stream_session
+
+    async def _close_sessions(self):
+
+        for session in (self._http_session, self._stream_session):
+            if session and not session.closed:
+                await session.close()
+
     #def __del__(self):
     #
     #   if self._http_session:
@@ -137,9 +167,11 @@ class Compute:
         """
         self._last_error = msg
 
+    @locking
     async def interfaces(self):
         """
-        Get the list of network on compute
+        Get the list of network on compute, the list is cached until
+        the controller reconnects to the compute
         """
         if not self._interfaces_cache:
             response = await self.get("/network/interfaces")
@@ -153,8 +185,7 @@ class Compute:
         # It's important to set user and password at the same time
         if "user" in kwargs or "password" in kwargs:
             self._set_auth(kwargs.get("user", self._user), kwargs.get("password", self._password))
-        if self._http_session and not self._http_session.closed:
-            await self._http_session.close()
+        await self._close_sessions()
         self._connected = False
         self._controller.notification.controller_emit("compute.updated", self.__json__())
         self._controller.save()
@@ -162,8 +193,7 @@ class Compute:
     async def close(self):
 
         self._connected = False
-        if self._http_session and not self._http_session.closed:
-            await self._http_session.close()
+        await self._close_sessions()
         try:
             if self._notifications:
                 await self._notifications
@@ -420,6 +450,8 @@ class Compute:
                     self._controller.notification.controller_emit("log.warning", {"message": msg})
 
             self._notifications = asyncio.gather(self._connect_notification())
+            # the network configuration of the compute could have changed while disconnected
+            self._interfaces_cache = None
             self._connected = True
             self._connection_failure = 0
             self._last_error = None
@@ -432,7 +464,7 @@ class Compute:
 
         ws_url = self._getUrl("/notifications/ws")
         try:
-            async with self._session().ws_connect(ws_url, auth=self._auth, heartbeat=10) as ws:
+            async with self.stream_session().ws_connect(ws_url, auth=self._auth, heartbeat=10) as ws:
                 log.info("Connected to compute '{}' WebSocket '{}'".format(self._id, ws_url))
                 async for response in ws:
                     if response.type == aiohttp.WSMsgType.TEXT:
@@ -443,8 +475,7 @@ class Compute:
                         if action == "ping":
                             self._cpu_usage_percent = event["cpu_usage_percent"]
                             self._memory_usage_percent = event["memory_usage_percent"]
-                            #FIXME: slow down number of compute events
-                            self._controller.notification.controller_emit("compute.updated", self.__json__())
+                            await self._controller.notification.coalesce(("compute.updated", self.id), self._emit_updated)
                         else:
                             await self._controller.notification.dispatch(action, event, project_id=project_id, compute_id=self.id)
                     else:
@@ -469,6 +500,13 @@ class Compute:
         self._memory_usage_percent = None
         self._controller.notification.controller_emit("compute.updated", self.__json__())
 
+    def _emit_updated(self, event=None):
+        """
+        Send the compute.updated notification with the current compute state
+        """
+
+        self._controller.notification.controller_emit("compute.updated", self.__json__())
+
     def _getUrl(self, path):
         host = self._host
         # IPV6
@@ -505,15 +543,17 @@ class Compute:
                 elif isinstance(data, aiohttp.streams.StreamReader) or isinstance(data, bytes):
                     chunked = True
                     headers['content-type'] = 'application/octet-stream'
-                # If the data is an open file we will iterate on it
-                elif isinstance(data, io.BufferedIOBase):
+                # If the data is an open file or an async generator we will iterate on it
+                elif isinstance(data, io.BufferedIOBase) or hasattr(data, "__aiter__"):
                     chunked = True
                     headers['content-type'] = 'application/octet-stream'
                 else:
                     data = json.dumps(data).encode("utf-8")
         try:
             log.debug("Attempting request to compute: {method} {url} {headers}".format(method=method, url=url, headers=headers))
-            response = await self._session().request(method, url, headers=headers, data=data, auth=self._auth, chunked=chunked, timeout=timeout)
+            # the requests without timeout can last for a long time and don't use the pooled connections
+            session = self._session() if timeout is not None else self.stream_session()
+            response = await session.request(method, url, headers=headers, data=data, auth=self._auth, chunked=chunked, timeout=timeout)
         except asyncio.TimeoutError:
             raise ComputeError("Timeout error for {} call to {} after {}s".format(method, url, timeout))
         except (aiohttp.ClientError, aiohttp.ServerDisconnectedError, ValueError, KeyError, socket.gaierror) as e:
@@ -63,7 +63,7 @@ async def export_project(
         raise aiohttp.web.HTTPConflict(text="Project must be stopped in order to export it")
 
     # Make sure we save the project
-    project.dump()
+    project.dump(force=True)
 
     if not os.path.exists(project._path):
         raise aiohttp.web.HTTPNotFound(text="Project could not be found at '{}'".format(project._path))
@@ -48,7 +48,7 @@ class VirtualBoxGNS3VM(BaseGNS3VM):
     async def _execute(self, subcommand, args, timeout=60):
 
         try:
-            result = await self._virtualbox_manager.execute(subcommand, args, timeout)
+            result = await self._virtualbox_manager.execute(subcommand, args, timeout, vm_key=self._vmname)
             return ("\n".join(result))
         except VirtualBoxError as e:
             raise GNS3VMError("Error while executing VBoxManage command: {}".format(e))
@@ -19,15 +19,18 @@ import os
 import sys
 import stat
 import json
+import time
 import uuid
 import shutil
+import asyncio
 import zipfile
 import aiohttp
 import aiofiles
 import itertools
 import tempfile
 
-from .topology import load_topology
+from .topology import load_topology, GNS3_FILE_FORMAT_REVISION
+from ..config import Config
 from ..utils.asyncio import wait_run_in_executor
 from ..utils.asyncio import aiozipstream
 
@@ -79,6 +82,356 @@ async def import_project(
     except KeyError:
         raise aiohttp.web.HTTPConflict(text="Cannot import project, project.gns3 file could not be found")
 
+    topology, project_name, restoring_snapshot = _load_project_file(controller, project_id, project_file, name)
+    path = _project_path(controller, project_id, location)
+
+    try:
+        with zipfile.ZipFile(stream) as zip_file:
+            await wait_run_in_executor(zip_file.extractall, path)
+            _create_symbolic_links(zip_file, path)
+    except zipfile.BadZipFile:
+        raise aiohttp.web.HTTPConflict(text="Cannot extract files from GNS3 project (invalid zip)")
+
+    topology, _ = await _update_topology(controller, project_id, path, project_name, restoring_snapshot,
+                                         reset_mac_addresses=reset_mac_addresses,
+                                         keep_compute_ids=keep_compute_ids,
+                                         auto_start=auto_start,
+                                         auto_open=auto_open,
+                                         auto_close=auto_close)
+    return await _finish_import(controller, project_id, path, topology, project_name, restoring_snapshot, reset_mac_addresses)
+
+
+async def import_project_from_stream(
+        controller,
+        project_id,
+        read,
+        location=None,
+        name=None,
+        reset_mac_addresses=False,
+        keep_compute_ids=False,
+        auto_start=False,
+        auto_open=False,
+        auto_close=True,
+        progress_callback=None
+):
+    """
+    Import a project from a zip file while it is received
+
+    The files are written to their final location as soon as they are read:
+    the files of the nodes running on a remote compute are uploaded to this
+    compute and the other files to the project directory. The images are
+    written next to their destination in the images directory under a hidden
+    name and only renamed once the project has been imported. The files read
+    before project.gns3 are handled like in import_project once the whole zip
+    file has been read.
+
+    You must handle OSError exceptions
+
+    :param controller: GNS3 Controller
+    :param project_id: ID of the project to import
+    :param read: Coroutine function returning at most n bytes of the zip file, b"" at the end
+    :param location: Directory for the project if None put in the default directory
+    :param name: Wanted project name, generate one from the .gns3 if None
+    :param reset_mac_addresses: Reset MAC addresses for each node
+    :param keep_compute_ids: keep compute IDs unchanged
+    :param progress_callback: Function called with the number of bytes and files read
+
+    :returns: Project
+    """
+
+    if location and ".gns3" in location:
+        raise aiohttp.web.HTTPConflict(text="The destination path should not contain .gns3")
+
+    created = not os.path.exists(location or os.path.join(controller.projects_directory(), project_id))
+    path = _project_path(controller, project_id, location)
+    importer = _StreamImporter(controller, project_id, path, name,
+                               reset_mac_addresses=reset_mac_addresses,
+                               keep_compute_ids=keep_compute_ids,
+                               auto_start=auto_start,
+                               auto_open=auto_open,
+                               auto_close=auto_close,
+                               progress_callback=progress_callback)
+    try:
+        return await importer.run(read)
+    except (Exception, asyncio.CancelledError):
+        importer.remove_staged_images()
+        if created:
+            # do not leave a partially imported project behind
+            await wait_run_in_executor(shutil.rmtree, path, True)
+        raise
+
+
+class _StreamImporter:
+    """
+    Import the members of a zip file while it is received.
+    """
+
+    # Maximum size of the files of remote nodes uploaded once the whole zip file has been
+    # read, the symbolic links (not uploaded) are only known at the end of the zip file
+    DEFERRED_UPLOAD_SIZE = 4096
+
+    # Maximum number of chunks waiting to be uploaded for each file
+    UPLOAD_QUEUE_SIZE = 4
+
+    # Minimum interval in seconds between two progress reports
+    PROGRESS_INTERVAL = 1
+
+    def __init__(self, controller, project_id, path, name, progress_callback=None, **options):
+
+        self._controller = controller
+        self._project_id = project_id
+        self._path = path
+        self._name = name
+        self._options = options
+        self._progress_callback = progress_callback
+        self._last_progress = 0
+        self._bytes_read = 0
+        self._files = 0
+        self._topology = None
+        self._project_name = None
+        self._restoring_snapshot = False
+        self._node_ids = {}
+        self._remote_nodes = {}
+        self._local_files = {}
+        self._uploads = []
+        self._deferred_uploads = []
+        self._staged_images = {}
+        self._upload_semaphore = _upload_semaphore()
+
+    async def run(self, read):
+        """
+        Read the zip file and import the project.
+
+        :param read: Coroutine function returning at most n bytes of the zip file
+
+        :returns: Project
+        """
+
+        async def read_and_report(size):
+            data = await read(size)
+            self._bytes_read += len(data)
+            self._report_progress()
+            return data
+
+        reader = aiozipstream.ZipStreamReader(read_and_report)
+        try:
+            try:
+                async for zinfo, data in reader:
+                    await self._import_member(zinfo, data)
+                    self._files += 1
+                    for upload in self._uploads:
+                        if upload.done() and upload.exception():
+                            raise upload.exception()
+            except zipfile.BadZipFile as e:
+                if self._files == 0:
+                    raise aiohttp.web.HTTPConflict(text="Cannot import project, not a GNS3 project (invalid zip)")
+                raise aiohttp.web.HTTPConflict(text="Cannot extract files from GNS3 project (invalid zip): {}".format(e))
+            await asyncio.gather(*self._uploads)
+        finally:
+            for upload in self._uploads:
+                upload.cancel()
+
+        if self._project_name is None:
+            raise aiohttp.web.HTTPConflict(text="Cannot import project, project.gns3 file could not be found")
+
+        # Manually create symbolic links (if any) because they are only known at the end of the zip file
+        symlinks = set()
+        for filename, external_attr in reader.external_attrs.items():
+            if stat.S_ISLNK(external_attr >> 16):
+                symlinks.add(filename)
+                symlink_path = self._local_files.get(filename)
+                if symlink_path:
+                    try:
+                        with open(symlink_path, "rb") as f:
+                            symlink_target = f.read().decode()
+                        # remove the regular file and replace it by a symbolic link
+                        os.remove(symlink_path)
+                        os.symlink(symlink_target, symlink_path)
+                    except OSError as e:
+                        raise aiohttp.web.HTTPConflict(text=f"Cannot create symbolic link: {e}")
+
+        uploads = []
+        for filename, compute, dst, data in self._deferred_uploads:
+            if filename not in symlinks:
+                uploads.append(self._upload_data(compute, dst, data))
+        await asyncio.gather(*uploads)
+
+        if self._topology is None:
+            # old topologies are converted after the extraction because the conversion moves files
+            self._topology, _ = await _update_topology(self._controller, self._project_id, self._path,
+                                                       self._project_name, self._restoring_snapshot, **self._options)
+        project = await _finish_import(self._controller, self._project_id, self._path, self._topology,
+                                       self._project_name, self._restoring_snapshot, self._options["reset_mac_addresses"],
+                                       staged_images=self._staged_images)
+        self._report_progress(force=True)
+        return project
+
+    def _report_progress(self, force=False):
+
+        if self._progress_callback and (force or time.monotonic() - self._last_progress >= self.PROGRESS_INTERVAL):
+            self._last_progress = time.monotonic()
+            self._progress_callback(self._bytes_read, self._files)
+
+    async def _import_member(self, zinfo, data):
+        """
+        Send a member of the zip file to its destination.
+        """
+
+        parts = _sanitize_path(zinfo.filename)
+        if not parts:
+            return
+
+        if parts == ["project.gns3"]:
+            project_file = b"".join([chunk async for chunk in data])
+            dst = os.path.join(self._path, "project.gns3")
+            await self._write(dst, _iterate(project_file))
+            topology, self._project_name, self._restoring_snapshot = _load_project_file(self._controller,
+                                                                                       self._project_id,
+                                                                                       project_file.decode(),
+                                                                                       self._name)
+            if topology.get("revision", 0) >= GNS3_FILE_FORMAT_REVISION:
+                self._topology, self._node_ids = await _update_topology(self._controller, self._project_id, self._path,
+                                                                        self._project_name, self._restoring_snapshot,
+                                                                        **self._options)
+                for node in self._topology["topology"]["nodes"]:
+                    if node["compute_id"] != "local":
+                        files_path = "/".join(("project-files", node["node_type"], node["node_id"]))
+                        self._remote_nodes[files_path] = self._controller.get_compute(node["compute_id"])
+            return
+
+        if parts[0] == "images" and len(parts) > 1:
+            # the images are written to the images directory under a hidden name
+            # (not listed) and renamed once the project has been imported
+            if not zinfo.is_dir():
+                dst = os.path.join(self._controller.images_path(), *parts[1:])
+                tmp = os.path.join(os.path.dirname(dst), ".{}.{}.import".format(os.path.basename(dst), self._project_id))
+                self._staged_images[tmp] = dst
+                await self._write(tmp, data)
+            return
+
+        if self._topology is not None and parts[0] == "project-files" and len(parts) > 2:
+            parts[2] = self._node_ids.get(parts[2], parts[2])
+            compute = self._remote_nodes.get("/".join(parts[:3]))
+            if compute:
+                if not zinfo.is_dir():
+                    await self._upload_member(zinfo.filename, compute, "/".join(parts), data)
+                return
+
+        dst = os.path.join(self._path, *parts)
+        if zinfo.is_dir():
+            os.makedirs(dst, exist_ok=True)
+        else:
+            self._local_files[zinfo.filename] = dst
+            await self._write(dst, data)
+
+    async def _write(self, dst, data):
+        """
+        Write data to a local file.
+        """
+
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        async with aiofiles.open(dst, "wb") as f:
+            async for chunk in data:
+                await f.write(chunk)
+
+    def remove_staged_images(self):
+        """
+        Delete the images written by an import which has failed.
+        """
+
+        for tmp in self._staged_images:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+        self._staged_images.clear()
+
+    async def _upload_member(self, filename, compute, dst, data):
+        """
+        Upload a member to a remote compute while the next members are read.
+        """
+
+        head = b""
+        try:
+            while len(head) <= self.DEFERRED_UPLOAD_SIZE:
+                head += await data.__anext__()
+        except StopAsyncIteration:
+            self._deferred_uploads.append((filename, compute, dst, head))
+            return
+
+        queue = asyncio.Queue(maxsize=self.UPLOAD_QUEUE_SIZE)
+        await self._upload_semaphore.acquire()
+        upload = asyncio.ensure_future(self._upload_queue(compute, dst, queue))
+        self._uploads.append(upload)
+        await self._feed(queue, upload, head)
+        async for chunk in data:
+            await self._feed(queue, upload, chunk)
+        await self._feed(queue, upload, None)
+
+    @staticmethod
+    async def _feed(queue, upload, chunk):
+        """
+        Wait for room in the upload queue, unless the upload has failed.
+        """
+
+        if upload.done():
+            return
+        put = asyncio.ensure_future(queue.put(chunk))
+        await asyncio.wait([put, upload], return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+
+    async def _upload_queue(self, compute, dst, queue):
+
+        async def body():
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    return
+                yield chunk
+
+        try:
+            path = "/projects/{}/files/{}".format(self._project_id, dst)
+            await compute.http_query("POST", path, body(), timeout=None)
+        finally:
+            self._upload_semaphore.release()
+
+    async def _upload_data(self, compute, dst, data):
+
+        async with self._upload_semaphore:
+            path = "/projects/{}/files/{}".format(self._project_id, dst)
+            await compute.http_query("POST", path, data, timeout=None)
+
+
+def _sanitize_path(filename):
+    """
+    Split the name of a member and remove the absolute and parent parts like ZipFile.extractall()
+    """
+
+    return [part for part in filename.replace("\\", "/").split("/") if part not in ("", os.path.curdir, os.path.pardir)]
+
+
+async def _iterate(data):
+
+    yield data
+
+
+def _upload_semaphore():
+    """
+    Limit the number of files uploaded at the same time to the computes during an import.
+    """
+
+    server_config = Config.instance().get_section_config("Server")
+    return asyncio.Semaphore(max(1, int(server_config.get("project_import_upload_concurrency", 4))))
+
+
+def _load_project_file(controller, project_id, project_file, name):
+    """
+    Read the project.gns3 file of an imported project
+
+    :returns: Tuple with the topology, the project name and True if we restore a snapshot
+    """
+
     try:
         topology = json.loads(project_file)
         # We import the project on top of an existing project (snapshots)
@@ -92,8 +445,17 @@ async def import_project(
             else:
                 project_name = controller.get_free_project_name(topology["name"])
             restoring_snapshot = False
-    except (ValueError, KeyError):
+    except (ValueError, KeyError, TypeError):
         raise aiohttp.web.HTTPConflict(text="Cannot import project, the project.gns3 file is corrupted")
+    return topology, project_name, restoring_snapshot
+
+
+def _project_path(controller, project_id, location):
+    """
+    Create the directory of an imported project
+
+    :returns: Project path
+    """
 
     if location:
         path = location
@@ -104,13 +466,27 @@ async def import_project(
         os.makedirs(path, exist_ok=True)
     except UnicodeEncodeError:
         raise aiohttp.web.HTTPConflict(text="The project name contain non supported or invalid characters")
+    return path
 
-    try:
-        with zipfile.ZipFile(stream) as zip_file:
-            await wait_run_in_executor(zip_file.extractall, path)
-            _create_symbolic_links(zip_file, path)
-    except zipfile.BadZipFile:
-        raise aiohttp.web.HTTPConflict(text="Cannot extract files from GNS3 project (invalid zip)")
+
+async def _update_topology(
+        controller,
+        project_id,
+        path,
+        project_name,
+        restoring_snapshot,
+        reset_mac_addresses=False,
+        keep_compute_ids=False,
+        auto_start=False,
+        auto_open=False,
+        auto_close=True
+):
+    """
+    Load the project.gns3 file of an imported project, regenerate the IDs,
+    choose the computes of the nodes and create the project on the remote computes
+
+    :returns: Tuple with the topology and the new IDs of the nodes indexed by their old IDs
+    """
 
     topology = load_topology(os.path.join(path, "project.gns3"))
     topology["name"] = project_name
@@ -119,9 +495,10 @@ async def import_project(
     topology["auto_open"] = auto_open
     topology["auto_close"] = auto_close
 
+    node_ids = {}
     if not restoring_snapshot:
         # Do not re-generate IDs if we are restoring a snapshot because they should be the same in a project
-        regenerate_topology_ids(topology, path, reset_mac_addresses=reset_mac_addresses)
+        node_ids = regenerate_topology_ids(topology, path, reset_mac_addresses=reset_mac_addresses)
 
     # Modify the compute id of the node depending on compute capacity
     if not keep_compute_ids:
@@ -139,14 +516,35 @@ async def import_project(
 
     compute_created = set()
     for node in topology["topology"]["nodes"]:
-        if node["compute_id"] != "local":
-            # Project created on the remote GNS3 VM?
-            if node["compute_id"] not in compute_created:
-                compute = controller.get_compute(node["compute_id"])
-                await compute.post("/projects", data={"name": project_name, "project_id": project_id,})
-                compute_created.add(node["compute_id"])
+        # Project created on the remote GNS3 VM?
+        if node["compute_id"] != "local" and node["compute_id"] not in compute_created:
+            compute = controller.get_compute(node["compute_id"])
+            await compute.post("/projects", data={"name": project_name, "project_id": project_id,})
+            compute_created.add(node["compute_id"])
+    return topology, node_ids
+
+
+async def _finish_import(controller, project_id, path, topology, project_name, restoring_snapshot, reset_mac_addresses,
+                         staged_images=None):
+    """
+    Move the files of the remote nodes to their computes, write the .gns3 file,
+    import the images and the snapshots and load the project
+
+    :param staged_images: Destinations of the images already written to the images directory, by temporary path
+
+    :returns: Project
+    """
+
+    semaphore = _upload_semaphore()
+
+    async def move_files(node):
+        async with semaphore:
+            compute = controller.get_compute(node["compute_id"])
             await _move_files_to_compute(compute, project_id, path, os.path.join("project-files", node["node_type"], node["node_id"]))
 
+    # the files of the nodes are uploaded in parallel
+    await asyncio.gather(*[move_files(node) for node in topology["topology"]["nodes"] if node["compute_id"] != "local"])
+
     # And we dump the updated.gns3
     dot_gns3_path = os.path.join(path, project_name + ".gns3")
     # We change the project_id to avoid erasing the project
@@ -158,6 +556,9 @@ async def import_project(
     images_path = os.path.join(path, "images")
     if os.path.exists(images_path):
         await _import_images(controller, images_path)
+    while staged_images:
+        tmp, dst = staged_images.popitem()
+        os.replace(tmp, dst)
 
     snapshots_path = os.path.join(path, "snapshots")
     if not restoring_snapshot and os.path.exists(snapshots_path):
@@ -166,6 +567,7 @@ async def import_project(
     project = await controller.load_project(dot_gns3_path, load=False)
     return project
 
+
 def _create_symbolic_links(zip_file, path):
     """
     Manually create symbolic links (if any) because ZipFile does not support it.
@@ -193,6 +595,8 @@ def regenerate_topology_ids(topology, new_project_path, reset_mac_addresses=Fals
     :param topology: topology content
     :param new_project_path: new project path
     :param reset_mac_addresses: reset MAC addresses
+
+    :returns: New IDs of the nodes indexed by their old IDs
     """
 
     # Generate new node IDs
@@ -220,6 +624,8 @@ def regenerate_topology_ids(topology, new_project_path, reset_mac_addresses=Fals
     for drawing in topology["topology"]["drawings"]:
         drawing["drawing_id"] = str(uuid.uuid4())
 
+    return node_old_to_new
+
 def _move_node_file(path, old_id, new_id):
     """
     Move a file from a node when changing its id
@@ -244,15 +650,23 @@ async def _move_files_to_compute(compute, project_id, directory, files_path):
     Move files to a remote compute
     """
 
+    semaphore = _upload_semaphore()
+
+    async def upload(path, dst):
+        async with semaphore:
+            await _upload_file(compute, project_id, path, dst)
+
     location = os.path.join(directory, files_path)
     if os.path.exists(location):
+        uploads = []
         for (dirpath, dirnames, filenames) in os.walk(location, followlinks=False):
             for filename in filenames:
                 path = os.path.join(dirpath, filename)
                 if os.path.islink(path):
                     continue
                 dst = os.path.relpath(path, directory)
-                await _upload_file(compute, project_id, path, dst)
+                uploads.append(upload(path, dst))
+        await asyncio.gather(*uploads)
         await wait_run_in_executor(shutil.rmtree, os.path.join(directory, files_path))
 
 
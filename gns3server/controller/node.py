@@ -22,10 +22,12 @@ import html
 import copy
 import uuid
 import os
+import aiofiles
 
 from .compute import ComputeConflict, ComputeError
 from .ports.port_factory import PortFactory, StandardPortFactory, DynamipsPortFactory
-from ..utils.images import images_directories
+from ..utils.images import images_directories, image_chunk_size, image_hashes, update_image_hashes, record_image_checksums
+from ..utils.asyncio import wait_run_in_executor
 from ..utils import macaddress_to_int, int_to_macaddress
 from ..config import Config
 
@@ -593,14 +595,30 @@ class Node:
             if os.path.exists(image):
                 self.project.emit_notification("log.info", {"message": "Uploading missing image {}".format(img)})
                 try:
-                    with open(image, 'rb') as f:
-                        await self._compute.post("/{}/images/{}".format(self._node_type, os.path.basename(img)), data=f, timeout=None)
+                    await self._compute.post("/{}/images/{}".format(self._node_type, os.path.basename(img)), data=self._read_image(image), timeout=None)
                 except OSError as e:
                     raise aiohttp.web.HTTPConflict(text="Can't upload {}: {}".format(image, str(e)))
                 self.project.emit_notification("log.info", {"message": "Upload finished for {}".format(img)})
                 return True
         return False
 
+    async def _read_image(self, path):
+        """
+        Read an image by chunks for an upload, the checksums of the image
+        are computed at the same time and saved once the image has been read.
+        """
+
+        chunk_size = image_chunk_size()
+        hashes = image_hashes()
+        async with aiofiles.open(path, 'rb') as f:
+            while True:
+                chunk = await f.read(chunk_size)
+                if not chunk:
+                    break
+                update_image_hashes(hashes, chunk)
+                yield chunk
+        await wait_run_in_executor(record_image_checksums, path, hashes)
+
     async def dynamips_auto_idlepc(self):
         """
         Compute the idle PC for a dynamips node
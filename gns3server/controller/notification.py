@@ -16,10 +16,16 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
+import asyncio
+import inspect
 import aiohttp
 from contextlib import contextmanager
 
-from ..notification_queue import NotificationQueue
+from ..config import Config
+from ..notification_queue import NotificationQueue, NotificationMessage
+
+import logging
+log = logging.getLogger(__name__)
 
 
 class Notification:
@@ -31,6 +37,33 @@ class Notification:
         self._controller = controller
         self._project_listeners = {}
         self._controller_listeners = []
+        self._dropped = 0
+
+        # coalescing of the notifications received in bursts
+        self._coalesce_pending = {}
+        self._coalesce_last_sent = {}
+        # sequence number of the last event received and of the last event sent for each key
+        self._coalesce_seq = 0
+        self._coalesce_sent_seq = {}
+        # the events of a key are sent one at a time, in order
+        self._coalesce_locks = {}
+        self._coalesce_handles = {}
+        self._coalesce_tasks = set()
+        self._coalesce_events_in = 0
+        self._coalesce_events_out = 0
+
+    def _new_queue(self):
+        """
+        Create a queue using the size and overflow policy from the configuration
+        """
+
+        server_config = Config.instance().get_section_config("Server")
+        return NotificationQueue(maxsize=server_config.getint("notification_queue_size", 1000),
+                                 overflow=server_config.get("notification_overflow_policy", "coalesce"))
+
+    def _release_queue(self, queue):
+
+        self._dropped += queue.dropped
 
     @contextmanager
     def project_queue(self, project_id):
@@ -39,13 +72,14 @@ class Notification:
 
         Use it with Python with
         """
-        queue = NotificationQueue()
+        queue = self._new_queue()
         self._project_listeners.setdefault(project_id, set())
         self._project_listeners[project_id].add(queue)
         try:
             yield queue
         finally:
             self._project_listeners[project_id].remove(queue)
+            self._release_queue(queue)
 
     @contextmanager
     def controller_queue(self):
@@ -54,12 +88,125 @@ class Notification:
 
         Use it with Python with
         """
-        queue = NotificationQueue()
+        queue = self._new_queue()
         self._controller_listeners.append(queue)
         try:
             yield queue
         finally:
             self._controller_listeners.remove(queue)
+            self._release_queue(queue)
+
+    def stats(self):
+        """
+        :returns: Statistics about the listeners queues
+        """
+
+        queues = list(self._controller_listeners)
+        for project_listeners in self._project_listeners.values():
+            queues.extend(project_listeners)
+        return {
+            "listeners": len(queues),
+            "queued": sum(queue.qsize() for queue in queues),
+            "max_queue_depth": max([queue.qsize() for queue in queues], default=0),
+            "dropped": self._dropped + sum(queue.dropped for queue in queues),
+            "coalesced": sum(queue.coalesced for queue in queues),
+            "coalesce_events_in": self._coalesce_events_in,
+            "coalesce_events_out": self._coalesce_events_out
+        }
+
+    async def coalesce(self, key, callback, event=None):
+        """
+        Call a callback at most once per notification_coalesce_interval for a key (for example
+        a node or a compute ID). Events received in between are merged and the callback
+        is called with the latest state at the end of the interval.
+
+        :param key: Key identifying the entity
+        :param callback: Function or coroutine function called with the merged event
+        :param event: Event dictionary (optional)
+        """
+
+        self._coalesce_events_in += 1
+        self._coalesce_seq += 1
+        seq = self._coalesce_seq
+        interval = float(Config.instance().get_section_config("Server").get("notification_coalesce_interval", 0.5))
+        pending = self._coalesce_pending.get(key)
+        if pending is not None:
+            # an event for this key is already waiting, merge it with the new one
+            if event is not None:
+                pending["event"].update(event)
+            pending["callback"] = callback
+            pending["seq"] = seq
+            return
+
+        loop = asyncio.get_event_loop()
+        now = loop.time()
+        last_sent = self._coalesce_last_sent.get(key)
+        if interval <= 0 or last_sent is None or now - last_sent >= interval:
+            if len(self._coalesce_last_sent) > 1000:
+                self._coalesce_prune(now, interval)
+            self._coalesce_last_sent[key] = now
+            await self._coalesce_send(key, seq, callback, event)
+        else:
+            self._coalesce_pending[key] = {"callback": callback, "event": dict(event) if event is not None else None, "seq": seq}
+            self._coalesce_handles[key] = loop.call_at(last_sent + interval, self._coalesce_schedule_flush, key)
+
+    def _coalesce_prune(self, now, interval):
+        """
+        Forget the keys sent before the interval, they don't delay the next events anymore
+        """
+
+        self._coalesce_last_sent = {k: t for k, t in self._coalesce_last_sent.items() if now - t < interval}
+        for key in list(self._coalesce_sent_seq):
+            lock = self._coalesce_locks.get(key)
+            if key not in self._coalesce_last_sent and key not in self._coalesce_pending and (lock is None or not lock.locked()):
+                del self._coalesce_sent_seq[key]
+                self._coalesce_locks.pop(key, None)
+
+    def _coalesce_schedule_flush(self, key):
+
+        self._coalesce_handles.pop(key, None)
+        task = asyncio.ensure_future(self._coalesce_flush(key))
+        self._coalesce_tasks.add(task)
+        task.add_done_callback(self._coalesce_flush_done)
+
+    def _coalesce_flush_done(self, task):
+
+        self._coalesce_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.error("Could not send a coalesced notification", exc_info=task.exception())
+
+    async def _coalesce_flush(self, key):
+
+        pending = self._coalesce_pending.pop(key, None)
+        if pending is None:
+            return
+        self._coalesce_last_sent[key] = asyncio.get_event_loop().time()
+        await self._coalesce_send(key, pending["seq"], pending["callback"], pending["event"])
+
+    async def _coalesce_send(self, key, seq, callback, event):
+
+        lock = self._coalesce_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if seq <= self._coalesce_sent_seq.get(key, 0):
+                # a more recent state has already been sent
+                return
+            self._coalesce_sent_seq[key] = seq
+            self._coalesce_events_out += 1
+            result = callback(event)
+            if inspect.isawaitable(result):
+                await result
+
+    def close(self):
+        """
+        Cancel the coalesced events waiting to be sent
+        """
+
+        for handle in self._coalesce_handles.values():
+            handle.cancel()
+        self._coalesce_handles = {}
+        for task in self._coalesce_tasks:
+            task.cancel()
+        self._coalesce_pending = {}
 
     def controller_emit(self, action, event):
         """
@@ -81,8 +228,9 @@ class Notification:
             except TypeError:  # If we receive a mock as an event it will raise TypeError when using json dump
                 pass
 
+        message = NotificationMessage(action, event)
         for controller_listener in self._controller_listeners:
-            controller_listener.put_nowait((action, event, {}))
+            controller_listener.put_nowait(message)
 
     def project_has_listeners(self, project_id):
         """
@@ -101,21 +249,29 @@ class Notification:
         :param compute_id: Compute id of the sender
         """
         if action == "node.updated":
-            try:
-                # Update controller node data and send the event node.updated
-                project = self._controller.get_project(event["project_id"])
-                node = project.get_node(event["node_id"])
-                await node.parse_node_response(event)
-
-                self.project_emit("node.updated", node.__json__())
-            except (aiohttp.web.HTTPNotFound, aiohttp.web.HTTPForbidden):  # Project closing
-                return
+            await self.coalesce(("node.updated", event.get("node_id")), self._node_updated, event)
         elif action == "ping":
              event["compute_id"] = compute_id
              self.project_emit(action, event)
         else:
             self.project_emit(action, event, project_id)
 
+    async def _node_updated(self, event):
+        """
+        Update controller node data and send the event node.updated
+
+        :param event: Event received from the compute
+        """
+
+        try:
+            project = self._controller.get_project(event["project_id"])
+            node = project.get_node(event["node_id"])
+            await node.parse_node_response(event)
+
+            self.project_emit("node.updated", node.__json__())
+        except (aiohttp.web.HTTPNotFound, aiohttp.web.HTTPForbidden):  # Project closing
+            return
+
     def project_emit(self, action, event, project_id=None):
         """
         Send a notification to clients scoped by projects
@@ -154,8 +310,9 @@ class Notification:
             project_listeners = self._project_listeners[project_id]
         except KeyError:
             return
+        message = NotificationMessage(action, event)
         for listener in project_listeners:
-            listener.put_nowait((action, event, {}))
+            listener.put_nowait(message)
 
     def _send_event_to_all_projects(self, action, event):
         """
@@ -165,6 +322,7 @@ class Notification:
         :param action: Action name
         :param event: Event to send
         """
+        message = NotificationMessage(action, event)
         for project_listeners in self._project_listeners.values():
             for listener in project_listeners:
-                listener.put_nowait((action, event, {}))
+                listener.put_nowait(message)
@@ -28,6 +28,7 @@ import aiofiles
 import tempfile
 import zipfile
 import pathlib
+import threading
 
 from uuid import UUID, uuid4
 
@@ -36,11 +37,13 @@ from .compute import ComputeError
 from .snapshot import Snapshot
 from .drawing import Drawing
 from .topology import project_to_topology, load_topology
+from .topology_cache import TopologyCache
 from .udp_link import UDPLink
+from ..compute.port_manager import MAX_UDP_PORTS_ALLOCATION
 from ..config import Config
 from ..utils.path import check_path_allowed, get_default_project_directory
 from ..utils.application_id import get_next_application_id
-from ..utils.asyncio.pool import Pool
+from ..utils.asyncio.pool import KeyPool
 from ..utils.asyncio import locking
 from ..utils.asyncio import aiozipstream
 from ..utils.asyncio import wait_run_in_executor
@@ -99,6 +102,14 @@ class Project:
 
         self._loading = False
         self._closing = False
+        self._open_metrics = {}
+
+        # state of the delayed topology writes
+        self._dump_handle = None
+        self._dump_generation = 0
+        self._dumped_generation = 0
+        self._dump_lock = threading.Lock()
+        self._validated_topology = {}
 
         # Disallow overwrite of existing project
         if project_id is None and path is not None:
@@ -128,9 +139,13 @@ class Project:
         # At project creation we write an empty .gns3 with the meta
         if not os.path.exists(self._topology_file()):
             assert self._status != "closed"
-            self.dump()
+            self.dump(force=True)
 
         self._iou_id_lock = asyncio.Lock()
+        # one lock per compute, the project is created on the computes in parallel
+        self._project_creation_locks = {}
+        # UDP ports reserved in advance on each compute for the links
+        self._udp_port_reservations = {}
 
         log.debug('Project "{name}" [{id}] loaded'.format(name=self.name, id=self._id))
         self.emit_controller_notification("project.created", self.__json__())
@@ -531,10 +546,19 @@ class Project:
         node = await self.add_node(compute, name, node_id, node_type=node_type, **template)
         return node
 
-    async def _create_node(self, compute, name, node_id, node_type=None, **kwargs):
+    async def _create_project_on_compute(self, compute):
+        """
+        Create the project on a compute if it doesn't exist yet.
+
+        The operation use a lock per compute to avoid creating the project multiple
+        times when nodes are created in parallel on the same compute.
+        """
+
+        lock = self._project_creation_locks.setdefault(compute.id, asyncio.Lock())
+        async with lock:
+            if compute in self._project_created_on_compute:
+                return
 
-        node = Node(self, compute, name, node_id=node_id, node_type=node_type, **kwargs)
-        if compute not in self._project_created_on_compute:
             # For a local server we send the project path
             if compute.id == "local":
                 data = {
@@ -554,6 +578,10 @@ class Project:
             await compute.post("/projects", data=data)
             self._project_created_on_compute.add(compute)
 
+    async def _create_node(self, compute, name, node_id, node_type=None, **kwargs):
+
+        node = Node(self, compute, name, node_id=node_id, node_type=node_type, **kwargs)
+        await self._create_project_on_compute(compute)
         await node.create()
         self._nodes[node.id] = node
 
@@ -639,17 +667,10 @@ class Project:
         """
 
         try:
-            path = self._topology_file()
-            with open(path, "r") as f:
-                topology = json.load(f)
+            # the file is only parsed again when it has been modified
+            return TopologyCache.instance().get_section(self._topology_file(), section, id_key)
         except OSError as e:
             raise aiohttp.web.HTTPInternalServerError(text="Could not load topology: {}".format(e))
-
-        try:
-            data = {}
-            for elem in topology["topology"][section]:
-                data[elem[id_key]] = elem
-            return data
         except KeyError:
             raise aiohttp.web.HTTPNotFound(text="Section {} not found in the topology".format(section))
 
@@ -863,6 +884,7 @@ class Project:
             except (ComputeError, aiohttp.web.HTTPError, aiohttp.ClientError, TimeoutError):
                 pass
         self._clean_pictures()
+        self.flush()
         self._status = "closed"
         if not ignore_notification:
             self.emit_controller_notification("project.closed", self.__json__())
@@ -965,6 +987,7 @@ class Project:
         self.reset()
         self._loading = True
         self._status = "opened"
+        self._open_metrics = {}
 
         path = self._topology_file()
         if not os.path.exists(path):
@@ -999,8 +1022,10 @@ class Project:
                     setattr(self, key, val)
 
             topology = project_data["topology"]
+            begin = time.time()
             for compute in topology.get("computes", []):
                 await self.controller.add_compute(**compute)
+            self._open_metrics["computes"] = time.time() - begin
 
             # Get all compute used in the project
             # used to allocate application IDs for IOU nodes.
@@ -1009,39 +1034,23 @@ class Project:
                 if compute_id not in self._computes:
                     self._computes.append(compute_id)
 
-            for node in topology.get("nodes", []):
-                compute = self.controller.get_compute(node.pop("compute_id"))
-                name = node.pop("name")
-                node_id = node.pop("node_id", str(uuid.uuid4()))
-                await self.add_node(compute, name, node_id, dump=False, **node)
-            for link_data in topology.get("links", []):
-                if 'link_id' not in link_data.keys():
-                    # skip the link
-                    continue
-                link = await self.add_link(link_id=link_data["link_id"])
-                if "filters" in link_data:
-                    await link.update_filters(link_data["filters"])
-                if "link_style" in link_data:
-                    await link.update_link_style(link_data["link_style"])
-                for node_link in link_data.get("nodes", []):
-                    node = self.get_node(node_link["node_id"])
-                    port = node.get_port(node_link["adapter_number"], node_link["port_number"])
-                    if port is None:
-                        log.warning("Port {}/{} for {} not found".format(node_link["adapter_number"], node_link["port_number"], node.name))
-                        continue
-                    if port.link is not None:
-                        log.warning("Port {}/{} is already connected to link ID {}".format(node_link["adapter_number"], node_link["port_number"], port.link.id))
-                        continue
-                    await link.add_node(node, node_link["adapter_number"], node_link["port_number"], label=node_link.get("label"), dump=False)
-                if len(link.nodes) != 2:
-                    # a link should have 2 attached nodes, this can happen with corrupted projects
-                    await self.delete_link(link.id, force_delete=True)
+            begin = time.time()
+            await self._open_nodes(topology.get("nodes", []))
+            self._open_metrics["nodes"] = time.time() - begin
+
+            begin = time.time()
+            await self._open_links(topology.get("links", []))
+            self._open_metrics["links"] = time.time() - begin
+
+            begin = time.time()
             for drawing_data in topology.get("drawings", []):
                 await self.add_drawing(dump=False, **drawing_data)
+            self._open_metrics["drawings"] = time.time() - begin
 
-            self.dump()
+            self.dump(force=True)
         # We catch all error to be able to roll back the .gns3 to the previous state
         except Exception as e:
+            self._cancel_delayed_dump()
             for compute in list(self._project_created_on_compute):
                 try:
                     await compute.post("/projects/{}/close".format(self._id))
@@ -1065,6 +1074,11 @@ class Project:
             pass
 
         self._loading = False
+        log.info("Project '{}' opened in {:.4f} seconds ({})".format(
+            self._name,
+            sum(self._open_metrics.values()),
+            ", ".join("{}: {:.4f}s".format(phase, duration) for phase, duration in self._open_metrics.items())
+        ))
         self.emit_controller_notification("project.opened", self.__json__())
         # Should we start the nodes when project is open
         if self._auto_start:
@@ -1073,6 +1087,164 @@ class Project:
             # their project and fix it
             asyncio.ensure_future(self.start_all())
 
+    def _open_concurrency(self):
+        """
+        Maximum number of concurrent requests sent to each compute while opening the project
+        """
+
+        return max(1, int(self._config().get("project_open_concurrency", 10)))
+
+    async def _open_nodes(self, nodes):
+        """
+        Create the nodes of a topology in parallel.
+
+        :param nodes: List of nodes from the topology file
+        """
+
+        concurrency = self._open_concurrency()
+        pool = KeyPool(concurrency=lambda compute_id: concurrency)
+        node_ids = []
+        for node in nodes:
+            compute = self.controller.get_compute(node.pop("compute_id"))
+            name = node.pop("name")
+            node_id = node.pop("node_id", str(uuid.uuid4()))
+            node_ids.append(node_id)
+            pool.append([compute.id], self._open_node, compute, name, node_id, node)
+        await pool.join()
+
+        # keep the nodes in the same order as in the topology file
+        for node_id in node_ids:
+            if node_id in self._nodes:
+                self._nodes[node_id] = self._nodes.pop(node_id)
+
+    async def _open_node(self, compute, name, node_id, node_data):
+
+        await self.add_node(compute, name, node_id, dump=False, **node_data)
+
+    async def _open_links(self, links):
+        """
+        Create the links of a topology in parallel, all the nodes must exist.
+
+        :param links: List of links from the topology file
+        """
+
+        concurrency = self._open_concurrency()
+        pool = KeyPool(concurrency=lambda compute_id: concurrency)
+        used_ports = {}
+        links_to_open = []
+        for link_data in links:
+            if 'link_id' not in link_data.keys():
+                # skip the link
+                continue
+            link = await self.add_link(link_id=link_data["link_id"], dump=False)
+            if "filters" in link_data:
+                await link.update_filters(link_data["filters"])
+            if "link_style" in link_data:
+                await link.update_link_style(link_data["link_style"])
+
+            # ports are checked before the links are created in parallel
+            link_nodes = []
+            for node_link in link_data.get("nodes", []):
+                node = self.get_node(node_link["node_id"])
+                port = node.get_port(node_link["adapter_number"], node_link["port_number"])
+                if port is None:
+                    log.warning("Port {}/{} for {} not found".format(node_link["adapter_number"], node_link["port_number"], node.name))
+                    continue
+                if port.link is not None or port in used_ports:
+                    link_id = port.link.id if port.link is not None else used_ports[port]
+                    log.warning("Port {}/{} is already connected to link ID {}".format(node_link["adapter_number"], node_link["port_number"], link_id))
+                    continue
+                used_ports[port] = link.id
+                link_nodes.append((node, node_link))
+            links_to_open.append((link, link_nodes))
+
+        # reserve the UDP ports of all the links with one request per compute
+        udp_ports_count = {}
+        computes = {}
+        for _, link_nodes in links_to_open:
+            if len(link_nodes) == 2:
+                for node, _ in link_nodes:
+                    udp_ports_count[node.compute.id] = udp_ports_count.get(node.compute.id, 0) + 1
+                    computes[node.compute.id] = node.compute
+        try:
+            await asyncio.gather(*[self.reserve_udp_ports(computes[compute_id], count) for compute_id, count in udp_ports_count.items()])
+            for link, link_nodes in links_to_open:
+                pool.append([node.compute.id for node, _ in link_nodes], self._open_link, link, link_nodes)
+            await pool.join()
+        finally:
+            await self.release_udp_ports(computes)
+
+    async def reserve_udp_ports(self, compute, count):
+        """
+        Reserve UDP ports on a compute with a single request,
+        they are used by allocate_udp_port() before requesting new ones.
+
+        :param compute: Compute instance
+        :param count: Number of UDP ports to reserve
+        """
+
+        ports = self._udp_port_reservations.setdefault(compute.id, [])
+        while count > 0:
+            response = await compute.post("/projects/{}/ports/udp?count={}".format(self._id, min(count, MAX_UDP_PORTS_ALLOCATION)))
+            # older computes allocate only one port
+            udp_ports = response.json.get("udp_ports", [response.json["udp_port"]])
+            ports.extend(reversed(udp_ports))
+            count -= len(udp_ports)
+
+    async def release_udp_ports(self, computes):
+        """
+        Release the reserved UDP ports not used by the links,
+        for instance when a link could not be opened.
+
+        :param computes: Compute instances indexed by ID
+        """
+
+        reservations = self._udp_port_reservations
+        self._udp_port_reservations = {}
+        tasks = []
+        for compute_id, ports in reservations.items():
+            if ports and compute_id in computes:
+                tasks.append(self._release_udp_ports_on_compute(computes[compute_id], ports))
+        await asyncio.gather(*tasks)
+
+    async def _release_udp_ports_on_compute(self, compute, ports):
+
+        try:
+            await compute.post("/projects/{}/ports/udp/release".format(self._id), {"udp_ports": ports})
+        except (ComputeError, aiohttp.web.HTTPError, aiohttp.ClientError, OSError) as e:
+            # the ports are released anyway when the project is closed on the compute
+            log.warning("Could not release UDP ports {} on compute {}: {}".format(ports, compute.id, e))
+
+    async def allocate_udp_port(self, compute):
+        """
+        Allocate a UDP port on a compute
+
+        :param compute: Compute instance
+        :returns: UDP port number
+        """
+
+        ports = self._udp_port_reservations.get(compute.id)
+        if ports:
+            return ports.pop()
+        response = await compute.post("/projects/{}/ports/udp".format(self._id))
+        return response.json["udp_port"]
+
+    async def _open_link(self, link, link_nodes):
+
+        for node, node_link in link_nodes:
+            await link.add_node(node, node_link["adapter_number"], node_link["port_number"], label=node_link.get("label"), dump=False)
+        if len(link.nodes) != 2:
+            # a link should have 2 attached nodes, this can happen with corrupted projects
+            await self.delete_link(link.id, force_delete=True)
+
+    @property
+    def open_metrics(self):
+        """
+        :returns: Time spent in seconds by each phase of the last project opening
+        """
+
+        return self._open_metrics
+
     async def wait_loaded(self):
         """
         Wait until the project finish loading
@@ -1099,7 +1271,7 @@ class Project:
         if self._status == "closed":
             await self.open()
 
-        self.dump()
+        self.dump(force=True)
         assert self._status != "closed"
 
         try:
@@ -1231,49 +1403,172 @@ class Project:
                 return True
         return False
 
-    def dump(self):
+    def _dump_delay(self):
+        """
+        Delay in seconds used to coalesce the topology writes
+        """
+
+        return float(self._config().get("topology_dump_delay", 1))
+
+    def dump(self, force=False):
         """
         Dump topology to disk
+
+        Unless force is set, the write is delayed so successive changes
+        are saved at once and the file is written in a thread.
+
+        :param force: Write the topology immediately
+        """
+
+        self._dump_generation += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if force or loop is None or self._dump_delay() <= 0:
+            self._cancel_delayed_dump()
+            self._write_topology(self._serialize_topology(), self._dump_generation)
+        elif self._dump_handle is None:
+            self._dump_handle = loop.call_later(self._dump_delay(), self._delayed_dump)
+
+    def flush(self):
         """
+        Write the topology to disk now if there is a delayed write
+        """
+
+        if self._dump_handle is not None:
+            self.dump(force=True)
+
+    def _cancel_delayed_dump(self):
+
+        if self._dump_handle is not None:
+            self._dump_handle.cancel()
+            self._dump_handle = None
+
+    def _delayed_dump(self):
+
+        self._dump_handle = None
+        if self._status == "closed" or self._loading:
+            # the topology is written at the end of the loading
+            return
         try:
-            topo = project_to_topology(self)
-            path = self._topology_file()
-            log.debug("Write %s", path)
-            with open(path + ".tmp", "w+", encoding="utf-8") as f:
-                json.dump(topo, f, indent=4, sort_keys=True)
-            shutil.move(path + ".tmp", path)
-        except OSError as e:
-            raise aiohttp.web.HTTPInternalServerError(text="Could not write topology: {}".format(e))
+            data = self._serialize_topology()
+        except aiohttp.web.HTTPException as e:
+            log.error("Could not dump topology of project '{}': {}".format(self._name, e.text))
+            return
+        except (TypeError, ValueError) as e:
+            log.error("Could not dump topology of project '{}': {}".format(self._name, e))
+            return
+        asyncio.ensure_future(self._write_topology_in_executor(data, self._dump_generation))
+
+    def _serialize_topology(self):
+        """
+        Returns the topology serialized in JSON, the topology contains live objects
+        of the project so it must be serialized in the event loop, not in a thread.
+        """
+
+        return json.dumps(project_to_topology(self, self._validated_topology), indent=4, sort_keys=True)
+
+    async def _write_topology_in_executor(self, data, generation):
+
+        try:
+            await wait_run_in_executor(self._write_topology, data, generation)
+        except aiohttp.web.HTTPException as e:
+            log.error("Could not dump topology of project '{}': {}".format(self._name, e.text))
+        except Exception as e:
+            log.error("Could not dump topology of project '{}': {}".format(self._name, e), exc_info=1)
+
+    def _write_topology(self, data, generation):
+        """
+        Write a topology to disk, it's ignored if a more recent version has already been written.
+
+        :param data: Topology serialized in JSON
+        :param generation: Number of the dump the topology is coming from
+        """
+
+        with self._dump_lock:
+            if generation <= self._dumped_generation:
+                return
+            try:
+                path = self._topology_file()
+                log.debug("Write %s", path)
+                with open(path + ".tmp", "w+", encoding="utf-8") as f:
+                    f.write(data)
+                shutil.move(path + ".tmp", path)
+                self._dumped_generation = generation
+            except OSError as e:
+                raise aiohttp.web.HTTPInternalServerError(text="Could not write topology: {}".format(e))
+
+    def _node_concurrency(self, compute):
+        """
+        Number of nodes that can be started, stopped etc. at the same time on a compute.
+
+        The limit is reduced when the compute reports a high CPU or memory usage.
+
+        :param compute: Compute instance
+        """
+
+        maximum = max(1, int(self._config().get("node_concurrency_per_compute", 5)))
+        usages = [usage for usage in (compute.cpu_usage_percent, compute.memory_usage_percent) if isinstance(usage, (int, float))]
+        if not usages:
+            return maximum
+        usage = max(usages)
+        if usage <= 50:
+            return maximum
+        if usage >= 90:
+            return 1
+        return max(1, round(maximum * (90 - usage) / 40))
+
+    async def _run_on_all_nodes(self, action, method):
+        """
+        Run an action on all nodes with a concurrency limit per compute
+        and send a progress notification each time a node is done.
+
+        :param action: Action name used in the notifications
+        :param method: Name of the node method to call
+        """
+
+        nodes = list(self.nodes.values())
+        progress = {"action": action, "total": len(nodes), "done": 0}
+
+        async def run(node):
+            error = None
+            try:
+                await getattr(node, method)()
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                progress["done"] += 1
+                self.emit_notification("nodes.progress", dict(progress, node_id=node.id, error=error))
+
+        computes = {node.compute.id: node.compute for node in nodes}
+        pool = KeyPool(concurrency=lambda compute_id: self._node_concurrency(computes[compute_id]))
+        for node in nodes:
+            pool.append([node.compute.id], run, node)
+        await pool.join()
 
     @open_required
     async def start_all(self):
         """
         Start all nodes
         """
-        pool = Pool(concurrency=3)
-        for node in self.nodes.values():
-            pool.append(node.start)
-        await pool.join()
+        await self._run_on_all_nodes("start", "start")
 
     @open_required
     async def stop_all(self):
         """
         Stop all nodes
         """
-        pool = Pool(concurrency=3)
-        for node in self.nodes.values():
-            pool.append(node.stop)
-        await pool.join()
+        await self._run_on_all_nodes("stop", "stop")
 
     @open_required
     async def suspend_all(self):
         """
         Suspend all nodes
         """
-        pool = Pool(concurrency=3)
-        for node in self.nodes.values():
-            pool.append(node.suspend)
-        await pool.join()
+        await self._run_on_all_nodes("suspend", "suspend")
 
     @open_required
     async def reset_console_all(self):
@@ -1281,10 +1576,7 @@ class Project:
         Reset console for all nodes
         """
 
-        pool = Pool(concurrency=3)
-        for node in self.nodes.values():
-            pool.append(node.reset_console)
-        await pool.join()
+        await self._run_on_all_nodes("reset_console", "reset_console")
 
     @open_required
     async def duplicate_node(self, node, x, y, z):
@@ -1344,7 +1636,8 @@ class Project:
             "nodes": len(self._nodes),
             "links": len(self._links),
             "drawings": len(self._drawings),
-            "snapshots": len(self._snapshots)
+            "snapshots": len(self._snapshots),
+            "open_metrics": self._open_metrics
         }
 
     def __json__(self):
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Catalog of the projects found in the projects directory.
+"""
+
+import os
+import json
+import asyncio
+import aiohttp
+import multiprocessing
+import concurrent.futures
+
+from .topology import load_topology_settings, GNS3_FILE_FORMAT_REVISION
+from ..version import __version__
+
+import logging
+log = logging.getLogger(__name__)
+
+# The name starts with a dot so the catalog is never listed as a project
+PROJECT_CATALOG_FILENAME = ".gns3_project_catalog.json"
+PROJECT_CATALOG_VERSION = 1
+
+
+def list_project_files(projects_path):
+    """
+    Return the .gns3 files of the projects stored in a directory
+
+    :param projects_path: Directory containing a sub-directory per project
+    :returns: List of paths
+    """
+
+    paths = []
+    for project_path in os.listdir(projects_path):
+        project_dir = os.path.join(projects_path, project_path)
+        if os.path.isdir(project_dir):
+            for file in os.listdir(project_dir):
+                if file.endswith(".gns3"):
+                    paths.append(os.path.join(project_dir, file))
+    return paths
+
+
+def read_project_entry(path):
+    """
+    Read the settings of a project and return its catalog entry,
+    this runs in a thread or in a worker process.
+
+    :param path: Path of the .gns3
+    :returns: Entry dictionary with the settings or the error
+    """
+
+    try:
+        values = {"settings": load_topology_settings(path)}
+    except aiohttp.web.HTTPException as e:
+        values = {"error": e.text}
+    except Exception as e:
+        values = {"error": "Could not load topology {}: {}".format(path, e)}
+    try:
+        # the file could have been converted from an older format
+        st = os.stat(path)
+    except OSError as e:
+        return {"error": str(e)}
+    values.update({"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino})
+    return values
+
+
+def read_project_entries(paths):
+    """
+    Return the catalog entries of a list of projects
+
+    :param paths: Paths of the .gns3 files
+    :returns: List of entries
+    """
+
+    return [read_project_entry(path) for path in paths]
+
+
+class ProjectCatalog:
+    """
+    On disk catalog of the settings (id, name, auto open...) of the projects.
+
+    An entry stays valid as long as the size, modification time and inode
+    of the .gns3 file don't change, so only new or modified projects have
+    to be read when the controller starts. The whole catalog is dropped when
+    the server is upgraded, a project rejected by an older version could be
+    supported by the new one.
+
+    :param projects_path: Directory containing the projects
+    """
+
+    def __init__(self, projects_path):
+
+        self._projects_path = projects_path
+        self._path = os.path.join(projects_path, PROJECT_CATALOG_FILENAME)
+        self._entries = {}
+        self._dirty = False
+
+    @property
+    def path(self):
+
+        return self._path
+
+    def _key(self, path):
+
+        # relative paths keep the catalog valid if the projects directory is moved
+        return os.path.relpath(path, self._projects_path)
+
+    def load(self):
+        """
+        Load the catalog from disk
+        """
+
+        try:
+            with open(self._path, encoding="utf-8") as f:
+                data = json.load(f)
+            header = (data.get("version"), data.get("gns3_version"), data.get("revision"))
+            if header != (PROJECT_CATALOG_VERSION, __version__, GNS3_FILE_FORMAT_REVISION):
+                log.debug("Ignoring project catalog {} written by GNS3 {}".format(self._path, data.get("gns3_version")))
+                return
+            self._entries = data.get("projects", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, UnicodeDecodeError, AttributeError) as e:
+            log.warning("Can't read project catalog {}: {}".format(self._path, e))
+
+    def get(self, path):
+        """
+        Return the entry of a project if its .gns3 file has not changed since it has been read
+
+        :param path: Path of the .gns3
+        :returns: Entry dictionary or None
+        """
+
+        entry = self._entries.get(self._key(path))
+        if entry is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if entry.get("size") != st.st_size or entry.get("mtime_ns") != st.st_mtime_ns or entry.get("inode") != st.st_ino:
+            return None
+        return entry
+
+    def update(self, path, entry):
+        """
+        Set the entry of a project
+
+        :param path: Path of the .gns3
+        :param entry: Entry dictionary returned by read_project_entry()
+        """
+
+        self._entries[self._key(path)] = entry
+        self._dirty = True
+
+    def save(self, paths):
+        """
+        Write the catalog on disk if it has been modified
+
+        :param paths: Paths of the .gns3 files still present, the other entries are dropped
+        """
+
+        keys = set(self._key(path) for path in paths)
+        for key in list(self._entries):
+            if key not in keys:
+                del self._entries[key]
+                self._dirty = True
+        if not self._dirty:
+            return
+        tmp_path = "{}.{}.tmp".format(self._path, os.getpid())
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": PROJECT_CATALOG_VERSION,
+                           "gns3_version": __version__,
+                           "revision": GNS3_FILE_FORMAT_REVISION,
+                           "projects": self._entries}, f)
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            # the projects directory could be read only, the projects are read again at the next start
+            log.debug("Can't write project catalog {}: {}".format(self._path, e))
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        self._dirty = False
+
+    def _lookup(self, paths):
+        """
+        Load the catalog and return the valid entries and the projects to read again
+        """
+
+        self.load()
+        entries = {}
+        outdated = []
+        for path in paths:
+            entry = self.get(path)
+            if entry is None:
+                outdated.append(path)
+            else:
+                entries[path] = entry
+        return entries, outdated
+
+    async def read_projects(self, paths, workers=1):
+        """
+        Return the settings of projects, the projects not in the catalog
+        or modified since are read in a thread, or in parallel by a pool
+        of processes if there are several workers.
+
+        :param paths: Paths of the .gns3 files
+        :param workers: Maximum number of processes
+        :returns: Dictionary of settings indexed by path, the projects that cannot be loaded are skipped
+        """
+
+        loop = asyncio.get_event_loop()
+        entries, outdated = await loop.run_in_executor(None, self._lookup, paths)
+
+        if outdated:
+            log.info("Reading {} new or modified projects".format(len(outdated)))
+            if workers > 1 and len(outdated) > 1:
+                workers = min(workers, len(outdated))
+                # one batch of projects per process to limit the exchanges between the processes
+                batches = [outdated[i::workers] for i in range(workers)]
+                # the processes are spawned, forking a process running threads is not safe
+                pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+                try:
+                    batch_results = await asyncio.gather(*[loop.run_in_executor(pool, read_project_entries, batch) for batch in batches])
+                finally:
+                    # do not block the event loop while the processes exit
+                    pool.shutdown(wait=False, cancel_futures=True)
+                outdated = [path for batch in batches for path in batch]
+                results = [entry for batch_result in batch_results for entry in batch_result]
+            else:
+                results = await loop.run_in_executor(None, read_project_entries, outdated)
+            for path, entry in zip(outdated, results):
+                if "size" in entry:
+                    self.update(path, entry)
+                entries[path] = entry
+        await loop.run_in_executor(None, self.save, paths)
+
+        projects = {}
+        for path in paths:
+            entry = entries[path]
+            if "error" in entry:
+                log.warning("Skipping project {}: {}".format(path, entry["error"]))
+            else:
+                projects[path] = entry["settings"]
+        return projects
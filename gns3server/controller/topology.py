@@ -31,6 +31,7 @@ from ..version import __version__
 from ..schemas.topology import TOPOLOGY_SCHEMA
 from ..schemas import dynamips_vm
 from ..utils.qt import qt_font_to_style
+from ..utils.json_schema import validate
 from ..compute.dynamips import PLATFORMS_DEFAULT_RAM
 
 import logging
@@ -40,26 +41,77 @@ log = logging.getLogger(__name__)
 GNS3_FILE_FORMAT_REVISION = 9
 
 
-def _check_topology_schema(topo):
-    try:
-        jsonschema.validate(topo, TOPOLOGY_SCHEMA)
+_TOPOLOGY_ITEMS_ID = {
+    "nodes": "node_id",
+    "links": "link_id",
+    "drawings": "drawing_id",
+    "computes": "compute_id"
+}
+_TOPOLOGY_ITEMS_SCHEMA = {section: TOPOLOGY_SCHEMA["properties"]["topology"]["properties"][section]["items"] for section in _TOPOLOGY_ITEMS_ID}
+
+# Schema of the topology without the nodes, links, drawings and computes items,
+# used to validate only the elements that have changed since the last dump.
+_TOPOLOGY_SHALLOW_SCHEMA = copy.deepcopy(TOPOLOGY_SCHEMA)
+for _section in _TOPOLOGY_ITEMS_ID:
+    del _TOPOLOGY_SHALLOW_SCHEMA["properties"]["topology"]["properties"][_section]["items"]
+
+# Schema of the project settings, the content of the topology is only validated when the project is opened
+_TOPOLOGY_SETTINGS_SCHEMA = copy.deepcopy(TOPOLOGY_SCHEMA)
+_TOPOLOGY_SETTINGS_SCHEMA["properties"]["topology"] = {"type": "object"}
+
+
+# Schema of the properties of the Dynamips nodes, without the
+# properties sent to compute but in an other place in topology
+_DYNAMIPS_NODE_PROPERTIES_SCHEMA = copy.deepcopy(dynamips_vm.VM_CREATE_SCHEMA)
+for _prop in ("name", "node_id"):
+    del _DYNAMIPS_NODE_PROPERTIES_SCHEMA["properties"][_prop]
+_DYNAMIPS_NODE_PROPERTIES_SCHEMA["required"] = [p for p in _DYNAMIPS_NODE_PROPERTIES_SCHEMA["required"] if p not in ("name", "node_id")]
 
-        # Check the nodes property against compute schemas
-        for node in topo["topology"].get("nodes", []):
-            schema = None
-            if node["node_type"] == "dynamips":
-                schema = copy.deepcopy(dynamips_vm.VM_CREATE_SCHEMA)
 
-            if schema:
-                # Properties send to compute but in an other place in topology
-                delete_properties = ["name", "node_id"]
-                for prop in delete_properties:
-                    del schema["properties"][prop]
-                schema["required"] = [p for p in schema["required"] if p not in delete_properties]
+def _check_topology_node_schema(node):
+    """
+    Check the node properties against compute schemas
+    """
+
+    if node["node_type"] == "dynamips":
+        validate(node.get("properties", {}), _DYNAMIPS_NODE_PROPERTIES_SCHEMA)
 
-                jsonschema.validate(node.get("properties", {}), schema)
+
+def _check_topology_schema(topo, validated=None):
+    """
+    Validate a topology.
+
+    :param topo: Topology dictionary
+    :param validated: Optional dictionary of the elements validated by a previous call,
+    only the elements that have changed are validated again and the dictionary is updated.
+    """
+
+    try:
+        if validated is None:
+            validate(topo, TOPOLOGY_SCHEMA)
+            for node in topo["topology"].get("nodes", []):
+                _check_topology_node_schema(node)
+        else:
+            validate(topo, _TOPOLOGY_SHALLOW_SCHEMA)
+            previously_validated = dict(validated)
+            validated.clear()
+            for section, id_key in _TOPOLOGY_ITEMS_ID.items():
+                for item in topo["topology"][section]:
+                    key = (section, item.get(id_key) if isinstance(item, dict) else None)
+                    previous = previously_validated.get(key)
+                    if key[1] is None or previous != item:
+                        validate(item, _TOPOLOGY_ITEMS_SCHEMA[section])
+                        if section == "nodes":
+                            _check_topology_node_schema(item)
+                        if key[1] is not None:
+                            # the items are live objects of the project, keep a copy
+                            validated[key] = copy.deepcopy(item)
+                    else:
+                        validated[key] = previous
 
     except jsonschema.ValidationError as e:
+        if validated is not None:
+            validated.clear()
         error = "Invalid data in topology file: {} in schema: {}".format(
             e.message,
             json.dumps(e.schema))
@@ -67,8 +119,9 @@ def _check_topology_schema(topo):
         raise aiohttp.web.HTTPConflict(text=error)
 
 
-def project_to_topology(project):
+def project_to_topology(project, validated=None):
     """
+    :param validated: Optional dictionary of the elements already validated (see _check_topology_schema)
     :return: A dictionary with the topology ready to dump to a .gns3
     """
     data = {
@@ -121,7 +174,7 @@ def project_to_topology(project):
                 data["topology"]["computes"].append(compute)
         elif isinstance(compute, dict):
             data["topology"]["computes"].append(compute)
-    _check_topology_schema(data)
+    _check_topology_schema(data, validated)
     return data
 
 
@@ -200,6 +253,42 @@ def load_topology(path):
     return topo
 
 
+def load_topology_settings(path):
+    """
+    Read the settings of a project (id, name, auto open...) from a topology file,
+    the nodes, links and drawings are neither converted nor validated.
+
+    Topologies created by an older version are fully loaded and converted.
+
+    :param path: Path of the .gns3
+    :returns: Dictionary of settings to create the project
+    """
+
+    log.debug("Read topology settings %s", path)
+    try:
+        with open(path, encoding="utf-8") as f:
+            topo = json.load(f)
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        raise aiohttp.web.HTTPConflict(text="Could not load topology {}: {}".format(path, str(e)))
+
+    if not isinstance(topo, dict):
+        raise aiohttp.web.HTTPConflict(text="Could not load topology {}: not a JSON object".format(path))
+
+    if topo.get("revision", 0) != GNS3_FILE_FORMAT_REVISION:
+        topo = load_topology(path)
+    else:
+        # make sure we can open a project with empty variable name
+        variables = topo.get("variables")
+        if variables:
+            topo["variables"] = [var for var in variables if var.get("name")]
+        try:
+            validate(topo, _TOPOLOGY_SETTINGS_SCHEMA)
+        except jsonschema.ValidationError as e:
+            raise aiohttp.web.HTTPConflict(text="Could not load topology {}: {}".format(path, e.message))
+
+    return {key: value for key, value in topo.items() if key not in ("topology", "version", "revision", "type")}
+
+
 def _convert_2_1_0(topo, topo_path):
     """
     Convert topologies from GNS3 2.1.x to 2.2
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Cache of the topology files of the closed projects.
+"""
+
+import os
+import json
+import collections
+
+from ..config import Config
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class TopologyCache:
+    """
+    LRU cache of the topology files of the closed projects.
+
+    The sections of a file are kept as compact JSON texts, so the file is not
+    read again and only the requested section is parsed, into new objects
+    which can be modified by the caller. An entry stays valid as long as the
+    size, modification time and inode of the file don't change. The memory
+    used by the cache is bounded by the total length of the cached texts
+    (closed_topology_cache_size option, in MB), the least recently used files
+    are dropped first.
+    """
+
+    def __init__(self, max_size=None):
+
+        if max_size is None:
+            server_config = Config.instance().get_section_config("Server")
+            max_size = int(float(server_config.get("closed_topology_cache_size", 64)) * 1024 * 1024)
+        self._max_size = max_size
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def instance():
+        """
+        Singleton to return only one instance of TopologyCache.
+
+        :returns: instance of TopologyCache
+        """
+
+        if not hasattr(TopologyCache, "_instance") or TopologyCache._instance is None:
+            TopologyCache._instance = TopologyCache()
+        return TopologyCache._instance
+
+    def get_section(self, path, section, id_key):
+        """
+        Return the elements of a section of a topology file indexed by their ID.
+
+        :param path: Path of the .gns3
+        :param section: The section name in the .gns3 (nodes, links...)
+        :param id_key: The key for the element unique id
+        :returns: Dictionary of elements, new elements are returned at each call
+        """
+
+        st = os.stat(path)
+        key = (st.st_size, st.st_mtime_ns, st.st_ino)
+        entry = self._entries.get(path)
+        if entry is not None and entry["key"] == key:
+            self._hits += 1
+            self._entries.move_to_end(path)
+        else:
+            self._misses += 1
+            with open(path, "r", encoding="utf-8") as f:
+                topology = json.load(f)
+            self.invalidate(path)
+            sections = {}
+            for name, elements in topology["topology"].items():
+                sections[name] = json.dumps(elements, separators=(",", ":"))
+            entry = {"key": key, "sections": sections, "size": sum(len(text) for text in sections.values())}
+            if 0 < entry["size"] <= self._max_size:
+                self._entries[path] = entry
+                self._size += entry["size"]
+                self._evict()
+
+        data = {}
+        for elem in json.loads(entry["sections"][section]):
+            data[elem[id_key]] = elem
+        return data
+
+    def invalidate(self, path):
+        """
+        Drop a file from the cache.
+
+        :param path: Path of the .gns3
+        """
+
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._size -= entry["size"]
+
+    def _evict(self):
+
+        while self._size > self._max_size and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._size -= entry["size"]
+            self._evictions += 1
+
+    def clear(self):
+
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self):
+        """
+        :returns: Statistics about the cache
+        """
+
+        return {
+            "entries": len(self._entries),
+            "size": self._size,
+            "max_size": self._max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions
+        }
@@ -16,6 +16,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import asyncio
 import aiohttp
 
 
@@ -55,10 +56,8 @@ class UDPLink(Link):
             raise aiohttp.web.HTTPConflict(text="Cannot get an IP address on same subnet: {}".format(e))
 
         # Reserve a UDP port on both side
-        response = await node1.compute.post("/projects/{}/ports/udp".format(self._project.id))
-        self._node1_port = response.json["udp_port"]
-        response = await node2.compute.post("/projects/{}/ports/udp".format(self._project.id))
-        self._node2_port = response.json["udp_port"]
+        self._node1_port, self._node2_port = await asyncio.gather(self._project.allocate_udp_port(node1.compute),
+                                                                  self._project.allocate_udp_port(node2.compute))
 
         node1_filters = {}
         node2_filters = {}
@@ -68,7 +67,7 @@ class UDPLink(Link):
         elif filter_node == node2:
             node2_filters = self.get_active_filters()
 
-        # Create the tunnel on both side
+        # Create the tunnel on both side at the same time
         self._link_data.append({
             "lport": self._node1_port,
             "rhost": node2_host,
@@ -77,8 +76,6 @@ class UDPLink(Link):
             "filters": node1_filters,
             "suspend": self._suspended
         })
-        await node1.post("/adapters/{adapter_number}/ports/{port_number}/nio".format(adapter_number=adapter_number1, port_number=port_number1), data=self._link_data[0], timeout=120)
-
         self._link_data.append({
             "lport": self._node2_port,
             "rhost": node1_host,
@@ -87,12 +84,19 @@ class UDPLink(Link):
             "filters": node2_filters,
             "suspend": self._suspended
         })
-        try:
-            await node2.post("/adapters/{adapter_number}/ports/{port_number}/nio".format(adapter_number=adapter_number2, port_number=port_number2), data=self._link_data[1], timeout=120)
-        except Exception as e:
-            # We clean the first NIO
-            await node1.delete("/adapters/{adapter_number}/ports/{port_number}/nio".format(adapter_number=adapter_number1, port_number=port_number1), timeout=120)
-            raise e
+        nio1_path = "/adapters/{adapter_number}/ports/{port_number}/nio".format(adapter_number=adapter_number1, port_number=port_number1)
+        nio2_path = "/adapters/{adapter_number}/ports/{port_number}/nio".format(adapter_number=adapter_number2, port_number=port_number2)
+        results = await asyncio.gather(node1.post(nio1_path, data=self._link_data[0], timeout=120),
+                                       node2.post(nio2_path, data=self._link_data[1], timeout=120),
+                                       return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            # We clean the NIO created on the other side
+            if not isinstance(results[0], BaseException):
+                await node1.delete(nio1_path, timeout=120)
+            if not isinstance(results[1], BaseException):
+                await node2.delete(nio2_path, timeout=120)
+            raise errors[0]
         self._created = True
 
     async def update(self):
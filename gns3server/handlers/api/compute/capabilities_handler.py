@@ -21,6 +21,7 @@ from gns3server.web.route import Route
 from gns3server.schemas.capabilities import CAPABILITIES_SCHEMA
 from gns3server.version import __version__
 from gns3server.compute import MODULES
+from gns3server.compute.binary_registry import BinaryRegistry
 
 
 class CapabilitiesHandler:
@@ -40,3 +41,21 @@ class CapabilitiesHandler:
             "platform": sys.platform,
             "node_types": node_types
         })
+
+    @Route.get(
+        r"/capabilities/binaries",
+        description="List the cached capabilities of the executables used by the server")
+    def binaries(request, response):
+
+        response.json(BinaryRegistry.instance())
+
+    @Route.post(
+        r"/capabilities/binaries/refresh",
+        status_codes={
+            204: "Executables will be probed again"
+        },
+        description="Forget the cached capabilities of the executables used by the server")
+    def refresh_binaries(request, response):
+
+        BinaryRegistry.instance().refresh()
+        response.set_status(204)
@@ -16,9 +16,11 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from gns3server.web.route import Route
-from gns3server.compute.port_manager import PortManager
+from gns3server.compute.port_manager import PortManager, MAX_UDP_PORTS_ALLOCATION
 from gns3server.compute.project_manager import ProjectManager
+from gns3server.schemas.port import UDP_PORTS_RELEASE_SCHEMA
 from gns3server.utils.interfaces import interfaces
+from aiohttp.web import HTTPBadRequest
 
 
 class NetworkHandler:
@@ -30,17 +32,45 @@ class NetworkHandler:
         },
         status_codes={
             201: "UDP port allocated",
+            400: "Invalid number of ports",
             404: "The project doesn't exist"
         },
-        description="Allocate an UDP port on the server")
+        description="Allocate an UDP port on the server, several ports can be allocated with the count query parameter")
     def allocate_udp_port(request, response):
 
         pm = ProjectManager.instance()
         project = pm.get_project(request.match_info["project_id"])
+        try:
+            count = int(request.query.get("count", 1))
+        except ValueError:
+            count = 0
+        if count < 1 or count > MAX_UDP_PORTS_ALLOCATION:
+            raise HTTPBadRequest(text="The number of UDP ports to allocate must be between 1 and {}".format(MAX_UDP_PORTS_ALLOCATION))
         m = PortManager.instance()
-        udp_port = m.get_free_udp_port(project)
+        udp_ports = m.get_free_udp_ports(project, count)
         response.set_status(201)
-        response.json({"udp_port": udp_port})
+        response.json({"udp_port": udp_ports[0], "udp_ports": udp_ports})
+
+    @Route.post(
+        r"/projects/{project_id}/ports/udp/release",
+        parameters={
+            "project_id": "Project UUID",
+        },
+        status_codes={
+            204: "UDP ports released",
+            400: "Invalid request",
+            404: "The project doesn't exist"
+        },
+        description="Release UDP ports allocated on the server and not used",
+        input=UDP_PORTS_RELEASE_SCHEMA)
+    def release_udp_ports(request, response):
+
+        pm = ProjectManager.instance()
+        project = pm.get_project(request.match_info["project_id"])
+        m = PortManager.instance()
+        for port in request.json["udp_ports"]:
+            m.release_udp_port(port, project)
+        response.set_status(204)
 
     @Route.get(
         r"/network/interfaces",
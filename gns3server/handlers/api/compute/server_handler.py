@@ -23,7 +23,10 @@ from gns3server.config import Config
 from gns3server.schemas.version import VERSION_SCHEMA
 from gns3server.schemas.server_statistics import SERVER_STATISTICS_SCHEMA
 from gns3server.compute.port_manager import PortManager
+from gns3server.compute.qemu.utils.image_cache import QemuImageCache
+from gns3server.compute.binary_registry import BinaryRegistry
 from gns3server.utils.cpu_percent import CpuPercent
+from gns3server.utils.file_watcher import FileWatcherService
 from gns3server.utils.path import get_default_project_directory
 from gns3server.version import __version__
 from aiohttp.web import HTTPConflict
@@ -131,5 +134,17 @@ Networks:
                     if open_port.laddr[1] == port:
                         found = True
                 data += "UDP {}: {}\n".format(port, found)
+
+        data += "\n\nFile watcher\n"
+        for key, value in FileWatcherService.instance().stats().items():
+            data += "{}: {}\n".format(key, value)
+
+        data += "\n\nQemu image cache\n"
+        for key, value in QemuImageCache.instance().stats().items():
+            data += "{}: {}\n".format(key, value)
+
+        data += "\n\nBinaries cache\n"
+        for key, value in BinaryRegistry.instance().stats().items():
+            data += "{}: {}\n".format(key, value)
         return data
 
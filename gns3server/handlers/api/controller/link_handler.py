@@ -219,7 +219,6 @@ class LinkHandler:
     async def pcap(request, response):
 
         project = await Controller.instance().get_loaded_project(request.match_info["project_id"])
-        ssl_context = Controller.instance().ssl_context()
         link = project.get_link(request.match_info["link_id"])
         if not link.capturing:
             raise aiohttp.web.HTTPConflict(text="This link has no active packet capture")
@@ -231,15 +230,14 @@ class LinkHandler:
         headers['Router-Host'] = request.host
         body = await request.read()
 
-        connector = aiohttp.TCPConnector(limit=None, force_close=True, ssl_context=ssl_context)
-        async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
-            async with session.request(request.method, pcap_streaming_url, timeout=None, data=body) as response:
-                proxied_response = aiohttp.web.Response(headers=response.headers, status=response.status)
-                if response.headers.get('Transfer-Encoding', '').lower() == 'chunked':
-                    proxied_response.enable_chunked_encoding()
-
-                await proxied_response.prepare(request)
-                async for data in response.content.iter_any():
-                    if not data:
-                        break
-                    await proxied_response.write(data)
+        # the stream can last for a long time, it must not hold a connection of the pool used by the API calls
+        async with compute.stream_session().request(request.method, pcap_streaming_url, headers=headers, timeout=None, data=body) as response:
+            proxied_response = aiohttp.web.Response(headers=response.headers, status=response.status)
+            if response.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+                proxied_response.enable_chunked_encoding()
+
+            await proxied_response.prepare(request)
+            async for data in response.content.iter_any():
+                if not data:
+                    break
+                await proxied_response.write(data)
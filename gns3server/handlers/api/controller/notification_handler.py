@@ -52,7 +52,7 @@ class NotificationHandler:
 
         await response.prepare(request)
         with controller.notification.controller_queue() as queue:
-            while True:
+            while not queue.disconnected:
                 msg = await queue.get_json(5)
                 await response.write(("{}\n".format(msg)).encode("utf-8"))
 
@@ -73,7 +73,7 @@ class NotificationHandler:
         log.info("New client has connected to controller WebSocket")
         try:
             with controller.notification.controller_queue() as queue:
-                while True:
+                while not queue.disconnected:
                     notification = await queue.get_json(5)
                     if ws.closed:
                         break
@@ -25,7 +25,7 @@ import time
 
 from gns3server.web.route import Route
 from gns3server.controller import Controller
-from gns3server.controller.import_project import import_project
+from gns3server.controller.import_project import import_project_from_stream
 from gns3server.controller.export_project import export_project
 from gns3server.utils.asyncio import aiozipstream
 from gns3server.utils.path import is_safe_path
@@ -236,7 +236,7 @@ class ProjectHandler:
 
         try:
             with controller.notification.project_queue(project.id) as queue:
-                while True:
+                while not queue.disconnected:
                     msg = await queue.get_json(5)
                     await response.write(("{}\n".format(msg)).encode("utf-8"))
         finally:
@@ -272,7 +272,7 @@ class ProjectHandler:
         log.info("New client has connected to the notification stream for project ID '{}' (WebSocket method)".format(project.id))
         try:
             with controller.notification.project_queue(project.id) as queue:
-                while True:
+                while not queue.disconnected:
                     notification = await queue.get_json(5)
                     if ws.closed:
                         break
@@ -390,28 +390,19 @@ class ProjectHandler:
                 return
         path = request.json.get("path")
         name = request.json.get("name")
+        project_id = request.match_info["project_id"]
 
-        # We write the content to a temporary location and after we extract it all.
-        # It could be more optimal to stream this but it is not implemented in Python.
+        def progress(imported_bytes, files):
+            log.debug("Project {}: {} bytes and {} files imported".format(project_id, imported_bytes, files))
+            controller.notification.controller_emit("project.import.progress", {"project_id": project_id,
+                                                                                 "imported_bytes": imported_bytes,
+                                                                                 "total_bytes": request.content_length,
+                                                                                 "files": files})
+
+        # The files are sent to their destination while the archive is received
         try:
             begin = time.time()
-            # use the parent directory or projects dir as a temporary working dir
-            if path:
-                working_dir = os.path.abspath(os.path.join(path, os.pardir))
-            else:
-                working_dir = controller.projects_directory()
-            with tempfile.TemporaryDirectory(dir=working_dir) as tmpdir:
-                temp_project_path = os.path.join(tmpdir, "project.zip")
-                async with aiofiles.open(temp_project_path, 'wb') as f:
-                    while True:
-                        chunk = await request.content.read(CHUNK_SIZE)
-                        if not chunk:
-                            break
-                        await f.write(chunk)
-
-                with open(temp_project_path, "rb") as f:
-                    project = await import_project(controller, request.match_info["project_id"], f, location=path, name=name)
-
+            project = await import_project_from_stream(controller, project_id, request.content.read, location=path, name=name, progress_callback=progress)
             log.info("Project '{}' imported in {:.4f} seconds".format(project.name, time.time() - begin))
         except OSError as e:
             raise aiohttp.web.HTTPInternalServerError(text="Could not import the project: {}".format(e))
@@ -18,6 +18,7 @@
 from gns3server.web.route import Route
 from gns3server.config import Config
 from gns3server.controller import Controller
+from gns3server.controller.topology_cache import TopologyCache
 from gns3server.schemas.version import VERSION_SCHEMA
 from gns3server.schemas.iou_license import IOU_LICENSE_SETTINGS_SCHEMA
 from gns3server.version import __version__
@@ -250,6 +251,14 @@ Processus:
             except (OSError, psutil.NoSuchProcess, psutil.AccessDenied):
                 pass
 
+        data += "\n\nNotifications\n"
+        for key, value in Controller.instance().notification.stats().items():
+            data += "{}: {}\n".format(key, value)
+
+        data += "\n\nClosed project topology cache\n"
+        for key, value in TopologyCache.instance().stats().items():
+            data += "{}: {}\n".format(key, value)
+
         data += "\n\nProjects"
         for project in Controller.instance().projects.values():
             data += "\n\nProject name: {}\nProject ID: {}\n".format(project.name, project.id)
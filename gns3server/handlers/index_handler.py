@@ -22,7 +22,7 @@ from gns3server.controller import Controller
 from gns3server.compute.port_manager import PortManager
 from gns3server.compute.project_manager import ProjectManager
 from gns3server.version import __version__
-from gns3server.utils.get_resource import get_resource 
+from gns3server.web.static_files import StaticFiles
 
 
 class IndexHandler:
@@ -89,24 +89,20 @@ class IndexHandler:
     async def webui(request, response):
         filename = request.match_info["filename"]
         filename = os.path.normpath(filename).strip("/")
-        filename = os.path.join('static', 'web-ui', filename)
 
         # Raise error if user try to escape
-        if filename[0] == "." or '/../' in filename:
+        if '/../' in os.path.join('static', 'web-ui', filename):
             raise aiohttp.web.HTTPForbidden()
 
-        static = get_resource(filename)
+        # the compressed variants are kept in memory, the other files are sent by aiohttp
+        static_files = StaticFiles.instance()
+        static = static_files.get(filename)
+        if static is None:
+            static = static_files.get('index.html')
+            if static is None:
+                raise aiohttp.web.HTTPNotFound()
 
-        if static is None or not os.path.exists(static):
-            static = get_resource(os.path.join('static', 'web-ui', 'index.html'))
-
-        # guesstype prefers to have text/html type than application/javascript
-        # which results with warnings in Firefox 66 on Windows
-        # Ref. gns3-server#1559
-        _, ext = os.path.splitext(static)
-        mimetype = ext == '.js' and 'application/javascript' or None
-
-        await response.stream_file(static, status=200, set_content_type=mimetype)
+        return response.static_file(static)
 
     @Route.get(
         r"/v1/version",
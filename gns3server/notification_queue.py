@@ -16,25 +16,145 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
-import json
 import psutil
 
 from gns3server.utils.cpu_percent import CpuPercent
+from gns3server.utils.json_serializer import dumps
 
 import logging
 log = logging.getLogger(__name__)
 
 
+class NotificationMessage:
+    """
+    Notification sent to listeners, the message is serialized only once
+    and the result is shared by all the queues receiving it.
+
+    :param action: Action name
+    :param event: Event to send
+    :param kwargs: Add this meta to the notification (project_id for example)
+    """
+
+    __slots__ = ("action", "event", "kwargs", "_json")
+
+    def __init__(self, action, event, kwargs=None):
+        self.action = action
+        self.event = event
+        self.kwargs = kwargs or {}
+        self._json = None
+
+    def __iter__(self):
+        # allow (action, event, kwargs) = message like with the tuples used before
+        return iter((self.action, self.event, self.kwargs))
+
+    def json(self):
+        """
+        :returns: The message as a JSON string
+        """
+
+        if self._json is None:
+            if hasattr(self.event, "__json__"):
+                msg = {"action": self.action, "event": self.event.__json__()}
+            else:
+                msg = {"action": self.action, "event": self.event}
+            msg.update(self.kwargs)
+            self._json = dumps(msg).decode("utf-8")
+        return self._json
+
+
 class NotificationQueue(asyncio.Queue):
     """
     Queue returned by the notification manager.
+
+    The queue is bounded, when it's full the overflow policy is applied:
+        * drop_oldest: the oldest notification is dropped
+        * coalesce: a pending node.updated for the same node is replaced, otherwise the oldest notification is dropped
+        * disconnect: the queue is emptied and marked as disconnected, the listener must stop reading it
+
+    :param maxsize: Maximum number of notifications waiting in the queue (0 means unbounded)
+    :param overflow: Overflow policy
     """
 
-    def __init__(self):
-        super().__init__()
+    OVERFLOW_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+    def __init__(self, maxsize=0, overflow="drop_oldest"):
+        super().__init__(maxsize=maxsize)
+        if overflow not in self.OVERFLOW_POLICIES:
+            log.warning("Unknown notification overflow policy '{}', using 'drop_oldest'".format(overflow))
+            overflow = "drop_oldest"
+        self._overflow = overflow
         self._first = True
+        self._disconnected = False
+        self._dropped = 0
+        self._coalesced = 0
 
-    async def get(self, timeout):
+    @property
+    def disconnected(self):
+        """
+        :returns: True if the listener has been disconnected because it was too slow
+        """
+
+        return self._disconnected
+
+    @property
+    def dropped(self):
+        """
+        :returns: Number of notifications dropped because the queue was full
+        """
+
+        return self._dropped
+
+    @property
+    def coalesced(self):
+        """
+        :returns: Number of notifications replaced by a more recent one
+        """
+
+        return self._coalesced
+
+    def put_nowait(self, item):
+        """
+        Put a notification in the queue without blocking,
+        the overflow policy is applied if the queue is full.
+
+        :param item: NotificationMessage or (action, event, kwargs) tuple
+        """
+
+        if not isinstance(item, NotificationMessage):
+            item = NotificationMessage(*item)
+        if self._disconnected:
+            return
+        if self.full():
+            if self._overflow == "disconnect":
+                self._dropped += self.qsize() + 1
+                while not self.empty():
+                    self.get_nowait()
+                self._disconnected = True
+                log.warning("Notification listener disconnected because it is too slow")
+                return
+            if self._overflow == "coalesce" and self._coalesce(item):
+                return
+            self.get_nowait()
+            self._dropped += 1
+        super().put_nowait(item)
+
+    def _coalesce(self, item):
+        """
+        Replace a pending node.updated notification for the same node
+
+        :returns: True if the notification has been replaced
+        """
+
+        if item.action != "node.updated" or not isinstance(item.event, dict) or "node_id" not in item.event:
+            return False
+        for i, pending in enumerate(self._queue):
+            if pending.action == "node.updated" and isinstance(pending.event, dict) and pending.event.get("node_id") == item.event["node_id"]:
+                self._queue[i] = item
+                self._coalesced += 1
+                return True
+        return False
+
+    async def _get_message(self, timeout):
         """
         When timeout is expire we send a ping notification with server information
         """
@@ -42,13 +162,20 @@ class NotificationQueue(asyncio.Queue):
         # At first get we return a ping so the client immediately receives data
         if self._first:
             self._first = False
-            return ("ping", self._getPing(), {})
+            return NotificationMessage("ping", self._getPing())
 
         try:
-            (action, msg, kwargs) = await asyncio.wait_for(super().get(), timeout)
+            return await asyncio.wait_for(super().get(), timeout)
         except asyncio.TimeoutError:
-            return ("ping", self._getPing(), {})
-        return (action, msg, kwargs)
+            return NotificationMessage("ping", self._getPing())
+
+    async def get(self, timeout):
+        """
+        When timeout is expire we send a ping notification with server information
+        """
+
+        message = await self._get_message(timeout)
+        return (message.action, message.event, message.kwargs)
 
     def _getPing(self):
         """
@@ -68,10 +195,6 @@ class NotificationQueue(asyncio.Queue):
         """
         Get a message as a JSON
         """
-        (action, msg, kwargs) = await self.get(timeout)
-        if hasattr(msg, "__json__"):
-            msg = {"action": action, "event": msg.__json__()}
-        else:
-            msg = {"action": action, "event": msg}
-        msg.update(kwargs)
-        return json.dumps(msg, sort_keys=True)
+
+        message = await self._get_message(timeout)
+        return message.json()
@@ -113,3 +113,23 @@ PORT_OBJECT_SCHEMA = {
         }
     ]
 }
+
+
+UDP_PORTS_RELEASE_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "description": "Request validation to release UDP ports",
+    "type": "object",
+    "properties": {
+        "udp_ports": {
+            "description": "UDP port numbers",
+            "type": "array",
+            "items": {
+                "type": "integer",
+                "minimum": 0,
+                "maximum": 65535
+            }
+        }
+    },
+    "required": ["udp_ports"],
+    "additionalProperties": False
+}
@@ -29,14 +29,61 @@ import struct
 import time
 import zipfile
 import asyncio
-import aiofiles
+import collections
 from concurrent import futures
 
+from ...config import Config
+
 from zipfile import (structCentralDir, structEndArchive64, structEndArchive, structEndArchive64Locator,
                      stringCentralDir, stringEndArchive64, stringEndArchive, stringEndArchive64Locator)
 
 stringDataDescriptor = b'PK\x07\x08'  # magic number for data descriptor
 
+# Maximum size of the data buffered for each member compressed in advance
+PARALLEL_BUFFER_SIZE = 16 * 1024 * 1024
+
+# Executor shared by all the archives to read, checksum and compress the data
+_executor = None
+
+
+def _get_executor():
+    """
+    Return the executor shared by all the archives, the number of threads
+    is bounded by the number of CPUs because the work is mostly CPU bound.
+    """
+
+    global _executor
+    if _executor is None:
+        _executor = futures.ThreadPoolExecutor(max_workers=max(2, os.cpu_count() or 1), thread_name_prefix="aiozipstream")
+    return _executor
+
+
+def _process_chunk(buf, crc, cmpr):
+    """
+    Compute the CRC and compress a chunk, called in the executor.
+
+    :returns: Tuple with the new CRC and the data to write
+    """
+
+    crc = zipfile.crc32(buf, crc)
+    if cmpr:
+        return crc, cmpr.compress(buf)
+    return crc, buf
+
+
+def _read_chunk(f, chunksize, crc, cmpr):
+    """
+    Read, checksum and compress a chunk of a file, called in the executor.
+
+    :returns: Tuple with the size read, the new CRC and the data to write
+    """
+
+    buf = f.read(chunksize)
+    if not buf:
+        return 0, crc, b''
+    crc, data = _process_chunk(buf, crc, cmpr)
+    return len(buf), crc, data
+
 
 def _get_compressor(compress_type):
     """
@@ -121,8 +168,14 @@ class ZipInfo(zipfile.ZipInfo):
 
 class ZipFile(zipfile.ZipFile):
 
-    def __init__(self, fileobj=None, mode='w', compression=zipfile.ZIP_STORED, allowZip64=True, chunksize=32768):
-        """Open the ZIP file with mode write "w"."""
+    def __init__(self, fileobj=None, mode='w', compression=zipfile.ZIP_STORED, allowZip64=True, chunksize=None, parallel=None):
+        """
+        Open the ZIP file with mode write "w".
+
+        :param chunksize: Size of the chunks read from the files, zip_chunk_size from the configuration by default
+        :param parallel: Number of members compressed at the same time, zip_parallel from the configuration by default.
+                         The members are still written in order.
+        """
 
         if mode not in ('w', ):
             raise RuntimeError('aiozipstream.ZipFile() requires mode "w"')
@@ -131,7 +184,13 @@ class ZipFile(zipfile.ZipFile):
 
         self._comment = b''
         zipfile.ZipFile.__init__(self, fileobj, mode=mode, compression=compression, allowZip64=allowZip64)
-        self._chunksize = chunksize
+        server_config = Config.instance().get_section_config("Server")
+        if chunksize is None:
+            chunksize = int(server_config.get("zip_chunk_size", 1024 * 1024))
+        if parallel is None:
+            parallel = int(server_config.get("zip_parallel", 1))
+        self._chunksize = max(1024, chunksize)
+        self._parallel = max(1, parallel)
         self.paths_to_write = []
 
     def __aiter__(self):
@@ -161,35 +220,111 @@ class ZipFile(zipfile.ZipFile):
         self._comment = comment
         self._didModify = True
 
-    async def data_generator(self, path, islink=False):
+    async def data_generator(self, path, islink=False, cmpr=None, crc_state=None):
+        """
+        Read a file, the data is checksummed and compressed in the executor with the same call.
+        The CRC and size of the uncompressed data are stored in crc_state.
+        """
 
+        if crc_state is None:
+            crc_state = {"crc": 0, "file_size": 0}
         if islink:
-            yield os.readlink(path).encode()
-        else:
-            async with aiofiles.open(path, "rb") as f:
-                while True:
-                    part = await f.read(self._chunksize)
-                    if not part:
-                        break
-                    yield part
-        return
+            buf = os.readlink(path).encode()
+            crc_state["crc"], data = await self._run_in_executor(_process_chunk, buf, crc_state["crc"], cmpr)
+            crc_state["file_size"] += len(buf)
+            yield data
+            return
 
-    async def _run_in_executor(self, task, *args, **kwargs):
+        f = await self._run_in_executor(open, path, "rb")
+        try:
+            while True:
+                size, crc_state["crc"], data = await self._run_in_executor(_read_chunk, f, self._chunksize, crc_state["crc"], cmpr)
+                if not size:
+                    break
+                crc_state["file_size"] += size
+                if data:
+                    yield data
+        finally:
+            f.close()
+
+    async def _run_in_executor(self, task, *args):
         """
-        Run synchronous task in separate thread and await for result.
+        Run synchronous task in the shared executor and await for result.
         """
 
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(futures.ThreadPoolExecutor(max_workers=1), task, *args, **kwargs)
+        return await loop.run_in_executor(_get_executor(), task, *args)
 
     async def _stream(self):
 
-        for kwargs in self.paths_to_write:
-            async for chunk in self._write(**kwargs):
+        if self._parallel > 1:
+            async for chunk in self._parallel_stream():
                 yield chunk
+        else:
+            for kwargs in self.paths_to_write:
+                member = self._prepare(**kwargs)
+                async for chunk in self._write(member, self._member_data(member)):
+                    yield chunk
         for chunk in self._close():
             yield chunk
 
+    async def _parallel_stream(self):
+        """
+        Compress the next members while the current one is sent, each member
+        buffers a limited number of chunks so the memory usage stays bounded.
+        """
+
+        pending = collections.deque()
+        paths_to_write = iter(self.paths_to_write)
+        try:
+            while True:
+                while len(pending) < self._parallel:
+                    kwargs = next(paths_to_write, None)
+                    if kwargs is None:
+                        break
+                    member = self._prepare(**kwargs)
+                    task, data = self._prefetch(self._member_data(member))
+                    pending.append((member, task, data))
+                if not pending:
+                    break
+                member, _, data = pending[0]
+                async for chunk in self._write(member, data):
+                    yield chunk
+                pending.popleft()
+        finally:
+            for _, task, _ in pending:
+                task.cancel()
+
+    def _prefetch(self, generator):
+        """
+        Run a generator in a task and buffer up to PARALLEL_BUFFER_SIZE bytes of its chunks in a queue.
+
+        :returns: Tuple with the task and an async generator returning the chunks
+        """
+
+        queue = asyncio.Queue(maxsize=max(2, PARALLEL_BUFFER_SIZE // self._chunksize))
+
+        async def producer():
+            try:
+                async for chunk in generator:
+                    await queue.put(chunk)
+                await queue.put(None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await queue.put(e)
+
+        async def consumer():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+
+        return asyncio.ensure_future(producer()), consumer()
+
     def write(self, filename, arcname=None, compress_type=None):
         """
         Write a file to the archive under the name `arcname`.
@@ -215,9 +350,9 @@ class ZipFile(zipfile.ZipFile):
             yield data
         return self.write_iter(arcname, _iterable(), compress_type=compress_type)
 
-    async def _write(self, filename=None, iterable=None, arcname=None, compress_type=None):
+    def _prepare(self, filename=None, iterable=None, arcname=None, compress_type=None):
         """
-        Put the bytes from filename into the archive under the name `arcname`.
+        Create the ZipInfo of a member, the header offset is set when the member is written.
         """
 
         if not self.fp:
@@ -258,7 +393,6 @@ class ZipFile(zipfile.ZipFile):
             zinfo.file_size = 0
         zinfo.flag_bits = 0x00
         zinfo.flag_bits |= 0x08                 # ZIP flag bits, bit 3 indicates presence of data descriptor
-        zinfo.header_offset = self.fp.tell()    # Start of header bytes
         if zinfo.compress_type == zipfile.ZIP_LZMA:
             # Compressed data includes an end-of-stream (EOS) marker
             zinfo.flag_bits |= 0x02
@@ -266,7 +400,41 @@ class ZipFile(zipfile.ZipFile):
         self._writecheck(zinfo)
         self._didModify = True
 
-        if isdir:
+        return {"zinfo": zinfo, "filename": filename, "iterable": iterable, "isdir": isdir, "islink": islink,
+                "crc_state": {"crc": 0, "file_size": 0}}
+
+    async def _member_data(self, member):
+        """
+        Return the compressed data of a member, the CRC and size of the
+        uncompressed data are stored in the crc_state of the member.
+        """
+
+        if member["isdir"]:
+            return
+        zinfo = member["zinfo"]
+        crc_state = member["crc_state"]
+        cmpr = _get_compressor(zinfo.compress_type)
+        if member["filename"]:
+            async for buf in self.data_generator(member["filename"], member["islink"], cmpr, crc_state):
+                yield buf
+        else:  # we have an iterable
+            for buf in member["iterable"]:
+                crc_state["crc"], data = await self._run_in_executor(_process_chunk, buf, crc_state["crc"], cmpr)
+                crc_state["file_size"] += len(buf)
+                if data:
+                    yield data
+        if cmpr:
+            yield cmpr.flush()
+
+    async def _write(self, member, data):
+        """
+        Put the data of a member into the archive.
+        """
+
+        zinfo = member["zinfo"]
+        zinfo.header_offset = self.fp.tell()    # Start of header bytes
+
+        if member["isdir"]:
             zinfo.file_size = 0
             zinfo.compress_size = 0
             zinfo.CRC = 0
@@ -275,41 +443,21 @@ class ZipFile(zipfile.ZipFile):
             yield self.fp.write(zinfo.FileHeader(False))
             return
 
-        cmpr = _get_compressor(zinfo.compress_type)
-
         # Must overwrite CRC and sizes with correct data later
-        zinfo.CRC = CRC = 0
-        zinfo.compress_size = compress_size = 0
+        zinfo.CRC = 0
+        zinfo.compress_size = 0
         # Compressed size can be larger than uncompressed size
         zip64 = self._allowZip64 and zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
         yield self.fp.write(zinfo.FileHeader(zip64))
 
-        file_size = 0
-        if filename:
-            async for buf in self.data_generator(filename, islink):
-                file_size = file_size + len(buf)
-                CRC = zipfile.crc32(buf, CRC) & 0xffffffff
-                if cmpr:
-                    buf = await self._run_in_executor(cmpr.compress, buf)
-                    compress_size = compress_size + len(buf)
-                yield self.fp.write(buf)
-        else: # we have an iterable
-            for buf in iterable:
-                file_size = file_size + len(buf)
-                CRC = zipfile.crc32(buf, CRC) & 0xffffffff
-                if cmpr:
-                    buf = await self._run_in_executor(cmpr.compress, buf)
-                    compress_size = compress_size + len(buf)
-                yield self.fp.write(buf)
-
-        if cmpr:
-            buf = cmpr.flush()
-            compress_size = compress_size + len(buf)
+        compress_size = 0
+        async for buf in data:
+            compress_size += len(buf)
             yield self.fp.write(buf)
-            zinfo.compress_size = compress_size
-        else:
-            zinfo.compress_size = file_size
-        zinfo.CRC = CRC
+
+        file_size = member["crc_state"]["file_size"]
+        zinfo.compress_size = compress_size
+        zinfo.CRC = member["crc_state"]["crc"] & 0xffffffff
         zinfo.file_size = file_size
         if not zip64 and self._allowZip64:
             if file_size > zipfile.ZIP64_LIMIT:
@@ -428,3 +576,309 @@ class ZipFile(zipfile.ZipFile):
             self.fp = None
             if not self._filePassed:
                 fp.close()
+
+
+# Size of the compressed data decompressed at once, it bounds the memory used by highly compressed members
+DECOMPRESS_CHUNK_SIZE = 64 * 1024
+
+
+class _LZMADecompressor(zipfile.LZMADecompressor):
+
+    @property
+    def unused_data(self):
+        if self._decomp is None:
+            return b''
+        return self._decomp.unused_data
+
+
+def _get_decompressor(compress_type):
+    """
+    Return the decompressor.
+    """
+
+    if compress_type == zipfile.ZIP_DEFLATED:
+        from zipfile import zlib
+        return zlib.decompressobj(-15)
+    elif compress_type == zipfile.ZIP_BZIP2:
+        from zipfile import bz2
+        return bz2.BZ2Decompressor()
+    elif compress_type == zipfile.ZIP_LZMA:
+        return _LZMADecompressor()
+    else:
+        return None
+
+
+def _decompress_chunk(buf, crc, dcmpr):
+    """
+    Decompress a chunk and compute the CRC of the result, called in the executor.
+
+    :returns: Tuple with the new CRC, the decompressed data and the data found after the end of the compressed stream
+    """
+
+    data = dcmpr.decompress(buf)
+    unused_data = dcmpr.unused_data if dcmpr.eof else b''
+    return zipfile.crc32(data, crc), data, unused_data
+
+
+class ZipStreamReader:
+    """
+    Read a ZIP archive sequentially while it is received.
+
+    The members are returned in the order of the archive with a generator of
+    their uncompressed data, this data must be read before the next member is
+    requested (what is left is skipped). The attributes only stored in the
+    central directory at the end of the archive (like the symbolic links) are
+    available in external_attrs once all the members have been read.
+
+    :param read: Coroutine function returning at most n bytes of the archive, b"" at the end
+    :param chunksize: Size of the chunks read from the archive, zip_chunk_size from the configuration by default
+    """
+
+    def __init__(self, read, chunksize=None):
+
+        self._read = read
+        if chunksize is None:
+            chunksize = int(Config.instance().get_section_config("Server").get("zip_chunk_size", 1024 * 1024))
+        self._chunksize = max(1024, chunksize)
+        self._buffer = bytearray()
+        self._eof = False
+        self.bytes_read = 0
+        self.external_attrs = {}
+
+    def __aiter__(self):
+        return self._members()
+
+    async def _run_in_executor(self, task, *args):
+        """
+        Run synchronous task in the shared executor and await for result.
+        """
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(_get_executor(), task, *args)
+
+    async def _fill(self, size):
+        """
+        Read the archive until the buffer contains at least size bytes.
+
+        :returns: False if the end of the archive has been reached before
+        """
+
+        while len(self._buffer) < size and not self._eof:
+            data = await self._read(self._chunksize)
+            if not data:
+                self._eof = True
+            else:
+                self.bytes_read += len(data)
+                self._buffer += data
+        return len(self._buffer) >= size
+
+    async def _read_exactly(self, size):
+
+        if not await self._fill(size):
+            raise zipfile.BadZipFile("Truncated ZIP archive")
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    async def _read_some(self, size):
+        """
+        Read at least one byte and at most size bytes.
+        """
+
+        if not await self._fill(1):
+            raise zipfile.BadZipFile("Truncated ZIP archive")
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    async def _members(self):
+
+        while True:
+            signature = await self._read_exactly(4)
+            if signature == zipfile.stringFileHeader:
+                zinfo = await self._read_file_header(signature)
+                data = self._member_data(zinfo)
+                yield zinfo, data
+                async for _ in data:
+                    pass
+            elif signature in (stringCentralDir, stringEndArchive64, stringEndArchive):
+                await self._read_central_directory(signature)
+                return
+            else:
+                raise zipfile.BadZipFile("Bad magic number for file header")
+
+    async def _read_file_header(self, signature):
+        """
+        Read a local file header.
+
+        :returns: ZipInfo instance
+        """
+
+        header = signature + await self._read_exactly(zipfile.sizeFileHeader - 4)
+        (_, _, _, flag_bits, compress_type, dostime, dosdate,
+         crc, compress_size, file_size, filename_length, extra_length) = struct.unpack(zipfile.structFileHeader, header)
+        filename = await self._read_exactly(filename_length)
+        extra = await self._read_exactly(extra_length)
+        if flag_bits & 0x800:
+            filename = filename.decode("utf-8")
+        else:
+            filename = filename.decode("cp437")
+
+        date_time = ((dosdate >> 9) + 1980, (dosdate >> 5) & 0xF, dosdate & 0x1F,
+                     dostime >> 11, (dostime >> 5) & 0x3F, (dostime & 0x1F) * 2)
+        zinfo = ZipInfo(filename, date_time)
+        zinfo.flag_bits = flag_bits
+        zinfo.compress_type = compress_type
+        zinfo.CRC = crc
+        zinfo.compress_size = compress_size
+        zinfo.file_size = file_size
+        zinfo.extra = extra
+
+        if flag_bits & 0x1:
+            raise zipfile.BadZipFile("File {} is encrypted".format(filename))
+        if compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED, zipfile.ZIP_BZIP2, zipfile.ZIP_LZMA):
+            raise zipfile.BadZipFile("File {} uses an unsupported compression method".format(filename))
+
+        # the real sizes are in the ZIP64 extra field
+        offset = 0
+        while offset + 4 <= len(extra):
+            extra_id, extra_size = struct.unpack_from("<HH", extra, offset)
+            if extra_id == 1:
+                values = list(struct.unpack_from("<{}Q".format(min(extra_size // 8, 2)), extra, offset + 4))
+                if zinfo.file_size == 0xffffffff and values:
+                    zinfo.file_size = values.pop(0)
+                if zinfo.compress_size == 0xffffffff and values:
+                    zinfo.compress_size = values.pop(0)
+            offset += 4 + extra_size
+        return zinfo
+
+    async def _member_data(self, zinfo):
+        """
+        Yield the uncompressed data of a member and check its CRC.
+        """
+
+        has_data_descriptor = zinfo.flag_bits & 0x08
+        if zinfo.is_dir():
+            # the directories have no data, the writers do not agree on the presence of a data descriptor
+            if has_data_descriptor:
+                await self._fill(4 + 20)
+                if self._buffer[:4] == stringDataDescriptor:
+                    del self._buffer[:4 + self._match_data_descriptor(4, 0, 0, 0)]
+            return
+
+        dcmpr = _get_decompressor(zinfo.compress_type)
+        crc = 0
+        compress_size = 0
+        file_size = 0
+
+        if has_data_descriptor and dcmpr is None:
+            # the size of the data is unknown, search the data descriptor signature
+            # and check it matches the CRC and size of the data read so far
+            start = 0
+            while True:
+                await self._fill(start + self._chunksize)
+                index = self._buffer.find(stringDataDescriptor, start)
+                if index == -1:
+                    if self._eof:
+                        raise zipfile.BadZipFile("Truncated ZIP archive")
+                    # keep the bytes which could be the beginning of the signature
+                    data = bytes(self._buffer[:len(self._buffer) - 3])
+                    del self._buffer[:len(data)]
+                    crc = await self._run_in_executor(zipfile.crc32, data, crc)
+                    file_size += len(data)
+                    start = 0
+                    yield data
+                    continue
+                await self._fill(index + 24)
+                data_crc = await self._run_in_executor(zipfile.crc32, self._buffer[:index], crc)
+                descriptor_size = self._match_data_descriptor(index + 4, data_crc, file_size + index, file_size + index)
+                if not descriptor_size:
+                    start = index + 1
+                    continue
+                data = bytes(self._buffer[:index])
+                del self._buffer[:index + 4 + descriptor_size]
+                zinfo.CRC = data_crc
+                zinfo.compress_size = zinfo.file_size = file_size + index
+                if data:
+                    yield data
+                return
+
+        remaining = None if has_data_descriptor else zinfo.compress_size
+        chunksize = DECOMPRESS_CHUNK_SIZE if dcmpr else self._chunksize
+        while remaining is None or remaining > 0:
+            if remaining is None:
+                buf = await self._read_some(chunksize)
+            else:
+                buf = await self._read_some(min(remaining, chunksize))
+                remaining -= len(buf)
+            if dcmpr:
+                try:
+                    crc, data, unused_data = await self._run_in_executor(_decompress_chunk, buf, crc, dcmpr)
+                except Exception as e:
+                    raise zipfile.BadZipFile("Cannot decompress file {}: {}".format(zinfo.filename, e))
+                if unused_data:
+                    # the data after the end of the compressed stream belongs to the next records
+                    self._buffer[0:0] = unused_data
+                    buf = buf[:len(buf) - len(unused_data)]
+            else:
+                data = buf
+                crc = await self._run_in_executor(zipfile.crc32, data, crc)
+            compress_size += len(buf)
+            file_size += len(data)
+            if data:
+                yield data
+            if dcmpr and dcmpr.eof:
+                break
+
+        if has_data_descriptor:
+            await self._fill(4 + 20)
+            offset = 4 if self._buffer[:4] == stringDataDescriptor else 0
+            descriptor_size = self._match_data_descriptor(offset, crc, compress_size, file_size)
+            if not descriptor_size:
+                raise zipfile.BadZipFile("Bad CRC-32 or size for file {}".format(zinfo.filename))
+            del self._buffer[:offset + descriptor_size]
+            zinfo.CRC = crc
+            zinfo.compress_size = compress_size
+            zinfo.file_size = file_size
+        elif crc != zinfo.CRC or file_size != zinfo.file_size:
+            raise zipfile.BadZipFile("Bad CRC-32 or size for file {}".format(zinfo.filename))
+
+    def _match_data_descriptor(self, offset, crc, compress_size, file_size):
+        """
+        Check if the buffer contains a data descriptor matching the data at the offset.
+        The sizes are stored on 4 or 8 bytes depending on the writer.
+
+        :returns: Size of the data descriptor, 0 if it does not match
+        """
+
+        for fmt in ("<LLL", "<LQQ"):
+            size = struct.calcsize(fmt)
+            if len(self._buffer) >= offset + size and struct.unpack_from(fmt, self._buffer, offset) == (crc, compress_size, file_size):
+                return size
+        return 0
+
+    async def _read_central_directory(self, signature):
+        """
+        Read the end of the archive and the attributes of the members from the central directory.
+        """
+
+        while not self._eof:
+            await self._fill(len(self._buffer) + self._chunksize)
+        data = signature + bytes(self._buffer)
+        self._buffer.clear()
+
+        offset = 0
+        try:
+            while data[offset:offset + 4] == stringCentralDir:
+                centdir = struct.unpack_from(structCentralDir, data, offset)
+                flag_bits, filename_length, extra_length, comment_length, external_attr = (centdir[5], centdir[12], centdir[13], centdir[14], centdir[17])
+                offset += zipfile.sizeCentralDir
+                filename = data[offset:offset + filename_length]
+                if flag_bits & 0x800:
+                    filename = filename.decode("utf-8")
+                else:
+                    filename = filename.decode("cp437")
+                self.external_attrs[filename] = external_attr
+                offset += filename_length + extra_length + comment_length
+        except (struct.error, UnicodeDecodeError):
+            raise zipfile.BadZipFile("Truncated central directory")
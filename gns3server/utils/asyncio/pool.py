@@ -50,6 +50,60 @@ class Pool():
             raise exceptions.pop()
 
 
+class KeyPool():
+    """
+    Limit concurrency for running parallel tasks sharing the same keys
+    (for example the computes used by a task).
+
+    The concurrency of a key is computed each time a task could
+    be started, so the limit can change while the pool is running.
+
+    :param concurrency: Callable returning the concurrency for a key
+    """
+
+    def __init__(self, concurrency):
+        self._tasks = []
+        self._concurrency = concurrency
+        self._running = {}
+
+    def append(self, keys, task, *args, **kwargs):
+        """
+        :param keys: Keys used by the task, a slot is required for each of them
+        """
+
+        self._tasks.append((frozenset(keys), task, args, kwargs))
+
+    def _can_start(self, keys):
+
+        for key in keys:
+            if self._running.get(key, 0) >= max(1, self._concurrency(key)):
+                return False
+        return True
+
+    async def join(self):
+        """
+        Wait for all task to finish
+        """
+        pending = {}
+        exceptions = []
+        while len(self._tasks) > 0 or len(pending) > 0:
+            for item in list(self._tasks):
+                keys, task, args, kwargs = item
+                if self._can_start(keys):
+                    self._tasks.remove(item)
+                    for key in keys:
+                        self._running[key] = self._running.get(key, 0) + 1
+                    pending[asyncio.create_task(task(*args, **kwargs))] = keys
+            (done, _) = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                for key in pending.pop(task):
+                    self._running[key] -= 1
+                if task.exception():
+                    exceptions.append(task.exception())
+        if len(exceptions) > 0:
+            raise exceptions[0]
+
+
 def main():
     async def task(id):
         print("Run", id)
@@ -15,9 +15,305 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import sys
 import zlib
+import errno
+import struct
 import asyncio
-import os
+import ctypes
+import ctypes.util
+
+import logging
+log = logging.getLogger(__name__)
+
+
+# inotify events triggering a check of the watched files
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def _stat_paths(paths):
+    """
+    Return the modification time and size of files, called in the executor
+    so all the files to check are stat'ed with a single call.
+    """
+
+    result = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            result[path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            result[path] = None
+    return result
+
+
+def _hash_file(path):
+    """
+    Return the hash of a file, called in the executor
+    """
+
+    try:
+        # Alder32 is a fast but insecure hash algorithm
+        checksum = 1
+        with open(path, 'rb') as f:
+            while True:
+                buf = f.read(1024 * 1024)
+                if not buf:
+                    break
+                checksum = zlib.adler32(buf, checksum)
+        return checksum
+    except OSError:
+        return None
+
+
+class Inotify:
+    """
+    Minimal inotify binding, only available on Linux
+    """
+
+    def __init__(self):
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def fileno(self):
+
+        return self._fd
+
+    def add_watch(self, path, mask=IN_WATCH_MASK):
+
+        wd = self._add_watch(self._fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), "Can't watch {}".format(path))
+        return wd
+
+    def rm_watch(self, wd):
+
+        self._rm_watch(self._fd, wd)
+
+    def read_events(self):
+        """
+        :returns: List of (watch descriptor, mask, name) tuples
+        """
+
+        events = []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return events
+            raise
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+
+        os.close(self._fd)
+
+
+class FileWatcherService:
+    """
+    Watch the files of all the FileWatcher instances of the process.
+
+    A single timer checks the files due for a check: they are stat'ed with
+    one executor call and only files with a new modification time or size
+    are hashed (in the executor) with the hash strategy.
+
+    On Linux the parent directories of files using the mtime strategy are
+    watched with inotify and these files are only checked after a notification.
+    Files using the hash strategy are still polled because they are usually
+    written through a memory mapping (Dynamips) which doesn't send notifications.
+    """
+
+    _instance = None
+
+    def __init__(self, loop):
+
+        self._loop = loop
+        self._watchers = set()
+        self._handle = None
+        self._checking = False
+        self._inotify = None
+        self._directories = {}  # directory => [watch descriptor, set of watchers]
+        self._watch_descriptors = {}  # watch descriptor => directory
+        if sys.platform.startswith("linux"):
+            try:
+                self._inotify = Inotify()
+                loop.add_reader(self._inotify.fileno(), self._read_inotify_events)
+            except (OSError, AttributeError, NotImplementedError) as e:
+                log.debug("inotify is not available, files will be polled: {}".format(e))
+                self._inotify = None
+
+    @classmethod
+    def instance(cls):
+        """
+        :returns: The file watcher service of the current event loop
+        """
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if cls._instance is not None and not cls._instance._loop.is_closed():
+                return cls._instance
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+        if cls._instance is None or cls._instance._loop is not loop:
+            if cls._instance is not None:
+                # the watchers of a previous event loop are dead with it
+                cls._instance.close()
+            cls._instance = cls(loop)
+        return cls._instance
+
+    def close(self):
+
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+        if self._inotify:
+            if not self._loop.is_closed():
+                self._loop.remove_reader(self._inotify.fileno())
+            self._inotify.close()
+            self._inotify = None
+        self._watchers = set()
+        self._directories = {}
+        self._watch_descriptors = {}
+
+    def stats(self):
+        """
+        :returns: Dictionary with the number of watchers and watched paths
+        """
+
+        return {
+            "backend": "inotify" if self._inotify else "poll",
+            "watchers": len(self._watchers),
+            "watched_paths": len({path for watcher in self._watchers for path in watcher.paths}),
+            "inotify_directories": len(self._directories),
+            "polled_watchers": len([watcher for watcher in self._watchers if watcher.polled])
+        }
+
+    def add(self, watcher):
+
+        self._watchers.add(watcher)
+        if self._inotify and watcher.strategy == "mtime":
+            directories = {os.path.dirname(os.path.abspath(path)) for path in watcher.paths}
+            try:
+                for directory in directories:
+                    self._watch_directory(directory, watcher)
+                watcher.polled = False
+            except OSError as e:
+                log.debug("Files will be polled: {}".format(e))
+                self._unwatch_directories(watcher)
+        self._schedule()
+
+    def remove(self, watcher):
+
+        self._watchers.discard(watcher)
+        self._unwatch_directories(watcher)
+
+    def _watch_directory(self, directory, watcher):
+
+        if directory not in self._directories:
+            wd = self._inotify.add_watch(directory)
+            self._directories[directory] = [wd, set()]
+            self._watch_descriptors[wd] = directory
+        self._directories[directory][1].add(watcher)
+
+    def _unwatch_directories(self, watcher):
+
+        watcher.polled = True
+        for directory, (wd, watchers) in list(self._directories.items()):
+            watchers.discard(watcher)
+            if not watchers:
+                del self._directories[directory]
+                self._watch_descriptors.pop(wd, None)
+                if self._inotify:
+                    self._inotify.rm_watch(wd)
+
+    def _read_inotify_events(self):
+
+        try:
+            events = self._inotify.read_events()
+        except OSError as e:
+            log.warning("Can't read inotify events: {}".format(e))
+            return
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                # some events have been lost, check everything
+                for watcher in self._watchers:
+                    watcher.dirty = True
+                continue
+            directory = self._watch_descriptors.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, name)
+            for watcher in self._directories[directory][1]:
+                if path in watcher.abspaths:
+                    watcher.dirty = True
+        self._schedule()
+
+    def _schedule(self):
+        """
+        Set the timer for the next watcher due for a check
+        """
+
+        if self._checking or self._loop.is_closed():
+            return
+        next_check = None
+        for watcher in self._watchers:
+            if watcher.polled or watcher.dirty:
+                if next_check is None or watcher.next_check < next_check:
+                    next_check = watcher.next_check
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+        if next_check is not None:
+            self._handle = self._loop.call_at(next_check, self._run)
+
+    def _run(self):
+
+        self._handle = None
+        asyncio.ensure_future(self._check())
+
+    async def _check(self):
+
+        self._checking = True
+        try:
+            now = self._loop.time()
+            due = [watcher for watcher in self._watchers if (watcher.polled or watcher.dirty) and watcher.next_check <= now]
+            for watcher in due:
+                watcher.dirty = False
+                watcher.next_check = now + watcher.delay
+            paths = {path for watcher in due for path in watcher.paths}
+            if paths:
+                stats = await self._loop.run_in_executor(None, _stat_paths, paths)
+                for watcher in due:
+                    await watcher.check(stats)
+        except Exception as e:
+            log.error("Error while checking watched files: {}".format(e), exc_info=1)
+        finally:
+            self._checking = False
+            self._schedule()
 
 
 class FileWatcher:
@@ -25,8 +321,8 @@ class FileWatcher:
     Watch for file change and call the callback when something happens
 
     :param paths: A path or a list of file to watch
-    :param delay: Delay between file check (seconds)
-    :param strategy: File change strategy (mtime: modification time, hash: hash compute)
+    :param delay: Minimum delay between file checks (seconds)
+    :param strategy: File change strategy (mtime: modification time, hash: hash compute when the modification time changes)
     """
 
     def __init__(self, paths, callback, delay=1, strategy='mtime'):
@@ -37,69 +333,70 @@ class FileWatcher:
             if not isinstance(path, str):
                 path = str(path)
             self._paths.append(path)
+        self.abspaths = {os.path.abspath(path) for path in self._paths}
 
         self._callback = callback
-        self._delay = delay
+        self.delay = delay
+        self.strategy = strategy
         self._closed = False
-        self._strategy = strategy
+        self.polled = True
+        self.dirty = False
 
-        if self._strategy == 'mtime':
-            # Store modification time
-            self._mtime = {}
-            for path in self._paths:
-                try:
-                    self._mtime[path] = os.stat(path).st_mtime_ns
-                except OSError:
-                    self._mtime[path] = None
-        else:
-            # Store hash
-            self._hashed = {}
-            for path in self._paths:
-                try:
-                    # Alder32 is a fast but insecure hash algorithm
-                    self._hashed[path] = zlib.adler32(open(path, 'rb').read())
-                except OSError:
-                    self._hashed[path] = None
+        # Store modification time and size
+        self._stats = _stat_paths(self._paths)
+        if self.strategy == 'hash':
+            # the hashes are computed in the executor at the first check
+            self._hashed = None
+            self.dirty = True
 
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+        self._service = FileWatcherService.instance()
+        self.next_check = self._service._loop.time() + (0 if self.strategy == 'hash' else self.delay)
+        self._service.add(self)
 
-        loop.call_later(self._delay, self._check_config_file_change)
+    @property
+    def paths(self):
+        return self._paths
 
     def __del__(self):
         self._closed = True
 
     def close(self):
         self._closed = True
+        self._service.remove(self)
+
+    async def check(self, stats):
+        """
+        Check the files for changes
+
+        :param stats: Modification time and size of the files
+        """
 
-    def _check_config_file_change(self):
         if self._closed:
             return
-        changed = False
+        loop = asyncio.get_event_loop()
+        if self.strategy == 'hash' and self._hashed is None:
+            self._hashed = {}
+            for path in self._paths:
+                self._hashed[path] = await loop.run_in_executor(None, _hash_file, path) if stats[path] else None
+            self._stats.update({path: stats[path] for path in self._paths})
+            return
 
         for path in self._paths:
-            if self._strategy == 'mtime':
-                try:
-                    mtime = os.stat(path).st_mtime_ns
-                    if mtime != self._mtime[path]:
-                        changed = True
-                        self._mtime[path] = mtime
-                except OSError:
-                    self._mtime[path] = None
-            else:
-                try:
-                    hashc = zlib.adler32(open(path, 'rb').read())
-                    if hashc != self._hashed[path]:
-                        changed = True
-                        self._hashed[path] = hashc
-                except OSError:
+            st = stats[path]
+            if st == self._stats[path]:
+                continue
+            self._stats[path] = st
+            if st is None:
+                if self.strategy == 'hash':
                     self._hashed[path] = None
-            if changed:
+                continue
+            if self.strategy == 'hash':
+                hashc = await loop.run_in_executor(None, _hash_file, path)
+                if hashc == self._hashed[path]:
+                    continue
+                self._hashed[path] = hashc
+            if not self._closed:
                 self._callback(path)
-        asyncio.get_event_loop().call_later(self._delay, self._check_config_file_change)
 
     @property
     def callback(self):
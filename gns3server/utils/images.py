@@ -16,7 +16,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
+import json
 import hashlib
+import threading
 
 from ..config import Config
 from . import force_unix_path
@@ -25,15 +27,184 @@ from io import DEFAULT_BUFFER_SIZE
 import logging
 log = logging.getLogger(__name__)
 
+# The name starts with a dot so the index is never listed as an image
+IMAGE_INDEX_FILENAME = ".gns3_image_index.json"
+IMAGE_INDEX_VERSION = 1
 
-def list_images(emulator_type):
+
+class ImageIndex:
+    """
+    On disk index of the image checksums and headers of a directory.
+
+    An entry stays valid as long as the size, modification time and inode
+    of the file don't change, so only new or modified files have to be read.
+    """
+
+    def __init__(self, directory):
+
+        self._directory = directory
+        self._path = os.path.join(directory, IMAGE_INDEX_FILENAME)
+        self._entries = {}
+        self._index_mtime_ns = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @property
+    def path(self):
+
+        return self._path
+
+    def _refresh(self):
+        """
+        Load the index from disk if it has been modified by another process
+        """
+
+        if self._dirty:
+            return
+        try:
+            mtime_ns = os.stat(self._path).st_mtime_ns
+        except OSError:
+            return
+        if mtime_ns == self._index_mtime_ns:
+            return
+        self._index_mtime_ns = mtime_ns
+        try:
+            with open(self._path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != IMAGE_INDEX_VERSION:
+                log.debug("Ignoring image index {} with version {}".format(self._path, data.get("version")))
+                return
+            self._entries = data.get("images", {})
+        except (OSError, ValueError, UnicodeDecodeError, AttributeError) as e:
+            log.warning("Can't read image index {}: {}".format(self._path, e))
+
+    @staticmethod
+    def _match(entry, st):
+
+        return entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns and entry["inode"] == st.st_ino
+
+    def get(self, filename, st):
+        """
+        Return the entry of a file if the file has not changed since it has been indexed
+
+        :param filename: Name of the file in the directory
+        :param st: Result of os.stat on the file
+        :returns: Entry dictionary or None
+        """
+
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(filename)
+            if entry is None or not self._match(entry, st):
+                return None
+            return entry
+
+    def update(self, filename, st, **values):
+        """
+        Set values for a file, the previous values are dropped if the file has changed
+        except for the checksum which is kept to detect outdated .md5sum files
+
+        :param filename: Name of the file in the directory
+        :param st: Result of os.stat on the file
+        :param values: Values to store (md5sum, header)
+        """
+
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(filename)
+            if entry is None or not self._match(entry, st):
+                previous = entry
+                entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+                if previous is not None and previous.get("md5sum"):
+                    entry["previous_md5sum"] = previous["md5sum"]
+                self._entries[filename] = entry
+            entry.update(values)
+            self._dirty = True
+
+    def outdated_md5sum(self, filename, st):
+        """
+        Return the checksum indexed for a previous version of a file
+
+        :param filename: Name of the file in the directory
+        :param st: Result of os.stat on the file
+        :returns: Checksum or None
+        """
+
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(filename)
+            if entry is None:
+                return None
+            if not self._match(entry, st):
+                return entry.get("md5sum")
+            return entry.get("previous_md5sum")
+
+    def remove(self, filename):
+
+        with self._lock:
+            self._refresh()
+            if self._entries.pop(filename, None) is not None:
+                self._dirty = True
+
+    def save(self):
+        """
+        Write the index on disk if it has been modified
+        """
+
+        with self._lock:
+            if not self._dirty:
+                return
+            # drop the files removed from the directory
+            for filename in list(self._entries):
+                if not os.path.exists(os.path.join(self._directory, filename)):
+                    del self._entries[filename]
+            tmp_path = "{}.{}.tmp".format(self._path, os.getpid())
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"version": IMAGE_INDEX_VERSION, "images": self._entries}, f)
+                os.replace(tmp_path, self._path)
+                self._index_mtime_ns = os.stat(self._path).st_mtime_ns
+            except OSError as e:
+                # the directory could be read only, the index is kept in memory
+                log.debug("Can't write image index {}: {}".format(self._path, e))
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            self._dirty = False
+
+
+_image_indexes = {}
+_image_indexes_lock = threading.Lock()
+
+
+def image_index(directory):
+    """
+    Return the checksum index of a directory
+
+    :param directory: Directory containing images
+    :returns: ImageIndex instance
+    """
+
+    directory = os.path.abspath(directory)
+    with _image_indexes_lock:
+        index = _image_indexes.get(directory)
+        if index is None:
+            index = _image_indexes[directory] = ImageIndex(directory)
+        return index
+
+
+def list_images(emulator_type, unknown_images=None):
     """
     Scan directories for available image for a given emulator type
 
     :param emulator_type: emulator type (dynamips, qemu, iou)
+    :param unknown_images: If a list is given, the images not in the index are
+    not read, their md5sum is null and their paths are added to the list
     """
     files = set()
     images = []
+    indexes = set()
 
     server_config = Config.instance().get_section_config("Server")
     general_images_directory = os.path.expanduser(server_config.get("images_path", "~/GNS3/images"))
@@ -61,15 +232,24 @@ def list_images(emulator_type):
 
                 files.add(filename)
 
-                filesize = os.stat(os.path.join(root, filename)).st_size
+                image_path = os.path.join(root, filename)
+                st = os.stat(image_path)
+                filesize = st.st_size
                 if filesize < 7:
                     log.debug("File {} is too small to be an image, skipping...".format(filename))
                     continue
 
+                index = image_index(root)
+                indexes.add(index)
                 try:
-                    with open(os.path.join(root, filename), "rb") as f:
-                        # read the first 7 bytes of the file.
-                        elf_header_start = f.read(7)
+                    entry = index.get(filename, st)
+                    if entry is not None and "header" in entry:
+                        elf_header_start = bytes.fromhex(entry["header"])
+                    else:
+                        with open(image_path, "rb") as f:
+                            # read the first 7 bytes of the file.
+                            elf_header_start = f.read(7)
+                        index.update(filename, st, header=elf_header_start.hex())
                     if emulator_type == "dynamips" and elf_header_start != b'\x7fELF\x01\x02\x01':
                         # IOS images must start with the ELF magic number, be 32-bit, big endian and have an ELF version of 1
                         log.warning("IOS image {} does not start with a valid ELF magic number, skipping...".format(filename))
@@ -89,17 +269,24 @@ def list_images(emulator_type):
                     else:
                         path = os.path.relpath(os.path.join(root, filename), default_directory)
 
+                    digest = _indexed_md5sum(image_path, st, index, compute=unknown_images is None)
+                    if digest is None and unknown_images is not None:
+                        unknown_images.append(image_path)
+
                     images.append(
                         {
                             "filename": filename,
                             "path": force_unix_path(path),
-                            "md5sum": md5sum(os.path.join(root, filename)),
+                            "md5sum": digest,
                             "filesize": filesize
                          }
                     )
 
                 except OSError as e:
-                    log.warning("Can't add image {}: {}".format(path, str(e)))
+                    log.warning("Can't add image {}: {}".format(image_path, str(e)))
+
+    for index in indexes:
+        index.save()
     return images
 
 
@@ -161,7 +348,7 @@ def images_directories(emulator_type):
 
 def md5sum(path, stopped_event=None):
     """
-    Return the md5sum of an image and cache it on disk
+    Return the md5sum of an image and cache it in the image index of its directory
 
     :param path: Path to the image
     :param stopped_event: In case you execute this function on thread and would like to have possibility
@@ -172,24 +359,55 @@ def md5sum(path, stopped_event=None):
     if path is None or len(path) == 0 or not os.path.exists(path):
         return None
 
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        log.error("Can't create digest of %s: %s", path, str(e))
+        return None
+    index = image_index(os.path.dirname(path))
+    digest = _indexed_md5sum(path, st, index, stopped_event=stopped_event)
+    index.save()
+    return digest
+
+
+def _indexed_md5sum(path, st, index, stopped_event=None, compute=True):
+    """
+    Return the md5sum of an image from the index, the image is read only
+    if it is not indexed or if it has changed since.
+
+    :param compute: If False, return None instead of reading the image
+    """
+
+    filename = os.path.basename(path)
+    entry = index.get(filename, st)
+    if entry is not None and entry.get("md5sum"):
+        return entry["md5sum"]
+
+    # import the digest from a .md5sum file written by a previous version,
+    # unless it is the checksum of the image before it has been modified
     try:
         with open(path + '.md5sum') as f:
             md5 = f.read().strip()
-            if len(md5) == 32:
+            if len(md5) == 32 and md5 != index.outdated_md5sum(filename, st):
+                index.update(filename, st, md5sum=md5)
                 return md5
     # Unicode error is when user rename an image to .md5sum ....
     except (OSError, UnicodeDecodeError):
         pass
 
+    if not compute:
+        return None
+
     try:
         m = hashlib.md5()
+        chunk_size = image_chunk_size()
         log.debug("Calculating MD5 sum of `{}`".format(path))
         with open(path, 'rb') as f:
             while True:
                 if stopped_event is not None and stopped_event.is_set():
                     log.error("MD5 sum calculation of `{}` has stopped due to cancellation".format(path))
                     return
-                buf = f.read(DEFAULT_BUFFER_SIZE)
+                buf = f.read(chunk_size)
                 if not buf:
                     break
                 m.update(buf)
@@ -198,13 +416,79 @@ def md5sum(path, stopped_event=None):
         log.error("Can't create digest of %s: %s", path, str(e))
         return None
 
+    index.update(filename, st, md5sum=digest)
+    _write_md5sum_file(path, digest)
+    return digest
+
+
+def _write_md5sum_file(path, digest):
+    """
+    Keep the .md5sum file for the previous versions sharing the same images
+    """
+
     try:
         with open('{}.md5sum'.format(path), 'w+') as f:
             f.write(digest)
     except OSError as e:
         log.error("Can't write digest of %s: %s", path, str(e))
 
-    return digest
+
+def image_chunk_size():
+    """
+    :returns: Size of the chunks used to read, write and upload images
+    """
+
+    server_config = Config.instance().get_section_config("Server")
+    return max(DEFAULT_BUFFER_SIZE, int(server_config.get("image_chunk_size", 1024 * 1024)))
+
+
+def image_hashes():
+    """
+    Return the hash objects to update while an image is read or written,
+    the MD5 sum is always computed and the SHA-256 only if image_sha256 is enabled.
+
+    :returns: Dictionary with the name of the checksum as key and the hash object as value
+    """
+
+    hashes = {"md5sum": hashlib.md5()}
+    if Config.instance().get_section_config("Server").getboolean("image_sha256", False):
+        hashes["sha256"] = hashlib.sha256()
+    return hashes
+
+
+def update_image_hashes(hashes, chunk):
+    """
+    Update the hash objects with a chunk of an image
+
+    :param hashes: Dictionary returned by image_hashes()
+    :param chunk: Bytes read or written
+    """
+
+    for h in hashes.values():
+        h.update(chunk)
+
+
+def record_image_checksums(path, hashes):
+    """
+    Save checksums computed while an image was written or read in the image index,
+    the image doesn't have to be read again to get them.
+
+    :param path: Path to the image
+    :param hashes: Dictionary returned by image_hashes() and updated with the whole content of the image
+    :returns: MD5 sum of the image
+    """
+
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        log.error("Can't save digest of %s: %s", path, str(e))
+        return None
+    digests = {name: h.hexdigest() for name, h in hashes.items()}
+    index = image_index(os.path.dirname(path))
+    index.update(os.path.basename(path), st, **digests)
+    index.save()
+    _write_md5sum_file(path, digests["md5sum"])
+    return digests["md5sum"]
 
 
 def remove_checksum(path):
@@ -212,6 +496,10 @@ def remove_checksum(path):
     Remove the checksum of an image from cache if exists
     """
 
+    index = image_index(os.path.dirname(path))
+    index.remove(os.path.basename(path))
+    index.save()
+
     path = '{}.md5sum'.format(path)
     if os.path.exists(path):
         os.remove(path)
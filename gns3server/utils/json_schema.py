@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+JSON schema validators compiled once per schema.
+"""
+
+import jsonschema
+import jsonschema.exceptions
+
+try:
+    import fastjsonschema
+    FASTJSONSCHEMA_AVAILABLE = True
+except ImportError:
+    # fastjsonschema is optional, it generates Python code to validate the data faster
+    FASTJSONSCHEMA_AVAILABLE = False
+
+from ..config import Config
+
+import logging
+log = logging.getLogger(__name__)
+
+
+# Validators indexed by the id of their schema, the schemas are the constants
+# of gns3server.schemas and are kept alive by the validators.
+_validators = {}
+
+
+class SchemaValidator:
+    """
+    Validate data against a schema checked and compiled only once.
+
+    The data is first checked with the fast validator generated by fastjsonschema
+    if it is installed and enabled with the fast_schema_validation option,
+    the errors are always reported by jsonschema.
+
+    :param schema: JSON schema
+    """
+
+    def __init__(self, schema):
+
+        self._schema = schema
+        validator_class = jsonschema.validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        self._validator = validator_class(schema)
+        self._fast_validate = None
+        self._fast_compiled = False
+
+    @property
+    def schema(self):
+
+        return self._schema
+
+    def _fast_validator(self):
+        """
+        Returns the fast validator, compiled the first time.
+        """
+
+        if not self._fast_compiled:
+            self._fast_compiled = True
+            server_config = Config.instance().get_section_config("Server")
+            if FASTJSONSCHEMA_AVAILABLE and server_config.getboolean("fast_schema_validation", False):
+                try:
+                    # do not let the validator add the default values to the data
+                    self._fast_validate = fastjsonschema.compile(self._schema, use_default=False)
+                except Exception as e:
+                    log.warning("Cannot compile a fast validator for schema '{}': {}".format(self._schema.get("description", ""), e))
+        return self._fast_validate
+
+    def is_valid(self, instance):
+        """
+        Returns True if the data is valid.
+        """
+
+        fast_validate = self._fast_validator()
+        if fast_validate:
+            try:
+                fast_validate(instance)
+                return True
+            except fastjsonschema.JsonSchemaException:
+                return False
+        return self._validator.is_valid(instance)
+
+    def validate(self, instance):
+        """
+        Validate the data, raises the same jsonschema.ValidationError as jsonschema.validate()
+        """
+
+        if self.is_valid(instance):
+            return
+        error = jsonschema.exceptions.best_match(self._validator.iter_errors(instance))
+        if error is not None:
+            raise error
+
+
+def get_validator(schema):
+    """
+    Returns the validator of a schema, it is created the first time.
+
+    :param schema: JSON schema
+    """
+
+    validator = _validators.get(id(schema))
+    if validator is None or validator.schema is not schema:
+        validator = SchemaValidator(schema)
+        _validators[id(schema)] = validator
+    return validator
+
+
+def validate(instance, schema):
+    """
+    Validate data with the validator of the schema, this replaces jsonschema.validate()
+    for the schemas used many times.
+
+    :param instance: Data to validate
+    :param schema: JSON schema
+    """
+
+    get_validator(schema).validate(instance)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Serialization of the JSON sent to the clients.
+"""
+
+import json
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    # orjson is optional, the json module of the standard library is used without it
+    ORJSON_AVAILABLE = False
+
+
+def dumps(data, pretty=False):
+    """
+    Serialize data to JSON.
+
+    The output is compact by default and serialized with orjson if it is installed.
+    The pretty output is indented with 4 spaces and has sorted keys, to be read by humans.
+
+    :param data: Data to serialize
+    :param pretty: Indent the output
+
+    :returns: JSON as bytes
+    """
+
+    if pretty:
+        return json.dumps(data, indent=4, sort_keys=True).encode("utf-8")
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            # orjson does not support everything, like the integer keys
+            pass
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def pretty_requested(request):
+    """
+    Check if a client asked for a pretty JSON output, with the pretty parameter
+    of the query string (?pretty=1) or of the media type in the Accept header
+    (Accept: application/json; pretty=1).
+
+    :param request: Request object
+
+    :returns: boolean
+    """
+
+    if request is None:
+        return False
+    value = request.query.get("pretty")
+    if isinstance(value, str):
+        return value.lower() in ("1", "true", "yes")
+    accept = request.headers.get("Accept")
+    if isinstance(accept, str):
+        for media_range in accept.split(","):
+            for parameter in media_range.split(";")[1:]:
+                name, _, value = parameter.partition("=")
+                if name.strip().lower() == "pretty":
+                    return value.strip().strip('"').lower() in ("1", "true", "yes")
+    return False
@@ -16,6 +16,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import json
+import random
 import jsonschema
 import aiohttp
 import aiohttp.web
@@ -27,6 +28,9 @@ import sys
 import os
 
 from ..utils.get_resource import get_resource
+from ..utils.json_schema import get_validator
+from ..utils.json_serializer import dumps, pretty_requested
+from ..config import Config
 from ..version import __version__
 
 log = logging.getLogger(__name__)
@@ -35,16 +39,66 @@ renderer = jinja2.Environment(loader=jinja2.FileSystemLoader(get_resource('templ
 CHUNK_SIZE = 1024 * 8  # 8KB
 
 
+def output_validation_sampled():
+    """
+    Check if a response must be validated against its output schema.
+
+    The output_validation_rate option is the fraction of the responses validated:
+    1 (default) validates all of them and 0 disables the validation.
+    """
+
+    rate = float(Config.instance().get_section_config("Server").get("output_validation_rate", 1))
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def keep_alive_allowed(request):
+    """
+    Check if the connection can be kept alive after answering a request.
+
+    Keep alive creates trouble with old Qt (5.2, 5.3 and 5.4), the connection
+    is closed for the clients with a user agent listed in close_connection_user_agents.
+
+    :param request: Request object
+    :returns: boolean
+    """
+
+    server_config = Config.instance().get_section_config("Server")
+    if not server_config.getboolean("keep_alive", True):
+        return False
+    if request is None:
+        return True
+    user_agent = request.headers.get("User-Agent", "")
+    for legacy_user_agent in server_config.get("close_connection_user_agents", "").split(","):
+        legacy_user_agent = legacy_user_agent.strip()
+        if legacy_user_agent and legacy_user_agent in user_agent:
+            return False
+    return True
+
+
+def default_headers(route, headers=None):
+    """
+    Returns the headers sent with all the responses.
+
+    :param route: Route of the request
+    :param headers: Headers of the response
+    :returns: dictionary
+    """
+
+    headers = dict(headers or {})
+    headers['X-Route'] = route
+    headers['Server'] = "Python/{0[0]}.{0[1]} GNS3/{1}".format(sys.version_info, __version__)
+    return headers
+
+
 class Response(aiohttp.web.Response):
 
-    def __init__(self, request=None, route=None, output_schema=None, headers={}, **kwargs):
+    def __init__(self, request=None, route=None, output_schema=None, headers=None, **kwargs):
         self._route = route
         self._output_schema = output_schema
         self._request = request
-        headers['Connection'] = "close"  # Disable keep alive because create trouble with old Qt (5.2, 5.3 and 5.4)
-        headers['X-Route'] = self._route
-        headers['Server'] = "Python/{0[0]}.{0[1]} GNS3/{1}".format(sys.version_info, __version__)
-        super().__init__(headers=headers, **kwargs)
+        super().__init__(headers=default_headers(self._route, headers), **kwargs)
+        if not keep_alive_allowed(request):
+            self.force_close()
 
     def enable_chunked_encoding(self):
         # Very important: do not send a content length otherwise QT closes the connection (curl can consume the feed)
@@ -91,7 +145,7 @@ class Response(aiohttp.web.Response):
     def json(self, answer):
         """
         Set the response content type to application/json and serialize
-        the content.
+        the content, the output is only indented if the client asks for it.
 
         :param anwser The response as a Python object
         """
@@ -106,13 +160,13 @@ class Response(aiohttp.web.Response):
                     elem = elem.__json__()
                 newanswer.append(elem)
             answer = newanswer
-        if self._output_schema is not None:
+        if self._output_schema and output_validation_sampled():
             try:
-                jsonschema.validate(answer, self._output_schema)
+                get_validator(self._output_schema).validate(answer)
             except jsonschema.ValidationError as e:
                 log.error("Invalid output query. JSON schema error: {}".format(e.message))
                 raise aiohttp.web.HTTPBadRequest(text="{}".format(e))
-        self.body = json.dumps(answer, indent=4, sort_keys=True).encode('utf-8')
+        self.body = dumps(answer, pretty=pretty_requested(self._request))
 
     async def stream_file(self, path, status=200, set_content_type=None, set_content_length=True):
         """
@@ -156,9 +210,58 @@ class Response(aiohttp.web.Response):
         except PermissionError:
             raise aiohttp.web.HTTPForbidden()
 
+    def static_file(self, static_file):
+        """
+        Send a static file, compressed if the client accepts one of its
+        variants, or answer 304 if the client already has it.
+
+        :param static_file: StaticFile instance
+        :returns: FileResponse to return instead of this response when
+        the file is sent as is, None otherwise
+        """
+
+        headers = self._request.headers
+        encoding, data = static_file.variant(headers.get(aiohttp.hdrs.ACCEPT_ENCODING))
+        file_headers = {aiohttp.hdrs.CACHE_CONTROL: static_file.cache_control,
+                        aiohttp.hdrs.CONTENT_TYPE: static_file.content_type}
+        if static_file.variants:
+            file_headers[aiohttp.hdrs.VARY] = aiohttp.hdrs.ACCEPT_ENCODING
+        if encoding is None:
+            # aiohttp sends the file with sendfile() and handles the conditional and range requests
+            return FileResponse(static_file.path, request=self._request, route=self._route, headers=file_headers)
+
+        etag = static_file.variant_etag(encoding)
+        self.headers.update(file_headers)
+        self.headers[aiohttp.hdrs.ETAG] = etag
+        self.last_modified = static_file.mtime
+
+        if_none_match = headers.get(aiohttp.hdrs.IF_NONE_MATCH)
+        if if_none_match:
+            etags = [value.strip() for value in if_none_match.split(",")]
+            if "*" in etags or etag in etags or "W/" + etag in etags:
+                del self.headers[aiohttp.hdrs.CONTENT_TYPE]
+                self.set_status(304)
+                return None
+
+        self.set_status(200)
+        self.headers[aiohttp.hdrs.CONTENT_ENCODING] = encoding
+        self.body = data
+        return None
+
     def redirect(self, url):
         """
         Redirect to url
         :params url: Redirection URL
         """
         raise aiohttp.web.HTTPFound(url)
+
+
+class FileResponse(aiohttp.web.FileResponse):
+    """
+    Send a file from the disk with the same headers as the other responses.
+    """
+
+    def __init__(self, path, request=None, route=None, headers=None, **kwargs):
+        super().__init__(path, headers=default_headers(route, headers), **kwargs)
+        if not keep_alive_allowed(request):
+            self.force_close()
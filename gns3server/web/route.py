@@ -31,6 +31,7 @@ from ..controller.gns3vm.gns3_vm_error import GNS3VMError
 from .response import Response
 from ..crash_report import CrashReport
 from ..config import Config
+from ..utils.json_schema import get_validator
 
 
 import logging
@@ -53,11 +54,13 @@ async def parse_request(request, input_schema, raw):
     # Parse the query string
     if len(request.query_string) > 0:
         for (k, v) in urllib.parse.parse_qs(request.query_string).items():
-            request.json[k] = v[0]
+            # the pretty parameter is used for the output
+            if k != "pretty":
+                request.json[k] = v[0]
 
     if input_schema:
         try:
-            jsonschema.validate(request.json, input_schema)
+            get_validator(input_schema).validate(request.json)
         except jsonschema.ValidationError as e:
             message = "JSON schema error with API request '{}' and JSON data '{}': {}".format(request.path_qs,
                                                                                               request.json,
@@ -138,6 +141,11 @@ class Route(object):
         api_version = kw.get("api_version", 2)
         raw = kw.get("raw", False)
 
+        # Check and compile the schemas once instead of at each call
+        for schema in (input_schema, output_schema):
+            if schema:
+                get_validator(schema)
+
         def register(func):
             # Add the type of server to the route
             if "controller" in func.__module__:
@@ -180,9 +188,12 @@ class Route(object):
 
                         request = await parse_request(request, None, raw)
                         if asyncio.iscoroutinefunction(func):
-                            await func(request, response)
+                            result = await func(request, response)
                         else:
-                            func(request, response)
+                            result = func(request, response)
+                        if isinstance(result, aiohttp.web.StreamResponse):
+                            # the handler has built its own response (e.g. to send a file)
+                            return result
                         return response
 
                     # API call
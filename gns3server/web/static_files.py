@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Static files of the bundled web UI with their compressed variants.
+"""
+
+import os
+import re
+import gzip
+import asyncio
+import mimetypes
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    # brotli is optional, the files are only compressed with gzip without it
+    BROTLI_AVAILABLE = False
+
+from ..utils.get_resource import get_resource
+
+import logging
+log = logging.getLogger(__name__)
+
+
+# The bundler adds a content hash to the name of the files (main.d74d38241f0602d1b3e0.js),
+# these files never change and can be cached forever by the browsers.
+HASHED_FILENAME = re.compile(r"\.[0-9a-f]{16,}\.[^./]+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Extensions of the files worth compressing, the images and the woff fonts are already compressed
+COMPRESSIBLE_EXTENSIONS = (".html", ".js", ".css", ".json", ".map", ".svg", ".txt", ".ttf", ".eot", ".ico")
+MIN_COMPRESS_SIZE = 1024
+
+# Encodings in order of preference with the extension of their precompressed files
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def accepted_encodings(accept_encoding):
+    """
+    Returns the content encodings accepted by a client.
+
+    :param accept_encoding: Value of the Accept-Encoding header
+    :returns: set of encodings
+    """
+
+    encodings = set()
+    for item in (accept_encoding or "").split(","):
+        name, _, parameters = item.partition(";")
+        quality = 1.0
+        for parameter in parameters.split(";"):
+            key, _, value = parameter.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        name = name.strip().lower()
+        if name and quality > 0:
+            encodings.add(name)
+    return encodings
+
+
+class StaticFile:
+    """
+    A static file, its HTTP metadata and its compressed variants.
+
+    :param path: Path of the file
+    :param st: Result of os.stat() for the file
+    """
+
+    def __init__(self, path, st):
+
+        self._path = path
+        self._size = st.st_size
+        self._mtime_ns = st.st_mtime_ns
+        self._etag = '"{:x}-{:x}"'.format(st.st_mtime_ns, st.st_size)
+        self._variants = {}
+
+        # guesstype prefers to have text/html type than application/javascript
+        # which results with warnings in Firefox 66 on Windows
+        # Ref. gns3-server#1559
+        if path.endswith(".js"):
+            self._content_type = "application/javascript"
+        else:
+            self._content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    @property
+    def path(self):
+
+        return self._path
+
+    @property
+    def size(self):
+
+        return self._size
+
+    @property
+    def mtime(self):
+
+        return self._mtime_ns / 1000000000
+
+    @property
+    def etag(self):
+
+        return self._etag
+
+    @property
+    def content_type(self):
+
+        return self._content_type
+
+    @property
+    def immutable(self):
+        """
+        True if the name of the file contains a content hash.
+        """
+
+        return HASHED_FILENAME.search(os.path.basename(self._path)) is not None
+
+    @property
+    def cache_control(self):
+
+        if self.immutable:
+            return IMMUTABLE_CACHE_CONTROL
+        return REVALIDATE_CACHE_CONTROL
+
+    @property
+    def compressible(self):
+
+        return self._path.lower().endswith(COMPRESSIBLE_EXTENSIONS) and self._size >= MIN_COMPRESS_SIZE
+
+    @property
+    def variants(self):
+        """
+        Compressed content of the file indexed by encoding.
+        """
+
+        return self._variants
+
+    def unchanged(self, st):
+        """
+        Check if the file is still the one described by this object.
+
+        :param st: Result of os.stat() for the file
+        """
+
+        return st.st_mtime_ns == self._mtime_ns and st.st_size == self._size
+
+    def variant(self, accept_encoding):
+        """
+        Returns the best compressed variant accepted by a client.
+
+        :param accept_encoding: Value of the Accept-Encoding header
+        :returns: tuple (encoding, data) or (None, None) to send the file as is
+        """
+
+        if self._variants:
+            encodings = accepted_encodings(accept_encoding)
+            for encoding, _ in ENCODINGS:
+                data = self._variants.get(encoding)
+                if data is not None and encoding in encodings:
+                    return encoding, data
+        return None, None
+
+    def variant_etag(self, encoding):
+
+        if encoding is None:
+            return self._etag
+        return '{}-{}"'.format(self._etag[:-1], encoding)
+
+    def compress(self):
+        """
+        Load or compute the compressed variants of the file, this blocks and
+        must run in an executor.
+
+        Variants precompressed at install time (file.js.br and file.js.gz)
+        are used when they are more recent than the file.
+        """
+
+        if not self.compressible or self._variants:
+            return
+        data = None
+        variants = {}
+        for encoding, extension in ENCODINGS:
+            try:
+                precompressed = self._path + extension
+                st = os.stat(precompressed)
+                if st.st_mtime_ns >= self._mtime_ns:
+                    with open(precompressed, "rb") as f:
+                        variants[encoding] = f.read()
+                    continue
+            except OSError:
+                pass
+            if encoding == "br" and not BROTLI_AVAILABLE:
+                continue
+            if data is None:
+                with open(self._path, "rb") as f:
+                    data = f.read()
+            if encoding == "br":
+                compressed = brotli.compress(data)
+            else:
+                compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            # keep the variant only if it saves bytes
+            if len(compressed) < len(data):
+                variants[encoding] = compressed
+        self._variants = variants
+
+
+class StaticFiles:
+    """
+    Static files of a directory, the metadata and the compressed variants are
+    kept between the requests.
+
+    :param root: Directory of the static files
+    """
+
+    def __init__(self, root):
+
+        self._root = root
+        self._files = {}
+
+    @staticmethod
+    def instance():
+        """
+        Singleton to return only one instance of StaticFiles for the bundled web UI.
+
+        :returns: instance of StaticFiles
+        """
+
+        if not hasattr(StaticFiles, "_instance") or StaticFiles._instance is None:
+            StaticFiles._instance = StaticFiles(get_resource(os.path.join("static", "web-ui")))
+        return StaticFiles._instance
+
+    @property
+    def root(self):
+
+        return self._root
+
+    def get(self, filename):
+        """
+        Returns a static file.
+
+        :param filename: Path of the file relative to the root directory
+        :returns: StaticFile instance or None if the file doesn't exist
+        """
+
+        if self._root is None:
+            return None
+        path = os.path.join(self._root, filename)
+        try:
+            st = os.stat(path)
+        except (OSError, ValueError):
+            self._files.pop(filename, None)
+            return None
+        if not os.path.isfile(path):
+            return None
+        static_file = self._files.get(filename)
+        if static_file is None or not static_file.unchanged(st):
+            static_file = StaticFile(path, st)
+            self._files[filename] = static_file
+        return static_file
+
+    def _list_files(self):
+
+        filenames = []
+        for dirpath, _, files in os.walk(self._root):
+            for name in files:
+                if name.endswith((".br", ".gz")):
+                    continue
+                filenames.append(os.path.relpath(os.path.join(dirpath, name), self._root))
+        return filenames
+
+    async def precompress(self):
+        """
+        Compress all the compressible files, the files are sent uncompressed
+        until their variants are ready.
+        """
+
+        if self._root is None or not os.path.isdir(self._root):
+            return
+        loop = asyncio.get_event_loop()
+        log.info("Compressing the static files in '{}'".format(self._root))
+        try:
+            for filename in await loop.run_in_executor(None, self._list_files):
+                static_file = self.get(filename)
+                if static_file is not None and static_file.compressible:
+                    await loop.run_in_executor(None, static_file.compress)
+        except OSError as e:
+            log.warning("Could not compress the static files: {}".format(e))
+            return
+        log.info("Finished compressing the static files")
@@ -35,6 +35,7 @@ import weakref
 import encodings.idna
 
 from .route import Route
+from .static_files import StaticFiles
 from ..config import Config
 from ..compute import MODULES
 from ..compute.port_manager import PortManager
@@ -65,6 +66,7 @@ class WebServer:
         self._running = False
         self._closing = False
         self._ssl_context = None
+        self._static_files_task = None
 
     @staticmethod
     def instance(host=None, port=None):
@@ -109,6 +111,10 @@ class WebServer:
             log.warning("Close is already in progress")
             return
 
+        if self._static_files_task is not None:
+            self._static_files_task.cancel()
+            self._static_files_task = None
+
         # close websocket connections
         websocket_connections = set(self._app['websockets'])
         if websocket_connections:
@@ -245,7 +251,10 @@ class WebServer:
         with concurrent.futures.ProcessPoolExecutor(max_workers=1) as pool:
             try:
                 log.info("Computing image checksums...")
-                await loop.run_in_executor(pool, list_images, "qemu")
+                # the checksums are saved in the image index of each directory,
+                # so only new or modified images are read
+                for emulator_type in ("qemu", "iou", "dynamips"):
+                    await loop.run_in_executor(pool, list_images, emulator_type)
                 log.info("Finished computing image checksums")
             except OSError as e:
                 log.warning("Could not compute image checksums: {}".format(e))
@@ -257,6 +266,11 @@ class WebServer:
 
         await Controller.instance().start()
 
+        # Compress the web UI in the background, the files are sent uncompressed until then
+        server_config = Config.instance().get_section_config("Server")
+        if server_config.getboolean("web_ui_precompress", True):
+            self._static_files_task = asyncio.ensure_future(StaticFiles.instance().precompress())
+
         # Start computing checksums now because it can take a long time
         # for a large image collection
         await self._compute_image_checksums()
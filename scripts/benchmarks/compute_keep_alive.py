@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measure the number of node create / update requests per second sent by the
+controller to a local stand-in compute, with and without HTTP keep-alive.
+
+Usage: python scripts/benchmarks/compute_keep_alive.py [requests] [concurrency]
+"""
+
+import os
+import sys
+import time
+import uuid
+import asyncio
+import aiohttp.web
+
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from gns3server.config import Config
+from gns3server.web.response import Response
+from gns3server.controller.compute import Compute
+
+
+async def create_node(request):
+
+    response = Response(request=request, route="/projects/{project_id}/vpcs/nodes")
+    data = await request.json()
+    response.set_status(201)
+    response.json({"node_id": data.get("node_id"), "name": data.get("name"), "console": 5000, "status": "stopped"})
+    return response
+
+
+async def update_node(request):
+
+    response = Response(request=request, route="/projects/{project_id}/vpcs/nodes/{node_id}")
+    data = await request.json()
+    response.json({"node_id": request.match_info["node_id"], "name": data.get("name"), "console": 5000, "status": "stopped"})
+    return response
+
+
+async def run(compute, requests, concurrency):
+
+    project_id = str(uuid.uuid4())
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def query(i):
+        async with semaphore:
+            node_id = str(uuid.uuid4())
+            await compute.post("/projects/{}/vpcs/nodes".format(project_id), {"node_id": node_id, "name": "PC{}".format(i)})
+            await compute.put("/projects/{}/vpcs/nodes/{}".format(project_id, node_id), {"name": "PC{}-updated".format(i)})
+
+    begin = time.time()
+    await asyncio.gather(*[query(i) for i in range(requests)])
+    return requests * 2 / (time.time() - begin)
+
+
+async def main(requests, concurrency):
+
+    app = aiohttp.web.Application()
+    app.router.add_post("/v2/compute/projects/{project_id}/vpcs/nodes", create_node)
+    app.router.add_put("/v2/compute/projects/{project_id}/vpcs/nodes/{node_id}", update_node)
+    runner = aiohttp.web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = aiohttp.web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    for keep_alive in (False, True):
+        Config.instance().set_section_config("Server", {"keep_alive": keep_alive})
+        compute = Compute("local", controller=MagicMock(), host="127.0.0.1", port=port)
+        compute._connected = True
+        rate = await run(compute, requests, concurrency)
+        await compute.close()
+        print("keep_alive={:<5} {:>8.0f} requests/s".format(str(keep_alive), rate))
+
+    await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000, int(sys.argv[2]) if len(sys.argv) > 2 else 10))
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measure the size and the serialization time of the list of the nodes of a
+project, like returned by /projects/{project_id}/nodes, with the indented
+output used before, the compact output and orjson (when it is installed).
+
+The nodes are read from a .gns3 project file, or generated if no file is given.
+
+Usage: python scripts/benchmarks/json_response.py [project.gns3] [iterations]
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from gns3server.utils import json_serializer
+
+
+def generated_nodes(count):
+
+    nodes = []
+    for i in range(count):
+        node_id = str(uuid.uuid4())
+        nodes.append({
+            "compute_id": "local",
+            "project_id": str(uuid.uuid4()),
+            "node_id": node_id,
+            "node_type": "qemu",
+            "node_directory": "/home/gns3/GNS3/projects/demo/project-files/qemu/{}".format(node_id),
+            "name": "QEMU-{}".format(i),
+            "status": "started",
+            "console": 5000 + i,
+            "console_host": "127.0.0.1",
+            "console_type": "telnet",
+            "console_auto_start": False,
+            "command_line": "/usr/bin/qemu-system-x86_64 -name QEMU-{} -m 1024M -smp cpus=1 -enable-kvm".format(i),
+            "symbol": ":/symbols/qemu_guest.svg",
+            "label": {"rotation": 0, "style": "font-size: 10;font-style: Verdana", "text": "QEMU-{}".format(i), "x": -3, "y": -25},
+            "x": i * 10,
+            "y": i * 5,
+            "z": 1,
+            "width": 65,
+            "height": 53,
+            "locked": False,
+            "port_name_format": "Ethernet{0}",
+            "port_segment_size": 0,
+            "first_port_name": None,
+            "custom_adapters": [],
+            "ports": [{"adapter_number": p, "port_number": 0, "name": "Ethernet{}".format(p), "short_name": "e{}".format(p),
+                       "data_link_types": {"Ethernet": "DLT_EN10MB"}, "link_type": "ethernet"} for p in range(4)],
+            "properties": {
+                "adapter_type": "e1000",
+                "adapters": 4,
+                "bios_image": "",
+                "boot_priority": "c",
+                "cpu_throttling": 0,
+                "cpus": 1,
+                "hda_disk_image": "linux.qcow2",
+                "hda_disk_image_md5sum": "c0ffee00c0ffee00c0ffee00c0ffee00",
+                "hda_disk_interface": "virtio",
+                "kernel_command_line": "",
+                "legacy_networking": False,
+                "linked_clone": True,
+                "mac_address": "0c:7a:1d:83:{:02x}:00".format(i % 256),
+                "on_close": "power_off",
+                "options": "-nographic",
+                "platform": "x86_64",
+                "process_priority": "normal",
+                "qemu_path": "/usr/bin/qemu-system-x86_64",
+                "ram": 1024,
+                "usage": ""
+            }
+        })
+    return nodes
+
+
+def measure(name, func, iterations):
+
+    begin = time.perf_counter()
+    for _ in range(iterations):
+        data = func()
+    elapsed = time.perf_counter() - begin
+    print("{:<30} {:>10.2f} ms {:>10.1f} KB".format(name, elapsed / iterations * 1000, len(data) / 1024))
+
+
+def main(path, iterations):
+
+    if path:
+        with open(path, encoding="utf-8") as f:
+            nodes = json.load(f)["topology"]["nodes"]
+    else:
+        nodes = generated_nodes(500)
+    print("{} nodes".format(len(nodes)))
+
+    measure("indent=4 sort_keys", lambda: json.dumps(nodes, indent=4, sort_keys=True).encode("utf-8"), iterations)
+    with patch.object(json_serializer, "ORJSON_AVAILABLE", False):
+        measure("compact json", lambda: json_serializer.dumps(nodes), iterations)
+    if json_serializer.ORJSON_AVAILABLE:
+        measure("compact orjson", lambda: json_serializer.dumps(nodes), iterations)
+    measure("pretty", lambda: json_serializer.dumps(nodes, pretty=True), iterations)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None, int(sys.argv[2]) if len(sys.argv) > 2 else 20)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measure the time to validate data against the biggest JSON schemas with
+jsonschema.validate(), with the validators compiled once and with the
+validators generated by fastjsonschema (when it is installed).
+
+Usage: python scripts/benchmarks/json_schema.py [iterations] [topology nodes]
+"""
+
+import os
+import sys
+import time
+import uuid
+import jsonschema
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from gns3server.config import Config
+from gns3server.version import __version__
+from gns3server.schemas.qemu import QEMU_CREATE_SCHEMA
+from gns3server.schemas.dynamips_vm import VM_CREATE_SCHEMA
+from gns3server.schemas.topology import TOPOLOGY_SCHEMA
+from gns3server.utils.json_schema import SchemaValidator, FASTJSONSCHEMA_AVAILABLE
+
+
+QEMU_NODE = {
+    "name": "QEMU1",
+    "node_id": str(uuid.uuid4()),
+    "qemu_path": "/usr/bin/qemu-system-x86_64",
+    "platform": "x86_64",
+    "hda_disk_image": "linux.qcow2",
+    "hda_disk_interface": "virtio",
+    "ram": 1024,
+    "cpus": 2,
+    "adapters": 4,
+    "adapter_type": "e1000",
+    "mac_address": "0c:7a:1d:83:94:00",
+    "console_type": "telnet",
+    "boot_priority": "c",
+    "on_close": "power_off",
+    "options": "-nographic"
+}
+
+DYNAMIPS_NODE = {
+    "name": "R1",
+    "node_id": str(uuid.uuid4()),
+    "platform": "c7200",
+    "image": "c7200-adventerprisek9-mz.124-24.T8.image",
+    "ram": 512,
+    "nvram": 512,
+    "npe": "npe-400",
+    "midplane": "vxr",
+    "idlepc": "0x606e0538",
+    "idlemax": 500,
+    "idlesleep": 30,
+    "exec_area": 64,
+    "mmap": True,
+    "sparsemem": True,
+    "disk0": 0,
+    "disk1": 0,
+    "slot0": "C7200-IO-FE",
+    "slot1": "PA-2FE-TX",
+    "system_id": "FTX0945W0MY"
+}
+
+
+def topology(nodes):
+
+    properties = dict(DYNAMIPS_NODE)
+    del properties["name"]
+    del properties["node_id"]
+    return {
+        "project_id": str(uuid.uuid4()),
+        "name": "benchmark",
+        "type": "topology",
+        "revision": 9,
+        "version": __version__,
+        "topology": {
+            "nodes": [{
+                "name": "R{}".format(i),
+                "node_id": str(uuid.uuid4()),
+                "node_type": "dynamips",
+                "compute_id": "local",
+                "console": 5000 + i,
+                "console_type": "telnet",
+                "x": i,
+                "y": i,
+                "z": 1,
+                "symbol": ":/symbols/router.svg",
+                "properties": properties
+            } for i in range(nodes)],
+            "links": [],
+            "computes": [],
+            "drawings": []
+        }
+    }
+
+
+def measure(name, func, iterations):
+
+    begin = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - begin
+    print("{:<40} {:>10.1f} us".format(name, elapsed / iterations * 1000000))
+
+
+def main(iterations, nodes):
+
+    benchmarks = (("qemu create", QEMU_CREATE_SCHEMA, QEMU_NODE),
+                  ("dynamips create", VM_CREATE_SCHEMA, DYNAMIPS_NODE),
+                  ("topology {} nodes".format(nodes), TOPOLOGY_SCHEMA, topology(nodes)))
+
+    server_config = Config.instance().get_section_config("Server")
+    for name, schema, instance in benchmarks:
+        jsonschema.validate(instance, schema)
+        measure("{} jsonschema.validate".format(name), lambda: jsonschema.validate(instance, schema), iterations)
+
+        server_config["fast_schema_validation"] = "False"
+        validator = SchemaValidator(schema)
+        measure("{} compiled".format(name), lambda: validator.validate(instance), iterations)
+
+        if FASTJSONSCHEMA_AVAILABLE:
+            server_config["fast_schema_validation"] = "True"
+            validator = SchemaValidator(schema)
+            measure("{} fastjsonschema".format(name), lambda: validator.validate(instance), iterations)
+        print()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000, int(sys.argv[2]) if len(sys.argv) > 2 else 50)
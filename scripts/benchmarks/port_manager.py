@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measure the time needed to allocate UDP ports with the linear search
+(find_unused_port from the start of the range for each port) and with
+the port manager allocator, once with one call per port and once with
+a single batch reservation.
+
+Usage: python scripts/benchmarks/port_manager.py [ports]
+"""
+
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from gns3server.compute.port_manager import PortManager
+from gns3server.compute.project import Project
+
+
+def linear(pm, project, ports):
+
+    used_ports = set()
+    for _ in range(ports):
+        port = PortManager.find_unused_port(pm.udp_port_range[0],
+                                            pm.udp_port_range[1],
+                                            host=pm.udp_host,
+                                            socket_type="UDP",
+                                            ignore_ports=used_ports)
+        used_ports.add(port)
+
+
+def allocator(pm, project, ports):
+
+    for _ in range(ports):
+        pm.get_free_udp_port(project)
+
+
+def batch(pm, project, ports):
+
+    pm.get_free_udp_ports(project, ports)
+
+
+def main(ports):
+
+    for name, func in (("linear", linear), ("allocator", allocator), ("batch", batch)):
+        pm = PortManager()
+        pm.udp_port_range = (20000, 20000 + ports * 2)
+        project = Project(project_id=str(uuid.uuid4()))
+        start = time.perf_counter()
+        func(pm, project, ports)
+        elapsed = time.perf_counter() - start
+        print("{:<10} {} ports in {:.3f}s ({:.1f} µs/port)".format(name, ports, elapsed, elapsed / ports * 1000000))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
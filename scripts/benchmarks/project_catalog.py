@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measure the time to read the settings of the projects of a projects directory
+when the controller starts: full load of each topology (previous behavior),
+first start without project catalog and next starts with the catalog.
+
+Usage: python scripts/benchmarks/project_catalog.py [projects] [nodes per project] [workers]
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from gns3server.version import __version__
+from gns3server.controller.topology import load_topology
+from gns3server.controller.project_catalog import ProjectCatalog, list_project_files
+
+
+def write_projects(projects_path, projects, nodes):
+
+    for i in range(projects):
+        os.makedirs(os.path.join(projects_path, "project{}".format(i)))
+        topology = {
+            "project_id": str(uuid.uuid4()),
+            "name": "project{}".format(i),
+            "revision": 9,
+            "type": "topology",
+            "version": __version__,
+            "topology": {
+                "nodes": [{
+                    "name": "R{}".format(n),
+                    "node_id": str(uuid.uuid4()),
+                    "node_type": "dynamips",
+                    "compute_id": "local",
+                    "console": 5000 + n,
+                    "console_type": "telnet",
+                    "x": n,
+                    "y": n,
+                    "z": 1,
+                    "symbol": ":/symbols/router.svg",
+                    "properties": {
+                        "platform": "c7200",
+                        "image": "c7200-adventerprisek9-mz.124-24.T8.image",
+                        "ram": 512,
+                        "nvram": 512,
+                        "npe": "npe-400",
+                        "midplane": "vxr",
+                        "idlepc": "0x606e0538",
+                        "slot0": "C7200-IO-FE",
+                        "slot1": "PA-2FE-TX"
+                    }
+                } for n in range(nodes)],
+                "links": [],
+                "computes": [],
+                "drawings": []
+            }
+        }
+        with open(os.path.join(projects_path, "project{}".format(i), "project{}.gns3".format(i)), "w") as f:
+            json.dump(topology, f, indent=4, sort_keys=True)
+
+
+def measure(name, func):
+
+    begin = time.perf_counter()
+    count = len(func())
+    print("{:<40} {:>10.1f} ms ({} projects)".format(name, (time.perf_counter() - begin) * 1000, count))
+
+
+def main(projects, nodes, workers):
+
+    with tempfile.TemporaryDirectory() as projects_path:
+        write_projects(projects_path, projects, nodes)
+        paths = list_project_files(projects_path)
+
+        measure("load_topology", lambda: [load_topology(path) for path in paths])
+        measure("no catalog, 1 worker", lambda: asyncio.run(ProjectCatalog(projects_path).read_projects(paths, workers=1)))
+        os.remove(ProjectCatalog(projects_path).path)
+        measure("no catalog, {} workers".format(workers), lambda: asyncio.run(ProjectCatalog(projects_path).read_projects(paths, workers=workers)))
+        measure("catalog", lambda: asyncio.run(ProjectCatalog(projects_path).read_projects(paths, workers=workers)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1500,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 30,
+         int(sys.argv[3]) if len(sys.argv) > 3 else 4)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measure the throughput of the streaming ZIP archive used for project exports
+compared to the zipfile module, with and without compression.
+
+Usage: python scripts/benchmarks/zip_stream.py [files] [file size in MB]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import zipfile
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from gns3server.utils.asyncio import aiozipstream
+
+
+class NullWriter:
+    """
+    Seekable file object dropping the data
+    """
+
+    def __init__(self):
+        self._pos = 0
+
+    def write(self, data):
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, pos, whence=0):
+        self._pos = pos
+
+    def flush(self):
+        pass
+
+
+def stock_zipfile(paths, compression):
+
+    with zipfile.ZipFile(NullWriter(), "w", compression=compression) as z:
+        for path in paths:
+            z.write(path, arcname=os.path.basename(path))
+
+
+async def stream_zipfile(paths, compression, chunksize, parallel):
+
+    with aiozipstream.ZipFile(compression=compression, chunksize=chunksize, parallel=parallel) as z:
+        for path in paths:
+            z.write(path, arcname=os.path.basename(path))
+        async for _ in z:
+            pass
+
+
+def main(files, size):
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        # half random data and half zeros to have something to compress
+        data = os.urandom(512 * 1024) + bytes(512 * 1024)
+        for i in range(files):
+            path = os.path.join(directory, "disk{}.qcow2".format(i))
+            with open(path, "wb") as f:
+                for _ in range(size):
+                    f.write(data)
+            paths.append(path)
+        total = files * size
+
+        for compression, name in ((zipfile.ZIP_STORED, "stored"), (zipfile.ZIP_DEFLATED, "deflated")):
+            begin = time.time()
+            stock_zipfile(paths, compression)
+            print("{:<8} zipfile                       {:>8.1f} MB/s".format(name, total / (time.time() - begin)))
+            for chunksize in (32 * 1024, 1024 * 1024):
+                for parallel in (1, 4):
+                    begin = time.time()
+                    asyncio.run(stream_zipfile(paths, compression, chunksize, parallel))
+                    print("{:<8} aiozipstream chunk={:>4}K parallel={} {:>8.1f} MB/s".format(name, chunksize // 1024, parallel, total / (time.time() - begin)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4, int(sys.argv[2]) if len(sys.argv) > 2 else 64)
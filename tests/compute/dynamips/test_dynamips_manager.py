@@ -24,7 +24,8 @@ import os
 
 from gns3server.compute.dynamips import Dynamips
 from gns3server.compute.dynamips.dynamips_error import DynamipsError
-from unittest.mock import patch
+from gns3server.compute.dynamips.idlepc_search import IdlePCSearch
+from unittest.mock import patch, MagicMock
 from tests.utils import asyncio_patch, AsyncioMagicMock
 
 
@@ -126,3 +127,136 @@ async def test_duplicate_node(manager, compute_project):
         with open(destination_node.startup_config_path) as f:
             content = f.read()
             assert content == '!\nhostname R2\necho TEST'
+
+
+def _device(project, name, ram=0):
+
+    device = MagicMock()
+    device.name = name
+    device.project = project
+    device.ram = ram
+    return device
+
+
+def _hypervisors(count):
+
+    hypervisors = []
+    for _ in range(count):
+        hypervisor = MagicMock()
+        hypervisor.devices = []
+        hypervisor.is_running.return_value = True
+        hypervisors.append(hypervisor)
+
+    new_hypervisors = iter(hypervisors)
+
+    async def start_new_hypervisor(working_dir=None):
+        return next(new_hypervisors)
+
+    return hypervisors, start_new_hypervisor
+
+
+async def test_allocate_hypervisor_per_device(manager, compute_project):
+
+    hypervisors, start_new_hypervisor = _hypervisors(2)
+    with asyncio_patch("gns3server.compute.dynamips.Dynamips.start_new_hypervisor", side_effect=start_new_hypervisor):
+        assert await manager.allocate_hypervisor(_device(compute_project, "R1", 256), "/tmp", ram=256) == hypervisors[0]
+        assert await manager.allocate_hypervisor(_device(compute_project, "SW1"), "/tmp") == hypervisors[1]
+
+
+async def test_allocate_hypervisor_pool(manager, compute_project, config):
+
+    config.set_section_config("Dynamips", {"allocate_hypervisor_per_device": False, "max_ram_per_hypervisor": 512})
+    hypervisors, start_new_hypervisor = _hypervisors(2)
+    with asyncio_patch("gns3server.compute.dynamips.Dynamips.start_new_hypervisor", side_effect=start_new_hypervisor) as mock:
+        assert await manager.allocate_hypervisor(_device(compute_project, "R1", 256), "/tmp", ram=256) == hypervisors[0]
+        assert await manager.allocate_hypervisor(_device(compute_project, "R2", 256), "/tmp", ram=256) == hypervisors[0]
+        assert await manager.allocate_hypervisor(_device(compute_project, "R3", 256), "/tmp", ram=256) == hypervisors[1]
+        # lightweight devices go to the least loaded hypervisor
+        assert await manager.allocate_hypervisor(_device(compute_project, "SW1"), "/tmp") == hypervisors[1]
+        assert mock.call_count == 2
+    assert len(hypervisors[0].devices) == 2
+    assert len(hypervisors[1].devices) == 2
+
+
+async def test_allocate_hypervisor_pool_max_hypervisors(manager, compute_project, config):
+
+    config.set_section_config("Dynamips", {"allocate_hypervisor_per_device": False, "max_ram_per_hypervisor": 256, "max_hypervisors": 1})
+    hypervisors, start_new_hypervisor = _hypervisors(2)
+    with asyncio_patch("gns3server.compute.dynamips.Dynamips.start_new_hypervisor", side_effect=start_new_hypervisor) as mock:
+        assert await manager.allocate_hypervisor(_device(compute_project, "R1", 256), "/tmp", ram=256) == hypervisors[0]
+        assert await manager.allocate_hypervisor(_device(compute_project, "R2", 256), "/tmp", ram=256) == hypervisors[0]
+        assert mock.call_count == 1
+
+
+async def test_allocate_hypervisor_pool_stopped(manager, compute_project, config):
+
+    config.set_section_config("Dynamips", {"allocate_hypervisor_per_device": False})
+    hypervisors, start_new_hypervisor = _hypervisors(2)
+    with asyncio_patch("gns3server.compute.dynamips.Dynamips.start_new_hypervisor", side_effect=start_new_hypervisor):
+        assert await manager.allocate_hypervisor(_device(compute_project, "R1", 256), "/tmp", ram=256) == hypervisors[0]
+        hypervisors[0].is_running.return_value = False
+        assert await manager.allocate_hypervisor(_device(compute_project, "R2", 256), "/tmp", ram=256) == hypervisors[1]
+
+
+class FakeRouter:
+
+    def __init__(self, name, cpu_usages):
+
+        self.name = name
+        self.idlepc = "0x0"
+        self.image = ""
+        self._cpu_usages = cpu_usages
+
+    async def set_idlepc(self, idlepc):
+        self.idlepc = idlepc
+
+    async def get_status(self):
+        return "running"
+
+    async def get_idle_pc_prop(self):
+        return ["0x60aa1da0 [153]", "0x6076e0b4 [49]"]
+
+    async def get_cpu_usage(self):
+        # seconds of CPU used since the router has started
+        return self._cpu_usages[self.idlepc]()
+
+
+async def test_idlepc_search(manager):
+
+    elapsed = {"0x60aa1da0": 0, "0x6076e0b4": 0}
+
+    def busy():
+        elapsed["0x60aa1da0"] += 1
+        return elapsed["0x60aa1da0"]
+
+    vm = FakeRouter("R1", {"0x0": lambda: 0, "0x60aa1da0": busy, "0x6076e0b4": lambda: 0})
+    search = IdlePCSearch(manager, vm, instances=0, sample_interval=0.5)
+    assert await search.run() == "0x6076e0b4"
+    assert vm.idlepc == "0x6076e0b4"
+
+
+async def test_idlepc_search_no_suitable_value(manager):
+
+    usage = {"value": 0}
+
+    def busy():
+        usage["value"] += 1
+        return usage["value"]
+
+    vm = FakeRouter("R1", {"0x0": busy, "0x60aa1da0": busy, "0x6076e0b4": busy})
+    with pytest.raises(DynamipsError):
+        await IdlePCSearch(manager, vm, instances=0, sample_interval=0.5).run()
+
+
+async def test_auto_idlepc_cached(manager, tmpdir):
+
+    image = str(tmpdir / "c7200.image")
+    with open(image, "w+") as f:
+        f.write("1")
+    vm = FakeRouter("R1", {})
+    vm.image = image
+    with asyncio_patch("gns3server.compute.dynamips.idlepc_search.IdlePCSearch.run", return_value="0x60aa1da0") as mock:
+        assert await manager.auto_idlepc(vm) == "0x60aa1da0"
+        assert await manager.auto_idlepc(vm) == "0x60aa1da0"
+        assert mock.call_count == 1
+    assert vm.idlepc == "0x60aa1da0"
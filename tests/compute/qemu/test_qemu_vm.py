@@ -20,6 +20,7 @@ import asyncio
 import os
 import sys
 import stat
+import shutil
 from tests.utils import asyncio_patch, AsyncioMagicMock
 
 
@@ -372,6 +373,67 @@ async def test_disk_options(vm, tmpdir, fake_qemu_img_binary):
     ]
 
 
+async def test_check_disk_image_cached(vm, tmpdir):
+
+    disk_image = str(tmpdir / "test.qcow2")
+    with open(disk_image, "w+") as f:
+        f.write("1")
+
+    async def qemu_img_exec(command):
+        await asyncio.sleep(0.01)
+        return 0
+
+    with asyncio_patch("gns3server.compute.qemu.qemu_vm.QemuVM._qemu_img_exec", side_effect=qemu_img_exec) as mock:
+        # concurrent checks of the same image share a single qemu-img execution
+        await asyncio.gather(vm._check_disk_image(disk_image), vm._check_disk_image(disk_image))
+        await vm._check_disk_image(disk_image)
+        assert mock.call_count == 1
+
+        with open(disk_image, "w+") as f:
+            f.write("12")
+        await vm._check_disk_image(disk_image)
+        assert mock.call_count == 2
+
+
+async def test_qemu_img_info_cached(vm, tmpdir):
+
+    base_image = str(tmpdir / "base.qcow2")
+    open(base_image, "w+").close()
+    linked_clone = os.path.join(vm.working_dir, "hda_disk.qcow2")
+    open(linked_clone, "w+").close()
+
+    with asyncio_patch("gns3server.compute.qemu.qemu_vm.subprocess_check_output", return_value='{"format": "qcow2"}') as mock:
+        await vm._qemu_img_info(base_image)
+        await vm._qemu_img_info(base_image)
+        assert mock.call_count == 1
+        # the disks of the VM are not cached, the VM saves its state in them
+        await vm._qemu_img_info(linked_clone)
+        await vm._qemu_img_info(linked_clone)
+        assert mock.call_count == 3
+
+
+async def test_disk_options_linked_clone_rebase(vm, tmpdir, fake_qemu_img_binary):
+
+    vm._hda_disk_image = str(tmpdir / "empty8G.qcow2")
+    shutil.copy("tests/resources/empty8G.qcow2", vm._hda_disk_image)
+    disk = os.path.join(vm.working_dir, "hda_disk.qcow2")
+    shutil.copy("tests/resources/linked.qcow2", disk)
+
+    try:
+        with asyncio_patch("gns3server.compute.qemu.qemu_vm.QemuVM._check_disk_image"):
+            with asyncio_patch("gns3server.compute.qemu.qemu_vm.QemuVM._find_disk_file_format", return_value="qcow2"):
+                with asyncio_patch("gns3server.compute.qemu.utils.qcow2.Qcow2.rebase") as mock_rebase:
+                    await vm._disk_options()
+                    mock_rebase.assert_called_with(fake_qemu_img_binary, vm._hda_disk_image, "qcow2")
+                # the linked clone already uses the base image
+                with patch("gns3server.compute.qemu.utils.qcow2.Qcow2.backing_file", new_callable=mock.PropertyMock, return_value=vm._hda_disk_image):
+                    with asyncio_patch("gns3server.compute.qemu.utils.qcow2.Qcow2.rebase") as mock_rebase:
+                        await vm._disk_options()
+                        assert not mock_rebase.called
+    finally:
+        os.remove(disk)
+
+
 async def test_cdrom_option(vm, tmpdir, fake_qemu_img_binary):
 
     vm._cdrom_image = str(tmpdir / "test.iso")
@@ -509,30 +571,45 @@ async def test_control_vm(vm, running_subprocess_mock):
 
     vm._process = running_subprocess_mock
     vm._monitor = 4242
-    reader = MagicMock()
-    writer = MagicMock()
-    with asyncio_patch("asyncio.open_connection", return_value=(reader, writer)):
-        res = await vm._control_vm("test")
-        writer.write.assert_called_with(b"test\n")
+    with asyncio_patch("gns3server.compute.qemu.qemu_vm.QMPClient.connect") as mock_connect:
+        with asyncio_patch("gns3server.compute.qemu.qemu_vm.QMPClient.execute", return_value="") as mock_execute:
+            with patch("gns3server.compute.qemu.qemu_vm.QMPClient.connected", new_callable=mock.PropertyMock, return_value=True):
+                res = await vm._control_vm("test")
+                mock_execute.assert_called_with("human-monitor-command", {"command-line": "test"}, timeout=30)
+                await vm._control_vm("test")
     assert res is None
+    # the connection is kept open between the commands
+    assert mock_connect.call_count == 1
 
 
 async def test_control_vm_expect_text(vm, running_subprocess_mock):
 
     vm._process = running_subprocess_mock
-    reader = MagicMock()
-    writer = MagicMock()
-    with asyncio_patch("asyncio.open_connection", return_value=(reader, writer)):
+    vm._monitor = 4242
+    with asyncio_patch("gns3server.compute.qemu.qemu_vm.QMPClient.connect"):
+        with asyncio_patch("gns3server.compute.qemu.qemu_vm.QMPClient.execute", return_value="hello\r\nepic product\r\n"):
+            res = await vm._control_vm("test", [b"epic"])
+    assert res == "epic product"
 
-        future = asyncio.Future()
-        future.set_result(b"epic product")
-        reader.readline.return_value = future
 
-        vm._monitor = 4242
-        res = await vm._control_vm("test", [b"epic"])
-        writer.write.assert_called_with(b"test\n")
+async def test_get_vm_status(vm, running_subprocess_mock):
 
-    assert res == "epic product"
+    vm._process = running_subprocess_mock
+    vm._monitor = 4242
+    with asyncio_patch("gns3server.compute.qemu.qemu_vm.QMPClient.connect"):
+        with asyncio_patch("gns3server.compute.qemu.qemu_vm.QMPClient.execute", return_value={"status": "paused", "running": False}) as mock_execute:
+            with patch("gns3server.compute.qemu.qemu_vm.QMPClient.connected", new_callable=mock.PropertyMock, return_value=True):
+                assert await vm._get_vm_status() == "paused"
+                assert mock_execute.call_count == 1
+                # the status is updated by the events
+                vm._qmp_event("RESUME", {})
+                assert vm.status == "started"
+                assert await vm._get_vm_status() == "running"
+                assert mock_execute.call_count == 1
+                vm._qmp_event("STOP", {})
+                assert vm.status == "suspended"
+                assert await vm._get_vm_status() == "paused"
+                assert mock_execute.call_count == 2
 
 
 async def test_build_command(vm, fake_qemu_binary):
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import pytest
+import asyncio
+
+from gns3server.compute.qemu.utils.qmp import QMPClient, QMPError
+
+
+@pytest.fixture
+async def qmp_server():
+    """
+    Minimal QMP server: answers the commands in the reverse order
+    they are received to check the responses are matched by id.
+    """
+
+    server_info = {"connections": 0, "commands": []}
+
+    async def handle(reader, writer):
+
+        server_info["connections"] += 1
+        writer.write(json.dumps({"QMP": {"version": {"qemu": {"major": 8, "minor": 2, "micro": 0}}, "capabilities": []}}).encode() + b"\n")
+        batch = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            message = json.loads(line.decode())
+            server_info["commands"].append(message["execute"])
+            if message["execute"] == "qmp_capabilities":
+                writer.write(json.dumps({"return": {}, "id": message["id"]}).encode() + b"\n")
+                continue
+            batch.append(message)
+            if message["execute"] == "wait":
+                continue
+            for message in reversed(batch):
+                if message["execute"] == "fail":
+                    response = {"error": {"class": "GenericError", "desc": "failed"}, "id": message["id"]}
+                else:
+                    if message["execute"] == "stop":
+                        writer.write(json.dumps({"event": "STOP", "data": {}, "timestamp": {}}).encode() + b"\n")
+                    response = {"return": message["execute"], "id": message["id"]}
+                writer.write(json.dumps(response).encode() + b"\n")
+            batch = []
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    server_info["port"] = server.sockets[0].getsockname()[1]
+    yield server_info
+    server.close()
+    await server.wait_closed()
+
+
+async def test_execute(qmp_server):
+
+    events = []
+    client = QMPClient("127.0.0.1", qmp_server["port"], event_callback=lambda event, data: events.append(event))
+    await client.connect()
+    assert client.connected
+    assert client.version == {"major": 8, "minor": 2, "micro": 0}
+
+    # both commands are sent before the first response is received
+    results = await asyncio.gather(client.execute("wait"), client.execute("stop"))
+    assert results == ["wait", "stop"]
+    assert events == ["STOP"]
+
+    with pytest.raises(QMPError):
+        await client.execute("fail")
+    assert await client.execute("cont") == "cont"
+    assert qmp_server["connections"] == 1
+    assert qmp_server["commands"] == ["qmp_capabilities", "wait", "stop", "fail", "cont"]
+
+    await client.close()
+    assert not client.connected
+    with pytest.raises(QMPError):
+        await client.execute("cont")
+
+
+async def test_connect_error():
+
+    client = QMPClient("127.0.0.1", 1)
+    with pytest.raises(QMPError):
+        await client.connect(timeout=0.1)
+    assert not client.connected
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import asyncio
+
+from gns3server.compute.binary_registry import BinaryRegistry
+
+
+def _executable(tmpdir):
+
+    path = str(tmpdir / "dynamips")
+    with open(path, "w+") as f:
+        f.write("1")
+    return path
+
+
+async def test_get_cached(tmpdir):
+
+    path = _executable(tmpdir)
+    calls = []
+
+    async def probe():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return "0.2.21"
+
+    registry = BinaryRegistry.instance()
+    results = await asyncio.gather(*[registry.get("dynamips_version", path, probe) for _ in range(5)])
+    assert results == ["0.2.21"] * 5
+    assert await registry.get("dynamips_version", path, probe) == "0.2.21"
+    assert len(calls) == 1
+
+
+async def test_get_executable_changed(tmpdir):
+
+    path = _executable(tmpdir)
+    versions = ["0.2.21", "0.2.22"]
+
+    async def probe():
+        return versions.pop(0)
+
+    registry = BinaryRegistry.instance()
+    assert await registry.get("dynamips_version", path, probe) == "0.2.21"
+    with open(path, "w+") as f:
+        f.write("12")
+    assert await registry.get("dynamips_version", path, probe) == "0.2.22"
+
+
+async def test_get_persistent(tmpdir):
+
+    path = _executable(tmpdir)
+
+    async def probe():
+        return "0.2.21"
+
+    async def failing_probe():
+        raise AssertionError("The executable should not be probed again")
+
+    await BinaryRegistry.instance().get("dynamips_version", path, probe)
+    BinaryRegistry._instance = None
+    assert await BinaryRegistry.instance().get("dynamips_version", path, failing_probe) == "0.2.21"
+
+
+async def test_get_error_not_cached(tmpdir):
+
+    path = _executable(tmpdir)
+    calls = []
+
+    async def probe():
+        calls.append(1)
+        raise OSError("failed")
+
+    registry = BinaryRegistry.instance()
+    for _ in range(2):
+        try:
+            await registry.get("dynamips_version", path, probe)
+        except OSError:
+            pass
+    assert len(calls) == 2
+
+
+async def test_refresh(tmpdir):
+
+    path = _executable(tmpdir)
+    calls = []
+
+    async def probe():
+        calls.append(1)
+        return "0.2.21"
+
+    registry = BinaryRegistry.instance()
+    await registry.get("dynamips_version", path, probe)
+    registry.refresh()
+    assert not os.path.exists(registry._cache_path())
+    await registry.get("dynamips_version", path, probe)
+    assert len(calls) == 2
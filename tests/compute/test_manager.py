@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 import uuid
 import os
 import pytest
@@ -242,10 +243,17 @@ async def test_list_images(qemu, tmpdir):
             f.write("1234567")
 
     with patch("gns3server.utils.images.default_images_directory", return_value=str(tmp_images_dir)):
+        # the checksums of the new images are computed in the background
+        assert sorted(await qemu.list_images(), key=lambda k: k['filename']) == [
+            {"filename": "a.qcow2", "path": "a.qcow2", "md5sum": None, "filesize": 7},
+            {"filename": "b.qcow2", "path": "b.qcow2", "md5sum": None, "filesize": 7}
+        ]
+        await asyncio.gather(*qemu._image_checksum_tasks)
         assert sorted(await qemu.list_images(), key=lambda k: k['filename']) == [
             {"filename": "a.qcow2", "path": "a.qcow2", "md5sum": "fcea920f7412b5da7be0cf42b8c93759", "filesize": 7},
             {"filename": "b.qcow2", "path": "b.qcow2", "md5sum": "fcea920f7412b5da7be0cf42b8c93759", "filesize": 7}
         ]
+        assert not qemu._image_checksum_tasks
 
 
 async def test_list_images_recursives(qemu, tmpdir):
@@ -264,6 +272,8 @@ async def test_list_images_recursives(qemu, tmpdir):
 
     with patch("gns3server.utils.images.default_images_directory", return_value=str(tmp_images_dir)):
 
+        await qemu.list_images()
+        await asyncio.gather(*qemu._image_checksum_tasks)
         assert sorted(await qemu.list_images(), key=lambda k: k['filename']) == [
             {"filename": "a.qcow2", "path": "a.qcow2", "md5sum": "fcea920f7412b5da7be0cf42b8c93759", "filesize": 7},
             {"filename": "b.qcow2", "path": "b.qcow2", "md5sum": "fcea920f7412b5da7be0cf42b8c93759", "filesize": 7},
@@ -318,3 +328,24 @@ async def test_duplicate_ethernet_switch(compute_project):
         destination_node_id = str(uuid.uuid4())
         await dynamips_manager.create_node("SW-2", compute_project.id, destination_node_id, node_type='ethernet_switch')
         await dynamips_manager.duplicate_node(source_node_id, destination_node_id)
+
+
+async def test_follow_pcap_file(qemu, tmpdir):
+
+    path = str(tmpdir / "test.pcap")
+    with open(path, "wb") as f:
+        f.write(b"a" * 20000)
+
+    nio = MagicMock()
+    nio.capturing = True
+    data = b""
+    with open(path, "rb") as f:
+        async for chunk in qemu._follow_pcap_file(f, nio):
+            data += chunk
+            if len(data) == 20000:
+                # data appended while the capture is running
+                with open(path, "ab") as f2:
+                    f2.write(b"b")
+            elif len(data) == 20001:
+                nio.capturing = False
+    assert data == b"a" * 20000 + b"b"
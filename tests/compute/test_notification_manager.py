@@ -49,7 +49,7 @@ async def test_queue_json():
 
         notifications.emit("test", {"a": 1})
         res = await queue.get_json(5)
-        assert res == '{"action": "test", "event": {"a": 1}}'
+        assert res == '{"action":"test","event":{"a":1}}'
 
     assert len(notifications._listeners) == 0
 
@@ -67,7 +67,7 @@ async def test_queue_json_meta():
 
         notifications.emit("test", {"a": 1}, project_id=project_id)
         res = await queue.get_json(5)
-        assert res == '{"action": "test", "event": {"a": 1}, "project_id": "' + project_id + '"}'
+        assert res == '{"action":"test","event":{"a":1},"project_id":"' + project_id + '"}'
 
     assert len(notifications._listeners) == 0
 
@@ -127,6 +127,59 @@ def test_find_unused_port_invalid_range():
         p = PortManager().find_unused_port(10000, 1000)
 
 
+def test_find_unused_port_last_port():
+
+    with patch("gns3server.compute.port_manager.PortManager._check_port") as mock_check:
+
+        def execute_mock(host, port, *args):
+            if port != 20002:
+                raise OSError("Port is already used")
+            return True
+
+        mock_check.side_effect = execute_mock
+        assert PortManager.find_unused_port(20000, 20002, host="0.0.0.0") == 20002
+
+
+def test_get_free_udp_port_rotating():
+
+    pm = PortManager()
+    pm.udp_port_range = (20000, 20002)
+    project = Project(project_id=str(uuid.uuid4()))
+    with patch("gns3server.compute.port_manager.PortManager._check_port", return_value=True) as mock_check:
+        assert pm.get_free_udp_port(project) == 20000
+        assert pm.get_free_udp_port(project) == 20001
+        # only the chosen port is checked
+        assert mock_check.call_count == 2
+        pm.release_udp_port(20000, project)
+        # the search continues after the last allocated port and wraps around
+        assert pm.get_free_udp_port(project) == 20002
+        assert pm.get_free_udp_port(project) == 20000
+        with pytest.raises(aiohttp.web.HTTPConflict):
+            pm.get_free_udp_port(project)
+
+
+def test_get_free_udp_ports():
+
+    pm = PortManager()
+    pm.udp_port_range = (20000, 20004)
+    project = Project(project_id=str(uuid.uuid4()))
+    with patch("gns3server.compute.port_manager.PortManager._check_port") as mock_check:
+
+        def execute_mock(host, port, *args):
+            if port == 20001:
+                raise OSError("Port is already used")
+            return True
+
+        mock_check.side_effect = execute_mock
+        assert pm.get_free_udp_ports(project, 3) == [20000, 20002, 20003]
+        assert pm.udp_ports == {20000, 20002, 20003}
+        # nothing is reserved when there are not enough free ports
+        with pytest.raises(aiohttp.web.HTTPConflict):
+            pm.get_free_udp_ports(project, 2)
+        assert pm.udp_ports == {20000, 20002, 20003}
+        assert pm.get_free_udp_ports(project, 1) == [20004]
+
+
 def test_set_console_host(config):
     """
     If allow remote connection we need to bind console host
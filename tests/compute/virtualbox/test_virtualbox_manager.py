@@ -20,6 +20,7 @@ import pytest
 import tempfile
 import os
 import stat
+import asyncio
 
 from unittest.mock import patch
 
@@ -81,7 +82,7 @@ async def test_list_vms(manager):
                '"<inaccessible>" {42b4d095-ff5f-4ac4-bb9d-5f2c7861c1f1}',
                '"Linux Microcore 4.7.1" {ccd8c50b-c172-457d-99fa-dd69371ede0e}']
 
-    async def execute_mock(cmd, args):
+    async def execute_mock(cmd, args, vm_key=None):
         if cmd == "list":
             return vm_list
         else:
@@ -98,3 +99,46 @@ async def test_list_vms(manager):
         {"vmname": "Windows 8.1", "ram": 512},
         {"vmname": "Linux Microcore 4.7.1", "ram": 256}
     ]
+
+
+async def test_execute_serialized_per_vm(manager):
+
+    running = []
+    parallel = []
+
+    async def execute_mock(subcommand, args, timeout):
+        running.append(args[0])
+        parallel.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(args[0])
+        return []
+
+    with patch("gns3server.compute.virtualbox.VirtualBox._execute", side_effect=execute_mock):
+        await asyncio.gather(manager.execute("modifyvm", ["vm1", "--nic1", "none"], vm_key="vm1"),
+                             manager.execute("showvminfo", ["--machinereadable", "--", "Debian"], vm_key="vm1"))
+        assert max(parallel) == 1
+        parallel.clear()
+        await asyncio.gather(manager.execute("modifyvm", ["vm1", "--nic1", "none"], vm_key="vm1"),
+                             manager.execute("modifyvm", ["vm2", "--nic1", "none"], vm_key="vm2"))
+        assert max(parallel) == 2
+    # the locks are dropped once the commands are done
+    assert manager._vm_locks == {}
+
+
+async def test_list_vms_inventory(manager):
+
+    async def execute_mock(cmd, args, vm_key=None):
+        if cmd == "list":
+            return ['"Windows 8.1" {27b4d095-ff5f-4ac4-bb9d-5f2c7861c1f1}']
+        elif cmd == "getextradata":
+            return []
+        return ["memory=512"]
+
+    with asyncio_patch("gns3server.compute.virtualbox.VirtualBox.execute") as mock:
+        mock.side_effect = execute_mock
+        assert await manager.list_vms() == [{"vmname": "Windows 8.1", "ram": 512}]
+        assert await manager.list_vms() == [{"vmname": "Windows 8.1", "ram": 512}]
+        assert mock.call_count == 4
+        manager.invalidate_vm_inventory("27b4d095-ff5f-4ac4-bb9d-5f2c7861c1f1")
+        await manager.list_vms()
+        assert mock.call_count == 7
@@ -106,6 +106,19 @@ def test_json(vm, tmpdir, project):
     assert vm.__json__()["node_directory"] is not None
 
 
+async def test_execute_vm_key(vm):
+
+    vm.manager.execute = AsyncioMagicMock(return_value=[])
+    # the UUID is unknown until the VM info has been read
+    await vm._execute("showvminfo", ["--machinereadable", "--", "test"])
+    vm.manager.execute.assert_called_with("showvminfo", ["--machinereadable", "--", "test"], vm_key="test")
+    vm._uuid = "27b4d095-ff5f-4ac4-bb9d-5f2c7861c1f1"
+    await vm._execute("showvminfo", ["--machinereadable", "--", "test"])
+    vm.manager.execute.assert_called_with("showvminfo", ["--machinereadable", "--", "test"], vm_key=vm._uuid)
+    await vm._execute("modifyvm", [vm._uuid, "--nic1", "none"])
+    vm.manager.execute.assert_called_with("modifyvm", [vm._uuid, "--nic1", "none"], vm_key=vm._uuid)
+
+
 def test_patch_vm_uuid(vm):
 
     xml = """<?xml version="1.0"?>
@@ -123,6 +136,8 @@ def test_patch_vm_uuid(vm):
     with open(vm._linked_vbox_file()) as f:
         c = f.read()
         assert "{" + vm.id + "}" in c
+    # registervm is serialized with the other commands of the VM
+    assert vm._uuid == vm.id
 
 
 def test_patch_vm_uuid_with_corrupted_file(vm):
@@ -136,3 +151,14 @@ def test_patch_vm_uuid_with_corrupted_file(vm):
     vm._linked_clone = True
     with pytest.raises(VirtualBoxError):
         vm._patch_vm_uuid()
+
+
+async def test_get_vm_info_shared(vm):
+
+    with asyncio_patch("gns3server.compute.virtualbox.VirtualBox.execute", return_value=['VMState="running"', 'memory=512']) as mock:
+        assert await vm._get_vm_state() == "running"
+        assert (await vm._get_vm_info())["memory"] == "512"
+        assert mock.call_count == 1
+        await vm._modify_vm("--nic1 none")
+        assert await vm._get_vm_state() == "running"
+        assert mock.call_count == 3
@@ -13,6 +13,8 @@ from gns3server.controller import Controller
 from gns3server.config import Config
 from gns3server.compute import MODULES
 from gns3server.compute.port_manager import PortManager
+from gns3server.compute.binary_registry import BinaryRegistry
+from gns3server.compute.qemu.utils.image_cache import QemuImageCache
 from gns3server.compute.project_manager import ProjectManager
 # this import will register all handlers
 from gns3server.handlers import *
@@ -246,6 +248,8 @@ def run_around_tests(monkeypatch, config, port_manager):#port_manager, controlle
 
     for module in MODULES:
         module._instance = None
+    BinaryRegistry._instance = None
+    QemuImageCache._instance = None
 
     os.makedirs(os.path.join(tmppath, 'projects'))
     config.set("Server", "projects_path", os.path.join(tmppath, 'projects'))
@@ -253,6 +257,7 @@ def run_around_tests(monkeypatch, config, port_manager):#port_manager, controlle
     config.set("Server", "images_path", os.path.join(tmppath, 'images'))
     config.set("Server", "appliances_path", os.path.join(tmppath, 'appliances'))
     config.set("Server", "ubridge_path", os.path.join(tmppath, 'bin', 'ubridge'))
+    config.set("Server", "binaries_cache_path", os.path.join(tmppath, 'binaries_cache.json'))
     config.set("Server", "auth", False)
 
     # Prevent executions of the VM if we forgot to mock something
@@ -260,6 +265,7 @@ def run_around_tests(monkeypatch, config, port_manager):#port_manager, controlle
     config.set("VPCS", "vpcs_path", tmppath)
     config.set("VMware", "vmrun_path", tmppath)
     config.set("Dynamips", "dynamips_path", tmppath)
+    config.set("Dynamips", "idlepc_cache_path", os.path.join(tmppath, 'dynamips_idlepcs.json'))
 
     # Force turn off KVM because it's not available on CI
     config.set("Qemu", "enable_kvm", False)
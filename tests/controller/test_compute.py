@@ -38,6 +38,45 @@ def test_init(compute):
     assert compute.id == "my_compute_id"
 
 
+async def test_session_keep_alive(compute, config):
+
+    config.set_section_config("Server", {"compute_connection_pool_size": 10})
+    session = compute._session()
+    assert session.connector.limit == 10
+    assert session.connector.force_close is False
+    await session.close()
+
+    config.set_section_config("Server", {"keep_alive": False})
+    session = compute._session()
+    assert session.connector.force_close is True
+    await session.close()
+
+
+async def test_stream_session(compute, config):
+
+    config.set_section_config("Server", {"compute_connection_pool_size": 10})
+    session = compute.stream_session()
+    assert session is not compute._session()
+    # the long-lived streams are not limited by the pool of the API calls
+    assert session.connector.limit == 0
+    assert compute.stream_session() is session
+    await compute.close()
+    assert session.closed
+
+
+async def test_compute_httpQuery_without_timeout(compute):
+
+    response = MagicMock()
+    response.status = 200
+    with asyncio_patch("aiohttp.ClientSession.request", return_value=response):
+        with patch.object(compute, "stream_session", wraps=compute.stream_session) as mock:
+            await compute.post("/projects", {"a": "b"})
+            assert not mock.called
+            await compute.post("/projects", {"a": "b"}, timeout=None)
+            assert mock.called
+    await compute.close()
+
+
 def test_getUrl(controller):
 
     compute = Compute("my_compute_id", protocol="https", host="localhost", port=84, controller=controller)
@@ -425,6 +464,9 @@ async def test_interfaces(compute):
     with asyncio_patch("aiohttp.ClientSession.request", return_value=response) as mock:
         assert await compute.interfaces() == res
         mock.assert_any_call("GET", "https://example.com:84/v2/compute/network/interfaces", auth=None, chunked=None, data=None, headers={'content-type': 'application/json'}, timeout=120)
+        # the interfaces are cached
+        assert await compute.interfaces() == res
+        assert mock.call_count == 1
         await compute.close()
 
 
@@ -26,6 +26,7 @@ from tests.utils import AsyncioMagicMock, asyncio_patch
 
 from gns3server.config import Config
 from gns3server.controller.compute import Compute
+from gns3server.controller.topology import GNS3_FILE_FORMAT_REVISION
 from gns3server.version import __version__
 
 
@@ -113,13 +114,34 @@ def test_import_computes_1_x(controller, controller_config_path):
 
 async def test_load_projects(controller, projects_dir):
 
+    controller.save()
+    os.makedirs(os.path.join(projects_dir, "project1"))
+    with open(os.path.join(projects_dir, "project1", "project1.gns3"), "w+") as f:
+        json.dump({
+            "project_id": "69f26504-7aa3-48aa-9f29-798d44841211",
+            "name": "project1",
+            "revision": GNS3_FILE_FORMAT_REVISION,
+            "topology": {},
+            "type": "topology",
+            "version": __version__
+        }, f)
+    with asyncio_patch("gns3server.controller.Controller.load_project") as mock_load_project:
+        await controller.load_projects()
+    mock_load_project.assert_called_with(os.path.join(projects_dir, "project1", "project1.gns3"), load=False, settings={
+        "project_id": "69f26504-7aa3-48aa-9f29-798d44841211",
+        "name": "project1"
+    })
+
+
+async def test_load_projects_invalid(controller, projects_dir):
+
     controller.save()
     os.makedirs(os.path.join(projects_dir, "project1"))
     with open(os.path.join(projects_dir, "project1", "project1.gns3"), "w+") as f:
         f.write("")
     with asyncio_patch("gns3server.controller.Controller.load_project") as mock_load_project:
         await controller.load_projects()
-    mock_load_project.assert_called_with(os.path.join(projects_dir, "project1", "project1.gns3"), load=False)
+    assert not mock_load_project.called
 
 
 async def test_add_compute(controller):
@@ -15,9 +15,12 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import io
 import os
 import uuid
 import json
+import pytest
+import aiohttp
 import zipfile
 
 from tests.utils import asyncio_patch, AsyncioMagicMock
@@ -26,7 +29,8 @@ from unittest.mock import patch, MagicMock
 from gns3server.utils.asyncio import aiozipstream
 from gns3server.controller.project import Project
 from gns3server.controller.export_project import export_project
-from gns3server.controller.import_project import import_project, _move_files_to_compute
+from gns3server.controller.import_project import import_project, import_project_from_stream, _move_files_to_compute
+from gns3server.controller.topology import GNS3_FILE_FORMAT_REVISION
 from gns3server.version import __version__
 
 
@@ -594,3 +598,147 @@ async def test_import_project_name_and_location(tmpdir, controller):
     with open(zip_path, "rb") as f:
         project = await import_project(controller, str(uuid.uuid4()), f, name="hello", location=str(tmpdir / "test"))
     assert project.name == "hello-1"
+
+
+def _stream_reader(data):
+
+    stream = io.BytesIO(data)
+
+    async def read(size):
+        return stream.read(size)
+
+    return read
+
+
+async def test_import_project_from_stream(windows_platform, tmpdir, controller):
+    """
+    The images, the files of the remote nodes and the local files are sent to their destination while the zip file is read
+    """
+
+    project_id = str(uuid.uuid4())
+    uploads = {}
+
+    async def http_query(method, path, data, timeout=None):
+        if hasattr(data, "__aiter__"):
+            data = b"".join([chunk async for chunk in data])
+        uploads[path] = data
+
+    controller._computes["vm"] = AsyncioMagicMock()
+    controller._computes["vm"].http_query = http_query
+
+    topology = {
+        "project_id": str(uuid.uuid4()),
+        "name": "test",
+        "type": "topology",
+        "topology": {
+            "nodes": [
+                {
+                    "compute_id": "local",
+                    "node_id": "0fd3dd4d-dc93-4a04-a9b9-7396a9e22e8b",
+                    "node_type": "qemu",
+                    "name": "test",
+                    "properties": {}
+                },
+                {
+                    "compute_id": "local",
+                    "node_id": "8a81f1c7-01e4-4fb2-8fd5-1e9fc9bb8f2b",
+                    "node_type": "vpcs",
+                    "name": "test2",
+                    "properties": {}
+                }
+            ],
+            "links": [],
+            "computes": [],
+            "drawings": []
+        },
+        "revision": GNS3_FILE_FORMAT_REVISION,
+        "version": __version__
+    }
+
+    qemu_dir = tmpdir / "project-files" / "qemu" / "0fd3dd4d-dc93-4a04-a9b9-7396a9e22e8b"
+    os.makedirs(str(qemu_dir))
+    disk = os.urandom(100000)
+    (qemu_dir / "hda_disk.qcow2").write_binary(disk)
+    (qemu_dir / "config.txt").write_binary(b"config")
+    os.symlink("/tmp/anywhere", str(qemu_dir / "symlink"))
+
+    with aiozipstream.ZipFile(compression=zipfile.ZIP_DEFLATED) as z:
+        z.writestr("images/QEMU/linux.qcow2", b"image")
+        z.writestr("project.gns3", json.dumps(topology).encode())
+        for name in ("hda_disk.qcow2", "config.txt", "symlink"):
+            z.write(str(qemu_dir / name), "project-files/qemu/0fd3dd4d-dc93-4a04-a9b9-7396a9e22e8b/" + name)
+        z.writestr("project-files/vpcs/8a81f1c7-01e4-4fb2-8fd5-1e9fc9bb8f2b/startup.vpc", b"ip dhcp")
+        data = b"".join([chunk async for chunk in z])
+
+    progress = MagicMock()
+    project = await import_project_from_stream(controller, project_id, _stream_reader(data), progress_callback=progress)
+    progress.assert_called_with(len(data), 6)
+
+    with open(os.path.join(project.path, "test.gns3")) as f:
+        topo = json.load(f)
+    qemu_id = topo["topology"]["nodes"][0]["node_id"]
+    vpcs_id = topo["topology"]["nodes"][1]["node_id"]
+    assert topo["topology"]["nodes"][0]["compute_id"] == "vm"
+    assert qemu_id != "0fd3dd4d-dc93-4a04-a9b9-7396a9e22e8b"
+
+    controller._computes["vm"].post.assert_called_with('/projects', data={'name': 'test', 'project_id': project_id})
+    files_path = "/projects/{}/files/project-files/qemu/{}/".format(project_id, qemu_id)
+    assert uploads == {files_path + "hda_disk.qcow2": disk, files_path + "config.txt": b"config"}
+    assert not os.path.exists(os.path.join(project.path, "project-files", "qemu"))
+
+    with open(os.path.join(project.path, "project-files", "vpcs", vpcs_id, "startup.vpc")) as f:
+        assert f.read() == "ip dhcp"
+    with open(os.path.join(controller.images_path(), "QEMU", "linux.qcow2")) as f:
+        assert f.read() == "image"
+    assert os.listdir(os.path.join(controller.images_path(), "QEMU")) == ["linux.qcow2"]
+    assert not os.path.exists(os.path.join(project.path, "images"))
+
+
+async def test_import_project_from_stream_upgrade(tmpdir, controller):
+    """
+    Old topologies are converted once the whole zip file has been read
+    """
+
+    project_id = str(uuid.uuid4())
+    topology = {
+        "project_id": str(uuid.uuid4()),
+        "name": "test",
+        "topology": {
+        },
+        "version": "1.4.2"
+    }
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as myzip:
+        myzip.writestr("project.gns3", json.dumps(topology))
+        myzip.writestr("images/IOS/test.image", "B")
+
+    project = await import_project_from_stream(controller, project_id, _stream_reader(buffer.getvalue()))
+
+    with open(os.path.join(project.path, "test.gns3")) as f:
+        topo = json.load(f)
+        assert topo["version"] == __version__
+    assert os.path.exists(os.path.join(controller.images_path(), "IOS", "test.image"))
+
+
+async def test_import_project_from_stream_invalid_zip(tmpdir, controller):
+
+    project_id = str(uuid.uuid4())
+    with pytest.raises(aiohttp.web.HTTPConflict):
+        await import_project_from_stream(controller, project_id, _stream_reader(b"not a zip file"))
+    assert not os.path.exists(os.path.join(controller.projects_directory(), project_id))
+
+
+async def test_import_project_from_stream_error_images(tmpdir, controller):
+    """
+    The images are not added to the images directory when the import fails
+    """
+
+    project_id = str(uuid.uuid4())
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as myzip:
+        myzip.writestr("images/QEMU/linux.qcow2", "image")
+
+    with pytest.raises(aiohttp.web.HTTPConflict):
+        await import_project_from_stream(controller, project_id, _stream_reader(buffer.getvalue()))
+    assert os.listdir(os.path.join(controller.images_path(), "QEMU")) == []
@@ -25,6 +25,7 @@ from tests.utils import AsyncioMagicMock
 
 from gns3server.controller.node import Node
 from gns3server.controller.project import Project
+from gns3server.utils.images import image_index
 
 
 @pytest.fixture
@@ -504,6 +505,18 @@ async def test_upload_missing_image(compute, controller, images_dir):
     compute.post.assert_called_with("/qemu/images/linux.img", data=ANY, timeout=None)
 
 
+async def test_read_image(node, images_dir):
+
+    image = os.path.join(images_dir, "linux.img")
+    with open(image, "wb") as f:
+        f.write(b"TEST")
+    data = b""
+    async for chunk in node._read_image(image):
+        data += chunk
+    assert data == b"TEST"
+    assert image_index(images_dir).get("linux.img", os.stat(image))["md5sum"] == "033bd94b1168d7e4f0d644c3c95e35bf"
+
+
 def test_update_label(node):
     """
     The text in label need to be always the
@@ -15,10 +15,12 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from tests.utils import AsyncioMagicMock
+from gns3server.notification_queue import NotificationQueue
 
 
 @pytest.fixture
@@ -121,3 +123,157 @@ def test_various_notification(controller, node):
     notif.project_emit("log.warning", {"message": "Warning ASA 8 is not officially supported by GNS3"})
     notif.project_emit("log.error", {"message": "Permission denied on /tmp"})
     notif.project_emit("node.updated", node.__json__())
+
+
+async def test_serialize_once(controller, project):
+
+    notif = controller.notification
+    with notif.project_queue(project.id) as queue1:
+        with notif.project_queue(project.id) as queue2:
+            await queue1.get(0.1)  # ping
+            await queue2.get(0.1)  # ping
+            with patch("gns3server.notification_queue.dumps", return_value=b"{}") as mock:
+                notif.project_emit("test", {"project_id": project.id})
+                assert await queue1.get_json(5) == "{}"
+                assert await queue2.get_json(5) == "{}"
+                assert mock.call_count == 1
+
+
+async def test_overflow_drop_oldest():
+
+    queue = NotificationQueue(maxsize=2, overflow="drop_oldest")
+    await queue.get(0.1)  # ping
+    for i in range(3):
+        queue.put_nowait(("test", {"id": i}, {}))
+    assert queue.dropped == 1
+    assert (await queue.get(5))[1] == {"id": 1}
+    assert (await queue.get(5))[1] == {"id": 2}
+
+
+async def test_overflow_coalesce():
+
+    queue = NotificationQueue(maxsize=2, overflow="coalesce")
+    await queue.get(0.1)  # ping
+    queue.put_nowait(("node.updated", {"node_id": "a", "status": "started"}, {}))
+    queue.put_nowait(("node.updated", {"node_id": "b", "status": "started"}, {}))
+    queue.put_nowait(("node.updated", {"node_id": "a", "status": "stopped"}, {}))
+    assert queue.coalesced == 1
+    assert queue.dropped == 0
+    assert (await queue.get(5))[1] == {"node_id": "a", "status": "stopped"}
+    assert (await queue.get(5))[1] == {"node_id": "b", "status": "started"}
+
+
+async def test_overflow_disconnect():
+
+    queue = NotificationQueue(maxsize=2, overflow="disconnect")
+    for i in range(3):
+        queue.put_nowait(("test", {"id": i}, {}))
+    assert queue.disconnected
+    assert queue.dropped == 3
+    assert queue.qsize() == 0
+
+
+async def test_stats(controller, project, config):
+
+    config.set_section_config("Server", {"notification_queue_size": 1, "notification_overflow_policy": "drop_oldest"})
+    notif = controller.notification
+    with notif.project_queue(project.id):
+        notif.project_emit("test", {"project_id": project.id})
+        notif.project_emit("test", {"project_id": project.id})
+        stats = notif.stats()
+        assert stats["listeners"] == 1
+        assert stats["queued"] == 1
+        assert stats["dropped"] == 1
+    assert notif.stats()["dropped"] == 1
+    assert notif.stats()["listeners"] == 0
+
+
+async def test_coalesce(controller, config):
+
+    config.set_section_config("Server", {"notification_coalesce_interval": 0.1})
+    notif = controller.notification
+    received = []
+    await notif.coalesce("a", received.append, {"status": "started"})
+    assert received == [{"status": "started"}]
+    await notif.coalesce("a", received.append, {"status": "stopped", "name": "PC1"})
+    await notif.coalesce("a", received.append, {"status": "suspended"})
+    await notif.coalesce("b", received.append, {"status": "started"})
+    assert len(received) == 2
+    await asyncio.sleep(0.2)
+    assert received[2] == {"status": "suspended", "name": "PC1"}
+    stats = notif.stats()
+    assert stats["coalesce_events_in"] == 4
+    assert stats["coalesce_events_out"] == 3
+
+
+async def test_dispatch_node_updated_coalesced(controller, node, project, config):
+
+    config.set_section_config("Server", {"notification_coalesce_interval": 0.1})
+    notif = controller.notification
+    with notif.project_queue(project.id) as queue:
+        await queue.get(0.1)  # ping
+        for name in ("PC1", "PC2", "PC3"):
+            await notif.dispatch("node.updated", {"node_id": node.id, "project_id": project.id, "name": name}, project_id=project.id, compute_id=1)
+        action, event, _ = await queue.get(5)
+        assert event["name"] == "PC1"
+        action, event, _ = await queue.get(5)
+        assert action == "node.updated"
+        assert event["name"] == "PC3"
+        assert queue.qsize() == 0
+    assert node.name == "PC3"
+
+
+async def test_coalesce_close(controller, config):
+
+    config.set_section_config("Server", {"notification_coalesce_interval": 0.1})
+    notif = controller.notification
+    received = []
+    await notif.coalesce("a", received.append, {"status": "started"})
+    await notif.coalesce("a", received.append, {"status": "stopped"})
+    notif.close()
+    await asyncio.sleep(0.2)
+    assert received == [{"status": "started"}]
+
+
+async def test_coalesce_flush_error(controller, config, caplog):
+
+    config.set_section_config("Server", {"notification_coalesce_interval": 0.05})
+    notif = controller.notification
+
+    def callback(event):
+        if event["status"] == "stopped":
+            raise ValueError("test")
+
+    await notif.coalesce("a", callback, {"status": "started"})
+    await notif.coalesce("a", callback, {"status": "stopped"})
+    await asyncio.sleep(0.1)
+    assert "Could not send a coalesced notification" in caplog.text
+    assert len(notif._coalesce_tasks) == 0
+
+
+async def test_coalesce_skip_stale_event(controller, config):
+
+    config.set_section_config("Server", {"notification_coalesce_interval": 0.05})
+    notif = controller.notification
+    received = []
+    release = asyncio.Event()
+
+    async def slow_callback(event):
+        await release.wait()
+        received.append(event)
+
+    await notif.coalesce("a", received.append, {"status": "started"})
+    await notif.coalesce("a", slow_callback, {"status": "stopped"})
+    await asyncio.sleep(0.1)
+    # the flush of "stopped" is waiting in its callback, "suspended" is sent after it
+    send = asyncio.ensure_future(notif.coalesce("a", received.append, {"status": "suspended"}))
+    await asyncio.sleep(0.1)
+    release.set()
+    await send
+    await asyncio.sleep(0.1)
+    assert received == [{"status": "started"}, {"status": "stopped"}, {"status": "suspended"}]
+
+    # an event older than the last one sent is dropped
+    sent_seq = notif._coalesce_sent_seq["a"]
+    await notif._coalesce_send("a", sent_seq - 1, received.append, {"status": "started"})
+    assert len(received) == 3
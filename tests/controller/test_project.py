@@ -18,6 +18,7 @@
 
 import os
 import sys
+import json
 import uuid
 import pytest
 import aiohttp
@@ -27,6 +28,8 @@ from unittest.mock import patch
 from uuid import uuid4
 
 from gns3server.controller.project import Project
+from gns3server.controller.topology import project_to_topology
+from gns3server.controller.topology_cache import TopologyCache
 from gns3server.controller.template import Template
 from gns3server.controller.node import Node
 from gns3server.controller.ports.ethernet_port import EthernetPort
@@ -145,6 +148,20 @@ async def test_changing_path_with_quote_not_allowed(tmpdir):
             p.path = str(tmpdir / "project\"53")
 
 
+async def test_closed_project_data(controller):
+
+    project = Project(controller=controller, name="Test")
+    project.dump()
+    project._status = "closed"
+    cache = TopologyCache(max_size=1024 * 1024)
+    with patch("gns3server.controller.topology_cache.TopologyCache._instance", cache, create=True):
+        assert project.nodes == {}
+        assert project.links == {}
+        assert project.drawings == {}
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 2
+
+
 async def test_captures_directory(tmpdir):
 
     with patch('gns3server.controller.project.Project.emit_controller_notification'):
@@ -667,6 +684,54 @@ async def test_dump(projects_dir):
                 assert "00010203-0405-0607-0809-0a0b0c0d0e0f" in content
 
 
+async def test_dump_delayed(projects_dir):
+
+    directory = projects_dir
+    with patch("gns3server.utils.path.get_default_project_directory", return_value=directory):
+        with patch('gns3server.controller.project.Project.emit_controller_notification'):
+            p = Project(project_id='00010203-0405-0607-0809-0a0b0c0d0e0f', name="Test")
+            with patch("gns3server.controller.project.Project._write_topology") as mock:
+                p.scene_width = 42
+                p.dump()
+                p.scene_height = 42
+                p.dump()
+                assert not mock.called
+                p.flush()
+                assert mock.call_count == 1
+                topo = json.loads(mock.call_args[0][0])
+                assert topo["scene_width"] == 42
+                assert topo["scene_height"] == 42
+                p.flush()
+                assert mock.call_count == 1
+
+
+async def test_dump_delayed_error(projects_dir, caplog):
+
+    directory = projects_dir
+    with patch("gns3server.utils.path.get_default_project_directory", return_value=directory):
+        with patch('gns3server.controller.project.Project.emit_controller_notification'):
+            p = Project(project_id='00010203-0405-0607-0809-0a0b0c0d0e0f', name="Test")
+            # the errors raised while writing the topology in a thread are logged
+            with patch("gns3server.controller.project.Project._write_topology", side_effect=RuntimeError("test")):
+                await p._write_topology_in_executor("{}", p._dump_generation)
+            assert "Could not dump topology of project 'Test': test" in caplog.text
+
+
+async def test_dump_ignore_older_write(projects_dir):
+
+    directory = projects_dir
+    with patch("gns3server.utils.path.get_default_project_directory", return_value=directory):
+        with patch('gns3server.controller.project.Project.emit_controller_notification'):
+            p = Project(project_id='00010203-0405-0607-0809-0a0b0c0d0e0f', name="Test")
+            p.name = "Test2"
+            p.dump(force=True)
+            topo = project_to_topology(p)
+            topo["name"] = "Test3"
+            p._write_topology(json.dumps(topo), p._dump_generation - 1)
+            with open(os.path.join(directory, p.id, "Test.gns3")) as f:
+                assert json.load(f)["name"] == "Test2"
+
+
 # async def test_open_close(controller):
 #
 #     with patch('gns3server.controller.project.Project.emit_controller_notification'):
@@ -806,8 +871,27 @@ async def test_start_all(project):
         await project.add_node(compute, "test", None, node_type="vpcs", properties={"startup_config": "test.cfg"})
 
     compute.post = AsyncioMagicMock()
+    project.emit_notification = MagicMock()
     await project.start_all()
     assert len(compute.post.call_args_list) == 10
+    progress = [c[0][1] for c in project.emit_notification.call_args_list if c[0][0] == "nodes.progress"]
+    assert [p["done"] for p in progress] == list(range(1, 11))
+    assert progress[-1]["total"] == 10
+    assert progress[-1]["action"] == "start"
+    assert progress[-1]["error"] is None
+
+
+def test_node_concurrency(project):
+
+    compute = MagicMock()
+    compute.cpu_usage_percent = None
+    compute.memory_usage_percent = None
+    assert project._node_concurrency(compute) == 5
+    compute.cpu_usage_percent = 30
+    compute.memory_usage_percent = 70
+    assert project._node_concurrency(compute) == 2
+    compute.cpu_usage_percent = 95
+    assert project._node_concurrency(compute) == 1
 
 
 async def test_stop_all(project):
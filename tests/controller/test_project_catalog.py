@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import uuid
+import pytest
+
+from unittest.mock import patch
+
+from gns3server.version import __version__
+from gns3server.controller.topology import GNS3_FILE_FORMAT_REVISION
+from gns3server.controller.project_catalog import (ProjectCatalog, list_project_files, read_project_entry, read_project_entries,
+                                                    PROJECT_CATALOG_FILENAME)
+
+
+def write_project(projects_dir, project_name, **kwargs):
+
+    os.makedirs(os.path.join(projects_dir, project_name), exist_ok=True)
+    path = os.path.join(projects_dir, project_name, "{}.gns3".format(project_name))
+    data = {
+        "project_id": str(uuid.uuid4()),
+        "name": project_name,
+        "revision": GNS3_FILE_FORMAT_REVISION,
+        "topology": {"nodes": [], "links": [], "computes": [], "drawings": []},
+        "type": "topology",
+        "version": __version__
+    }
+    data.update(kwargs)
+    with open(path, "w+") as f:
+        json.dump(data, f)
+    return path
+
+
+@pytest.fixture
+def projects(tmpdir):
+
+    return [write_project(str(tmpdir), "project{}".format(i)) for i in range(3)]
+
+
+def test_list_project_files(tmpdir, projects):
+
+    tmpdir.join("not_a_project.gns3").write("")
+    tmpdir.join("project0", "notes.txt").write("")
+    assert sorted(list_project_files(str(tmpdir))) == sorted(projects)
+
+
+def test_read_project_entry(projects):
+
+    entry = read_project_entry(projects[0])
+    assert entry["settings"]["name"] == "project0"
+    assert entry["size"] == os.stat(projects[0]).st_size
+
+
+def test_read_project_entry_error(tmpdir):
+
+    path = str(tmpdir / "invalid.gns3")
+    with open(path, "w+") as f:
+        f.write("{")
+    assert "Could not load topology" in read_project_entry(path)["error"]
+
+
+async def test_read_projects(tmpdir, projects):
+
+    catalog = ProjectCatalog(str(tmpdir))
+    settings = await catalog.read_projects(projects, workers=1)
+    assert sorted(s["name"] for s in settings.values()) == ["project0", "project1", "project2"]
+    assert os.path.exists(str(tmpdir / PROJECT_CATALOG_FILENAME))
+
+    # unchanged projects are read from the catalog
+    catalog = ProjectCatalog(str(tmpdir))
+    with patch("gns3server.controller.project_catalog.load_topology_settings") as mock:
+        assert await catalog.read_projects(projects, workers=1) == settings
+        assert not mock.called
+
+
+async def test_read_projects_modified(tmpdir, projects):
+
+    catalog = ProjectCatalog(str(tmpdir))
+    await catalog.read_projects(projects, workers=1)
+
+    write_project(str(tmpdir), "project1", name="renamed")
+    catalog = ProjectCatalog(str(tmpdir))
+    settings = await catalog.read_projects(projects, workers=1)
+    assert settings[projects[1]]["name"] == "renamed"
+
+
+async def test_read_projects_removed(tmpdir, projects):
+
+    catalog = ProjectCatalog(str(tmpdir))
+    await catalog.read_projects(projects, workers=1)
+    await catalog.read_projects(projects[:1], workers=1)
+    with open(str(tmpdir / PROJECT_CATALOG_FILENAME)) as f:
+        assert list(json.load(f)["projects"]) == [os.path.join("project0", "project0.gns3")]
+
+
+async def test_read_projects_error(tmpdir, projects):
+
+    with open(projects[0], "w+") as f:
+        f.write("")
+    catalog = ProjectCatalog(str(tmpdir))
+    settings = await catalog.read_projects(projects, workers=1)
+    assert projects[0] not in settings
+    # the error is kept until the file is modified
+    with open(str(tmpdir / PROJECT_CATALOG_FILENAME)) as f:
+        assert "error" in json.load(f)["projects"][os.path.join("project0", "project0.gns3")]
+
+
+async def test_read_projects_upgrade(tmpdir, projects):
+
+    with open(projects[0], "w+") as f:
+        f.write("")
+    catalog = ProjectCatalog(str(tmpdir))
+    await catalog.read_projects(projects, workers=1)
+
+    # the catalog written by another version is ignored, the projects rejected before are read again
+    with patch("gns3server.controller.project_catalog.__version__", "99.0.0"):
+        catalog = ProjectCatalog(str(tmpdir))
+        with patch("gns3server.controller.project_catalog.read_project_entries", wraps=read_project_entries) as mock:
+            await catalog.read_projects(projects, workers=1)
+            assert len(mock.call_args[0][0]) == 3
+    with open(str(tmpdir / PROJECT_CATALOG_FILENAME)) as f:
+        assert json.load(f)["gns3_version"] == "99.0.0"
+
+
+async def test_read_projects_process_pool(tmpdir, projects):
+
+    catalog = ProjectCatalog(str(tmpdir))
+    settings = await catalog.read_projects(projects, workers=2)
+    assert len(settings) == 3
+
+
+async def test_read_projects_invalid_catalog(tmpdir, projects):
+
+    tmpdir.join(PROJECT_CATALOG_FILENAME).write("invalid")
+    catalog = ProjectCatalog(str(tmpdir))
+    assert len(await catalog.read_projects(projects, workers=1)) == 3
@@ -17,12 +17,14 @@
 
 
 import json
+import asyncio
 import pytest
 import aiohttp
 
-from tests.utils import asyncio_patch
+from unittest.mock import MagicMock
+from tests.utils import asyncio_patch, AsyncioMagicMock
 
-from gns3server.controller.compute import Compute
+from gns3server.controller.compute import Compute, ComputeError
 from gns3server.controller.project import Project
 
 
@@ -225,3 +227,123 @@ async def test_open(controller, tmpdir):
 #     with open(str(tmpdir / "demo.gns3"), "r") as f:
 #         topo = json.load(f)
 #         assert len(topo["topology"]["nodes"]) == 2
+
+
+def _mock_compute(compute_id):
+
+    compute = MagicMock()
+    compute.id = compute_id
+    response = MagicMock()
+    response.json = {"console": 2048, "udp_port": 20000}
+    compute.post = AsyncioMagicMock(return_value=response)
+    compute.get_ip_on_same_subnet = AsyncioMagicMock(return_value=("127.0.0.1", "127.0.0.1"))
+    return compute
+
+
+async def test_open_nodes_and_links(controller, tmpdir, demo_topology):
+
+    demo_topology["topology"]["computes"] = []
+    with open(str(tmpdir / "demo.gns3"), "w+") as f:
+        json.dump(demo_topology, f)
+
+    controller._computes["local"] = _mock_compute("local")
+    controller._computes["vm"] = _mock_compute("vm")
+
+    project = Project(name="demo",
+                      project_id="3c1be6f9-b4ba-4737-b209-63c47c23359f",
+                      path=str(tmpdir),
+                      controller=controller,
+                      filename="demo.gns3",
+                      status="closed")
+
+    await project.open()
+    assert project.status == "opened"
+    assert list(project.nodes.keys()) == ["64ba8408-afbf-4b66-9cdd-1fd854427478", "748bcd89-624a-40eb-a8d3-1d2e85c99b51"]
+    assert project.links["5a3e3a64-e853-4055-9503-4a14e01290f1"].created
+    assert len(project.drawings) == 1
+    assert set(project.open_metrics.keys()) == {"computes", "nodes", "links", "drawings"}
+    assert project.stats()["open_metrics"] == project.open_metrics
+
+    # the project is created only once on each compute
+    for compute_id in ("local", "vm"):
+        calls = [c for c in controller._computes[compute_id].post.call_args_list if c[0][0] == "/projects"]
+        assert len(calls) == 1
+        # the UDP ports of the links are reserved in advance
+        controller._computes[compute_id].post.assert_any_call("/projects/{}/ports/udp?count=1".format(project.id))
+
+
+async def test_open_rollback(controller, tmpdir, demo_topology):
+
+    demo_topology["topology"]["computes"] = []
+    with open(str(tmpdir / "demo.gns3"), "w+") as f:
+        json.dump(demo_topology, f)
+
+    controller._computes["local"] = _mock_compute("local")
+    controller._computes["vm"] = _mock_compute("vm")
+
+    async def post(path, *args, **kwargs):
+        if path.endswith("/vpcs/nodes"):
+            raise ComputeError("Compute is down")
+        return MagicMock()
+    controller._computes["vm"].post = AsyncioMagicMock(side_effect=post)
+
+    project = Project(name="demo",
+                      project_id="3c1be6f9-b4ba-4737-b209-63c47c23359f",
+                      path=str(tmpdir),
+                      controller=controller,
+                      filename="demo.gns3",
+                      status="closed")
+
+    with pytest.raises(aiohttp.web.HTTPConflict):
+        await project.open()
+    assert project.status == "closed"
+    controller._computes["local"].post.assert_any_call("/projects/3c1be6f9-b4ba-4737-b209-63c47c23359f/close")
+    with open(str(tmpdir / "demo.gns3")) as f:
+        assert len(json.load(f)["topology"]["nodes"]) == 2
+
+
+async def test_open_link_failure_releases_udp_ports(controller, tmpdir, demo_topology):
+
+    demo_topology["topology"]["computes"] = []
+    with open(str(tmpdir / "demo.gns3"), "w+") as f:
+        json.dump(demo_topology, f)
+
+    controller._computes["local"] = _mock_compute("local")
+    controller._computes["vm"] = _mock_compute("vm")
+    # the link cannot be created, the UDP ports reserved for it are not used
+    controller._computes["local"].get_ip_on_same_subnet = AsyncioMagicMock(side_effect=ValueError("No common subnet"))
+
+    project = Project(name="demo",
+                      project_id="3c1be6f9-b4ba-4737-b209-63c47c23359f",
+                      path=str(tmpdir),
+                      controller=controller,
+                      filename="demo.gns3",
+                      status="closed")
+
+    with pytest.raises(aiohttp.web.HTTPConflict):
+        await project.open()
+    for compute_id in ("local", "vm"):
+        controller._computes[compute_id].post.assert_any_call("/projects/{}/ports/udp/release".format(project.id), {"udp_ports": [20000]})
+    assert project._udp_port_reservations == {}
+
+
+async def test_create_project_on_computes_in_parallel(controller, tmpdir):
+
+    project = Project(name="demo", path=str(tmpdir / "demo"), controller=controller)
+    local = _mock_compute("local")
+    vm = _mock_compute("vm")
+    local_creation = asyncio.Event()
+
+    async def post(path, *args, **kwargs):
+        # the project creation on the local compute waits for the one on the other compute
+        await local_creation.wait()
+        return MagicMock()
+    local.post = AsyncioMagicMock(side_effect=post)
+
+    task = asyncio.ensure_future(project._create_project_on_compute(local))
+    await asyncio.sleep(0)
+    await asyncio.wait_for(project._create_project_on_compute(vm), 1)
+    assert vm in project._project_created_on_compute
+    local_creation.set()
+    await task
+    assert local in project._project_created_on_compute
@@ -24,7 +24,7 @@ from tests.utils import asyncio_patch
 
 from gns3server.controller.project import Project
 from gns3server.controller.compute import Compute
-from gns3server.controller.topology import project_to_topology, load_topology, GNS3_FILE_FORMAT_REVISION
+from gns3server.controller.topology import project_to_topology, load_topology, load_topology_settings, _check_topology_schema, GNS3_FILE_FORMAT_REVISION
 from gns3server.version import __version__
 
 
@@ -108,6 +108,42 @@ async def test_project_to_topology(controller):
     assert topo["supplier"] == supplier
 
 
+def test_check_topology_schema_validated_cache():
+
+    drawing = {"drawing_id": str(uuid.uuid4()), "svg": "<svg></svg>", "x": 0, "y": 0, "z": 0, "rotation": 0, "locked": False}
+    topo = {
+        "project_id": "69f26504-7aa3-48aa-9f29-798d44841211",
+        "name": "Test",
+        "revision": GNS3_FILE_FORMAT_REVISION,
+        "topology": {
+            "nodes": [],
+            "links": [],
+            "computes": [],
+            "drawings": [drawing]
+        },
+        "type": "topology",
+        "version": __version__}
+
+    validated = {}
+    _check_topology_schema(topo, validated)
+    assert validated == {("drawings", drawing["drawing_id"]): drawing}
+
+    key = ("drawings", drawing["drawing_id"])
+    assert validated[key] is not drawing
+    previous = validated[key]
+
+    # unchanged elements are not validated nor copied again
+    with patch("gns3server.controller.topology.validate") as mock:
+        _check_topology_schema(topo, validated)
+        assert mock.call_count == 1
+    assert validated[key] is previous
+
+    drawing["x"] = "invalid"
+    with pytest.raises(aiohttp.web.HTTPConflict):
+        _check_topology_schema(topo, validated)
+    assert validated == {}
+
+
 def test_load_topology(tmpdir):
 
     data = {
@@ -130,6 +166,45 @@ def test_load_topology(tmpdir):
     assert topo == data
 
 
+def test_load_topology_settings(tmpdir):
+
+    data = {
+        "project_id": "69f26504-7aa3-48aa-9f29-798d44841211",
+        "name": "Test",
+        "auto_open": True,
+        "revision": GNS3_FILE_FORMAT_REVISION,
+        "topology": {
+            # the content of the topology is not validated
+            "nodes": [{"invalid": True}]
+        },
+        "variables": [{"name": "var1", "value": "1"}, {"name": ""}],
+        "type": "topology",
+        "version": __version__}
+
+    path = str(tmpdir / "test.gns3")
+    with open(path, "w+") as f:
+        json.dump(data, f)
+    settings = load_topology_settings(path)
+    assert settings == {
+        "project_id": "69f26504-7aa3-48aa-9f29-798d44841211",
+        "name": "Test",
+        "auto_open": True,
+        "variables": [{"name": "var1", "value": "1"}]
+    }
+
+
+def test_load_topology_settings_schema_error(tmpdir):
+
+    path = str(tmpdir / "test.gns3")
+    with open(path, "w+") as f:
+        json.dump({
+            "revision": GNS3_FILE_FORMAT_REVISION,
+            "name": "Test"
+        }, f)
+    with pytest.raises(aiohttp.web.HTTPConflict):
+        load_topology_settings(path)
+
+
 def test_load_topology_file_error(tmpdir):
 
     path = str(tmpdir / "test.gns3")
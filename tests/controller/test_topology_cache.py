@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import pytest
+
+from gns3server.controller.topology_cache import TopologyCache
+
+
+def write_topology(path, nodes):
+
+    with open(path, "w+") as f:
+        json.dump({"topology": {"nodes": [{"node_id": node_id, "name": node_id} for node_id in nodes], "links": []}}, f)
+    return os.path.getsize(path)
+
+
+@pytest.fixture
+def topology(tmpdir):
+
+    path = str(tmpdir / "test.gns3")
+    write_topology(path, ["n1", "n2"])
+    return path
+
+
+def test_get_section(topology):
+
+    cache = TopologyCache(max_size=1024 * 1024)
+    assert cache.get_section(topology, "nodes", "node_id") == {"n1": {"node_id": "n1", "name": "n1"}, "n2": {"node_id": "n2", "name": "n2"}}
+    assert cache.get_section(topology, "links", "link_id") == {}
+    assert cache.get_section(topology, "nodes", "node_id")["n1"]["name"] == "n1"
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+    assert stats["size"] == len('[{"node_id":"n1","name":"n1"},{"node_id":"n2","name":"n2"}]') + len('[]')
+
+
+def test_get_section_copy(topology):
+
+    cache = TopologyCache(max_size=1024 * 1024)
+    cache.get_section(topology, "nodes", "node_id").pop("n1")
+    cache.get_section(topology, "nodes", "node_id")["n2"]["name"] = "changed"
+    assert cache.get_section(topology, "nodes", "node_id") == {"n1": {"node_id": "n1", "name": "n1"}, "n2": {"node_id": "n2", "name": "n2"}}
+
+
+def test_get_section_modified(topology):
+
+    cache = TopologyCache(max_size=1024 * 1024)
+    cache.get_section(topology, "nodes", "node_id")
+    write_topology(topology, ["n3"])
+    assert list(cache.get_section(topology, "nodes", "node_id")) == ["n3"]
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["size"] == len('[{"node_id":"n3","name":"n3"}]') + len('[]')
+
+
+def test_get_section_missing(topology):
+
+    cache = TopologyCache(max_size=1024 * 1024)
+    with pytest.raises(KeyError):
+        cache.get_section(topology, "drawings", "drawing_id")
+    with pytest.raises(OSError):
+        cache.get_section(topology + ".missing", "nodes", "node_id")
+
+
+def test_eviction(tmpdir):
+
+    paths = [str(tmpdir / "test{}.gns3".format(i)) for i in range(3)]
+    for path in paths:
+        write_topology(path, ["n1"])
+    size = len('[{"node_id":"n1","name":"n1"}]') + len('[]')
+    cache = TopologyCache(max_size=size * 2)
+    for path in paths:
+        cache.get_section(path, "nodes", "node_id")
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+
+    # the least recently used file has been dropped
+    cache.get_section(paths[0], "nodes", "node_id")
+    assert cache.stats()["misses"] == 4
+
+
+def test_disabled(topology):
+
+    cache = TopologyCache(max_size=0)
+    cache.get_section(topology, "nodes", "node_id")
+    cache.get_section(topology, "nodes", "node_id")
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_max_size_config(config):
+
+    config.set_section_config("Server", {"closed_topology_cache_size": "2"})
+    assert TopologyCache().stats()["max_size"] == 2 * 1024 * 1024
@@ -159,6 +159,31 @@ async def test_create_one_side_failure(project):
     compute1.delete.assert_any_call("/projects/{}/vpcs/nodes/{}/adapters/0/ports/4/nio".format(project.id, node1.id), timeout=120)
 
 
+async def test_create_reserved_ports(project):
+
+    compute1 = MagicMock()
+    compute1.id = "compute1"
+    node1 = Node(project, compute1, "node1", node_type="vpcs")
+    node1._ports = [EthernetPort("E0", 0, 0, 4)]
+    node2 = Node(project, compute1, "node2", node_type="vpcs")
+    node2._ports = [EthernetPort("E0", 0, 0, 4)]
+    compute1.get_ip_on_same_subnet = AsyncioMagicMock(return_value=("127.0.0.1", "127.0.0.1"))
+
+    response = MagicMock()
+    response.json = {"udp_port": 1024, "udp_ports": [1024, 1025]}
+    compute1.post = AsyncioMagicMock(return_value=response)
+    await project.reserve_udp_ports(compute1, 2)
+    compute1.post.assert_called_with("/projects/{}/ports/udp?count=2".format(project.id))
+
+    compute1.post = AsyncioMagicMock()
+    link = UDPLink(project)
+    await link.add_node(node1, 0, 4)
+    await link.add_node(node2, 0, 4)
+    assert {link._node1_port, link._node2_port} == {1024, 1025}
+    for call in compute1.post.call_args_list:
+        assert "/ports/udp" not in call[0][0]
+
+
 async def test_delete(project):
 
     compute1 = MagicMock()
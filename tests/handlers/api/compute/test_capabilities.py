@@ -20,6 +20,7 @@ import sys
 import pytest
 
 from gns3server.version import __version__
+from gns3server.compute.binary_registry import BinaryRegistry
 
 
 @pytest.mark.skipif(sys.platform.startswith("win"), reason="Not supported on Windows")
@@ -36,3 +37,22 @@ async def test_get_on_gns3vm(compute_api, on_gns3vm):
     response = await compute_api.get('/capabilities')
     assert response.status == 200
     assert response.json == {'node_types': ['cloud', 'ethernet_hub', 'ethernet_switch', 'nat', 'vpcs', 'virtualbox', 'dynamips', 'frame_relay_switch', 'atm_switch', 'qemu', 'vmware', 'traceng', 'docker', 'iou'], 'version': __version__, 'platform': sys.platform}
+
+
+async def test_binaries_refresh(compute_api, tmpdir):
+
+    path = str(tmpdir / "qemu-system-x86_64")
+    open(path, "w+").close()
+
+    async def probe():
+        return "2.4.0"
+
+    await BinaryRegistry.instance().get("qemu_version", path, probe)
+    response = await compute_api.get('/capabilities/binaries')
+    assert response.status == 200
+    assert response.json == [{"path": path, "probe": "qemu_version", "value": "2.4.0"}]
+
+    response = await compute_api.post('/capabilities/binaries/refresh')
+    assert response.status == 204
+    response = await compute_api.get('/capabilities/binaries')
+    assert response.json == []
@@ -16,11 +16,14 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import pytest
+import asyncio
 import sys
 import os
 import stat
 from unittest.mock import patch
 
+from gns3server.compute.dynamips import Dynamips
+
 from tests.utils import asyncio_patch
 
 
@@ -163,6 +166,9 @@ def fake_file(tmpdir):
 async def test_images(compute_api, tmpdir, fake_image, fake_file):
 
     with patch("gns3server.utils.images.default_images_directory", return_value=str(tmpdir)):
+        await compute_api.get("/dynamips/images")
+        # the checksum is computed in the background
+        await asyncio.gather(*Dynamips.instance()._image_checksum_tasks)
         response = await compute_api.get("/dynamips/images")
     assert response.status == 200
     assert response.json == [{"filename": "7200.bin",
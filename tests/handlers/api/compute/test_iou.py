@@ -16,6 +16,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import pytest
+import asyncio
 import os
 import stat
 import sys
@@ -24,6 +25,8 @@ import uuid
 from tests.utils import asyncio_patch
 from unittest.mock import patch
 
+from gns3server.compute.iou import IOU
+
 pytestmark = pytest.mark.skipif(sys.platform.startswith("win"), reason="Not supported on Windows")
 
 
@@ -326,6 +329,11 @@ async def test_images(compute_api, fake_iou_bin):
 
     response = await compute_api.get("/iou/images")
     assert response.status == 200
+    assert response.json == [{"filename": "iou.bin", "path": "iou.bin", "filesize": 7, "md5sum": None}]
+
+    # the checksum is computed in the background
+    await asyncio.gather(*IOU.instance()._image_checksum_tasks)
+    response = await compute_api.get("/iou/images")
     assert response.json == [{"filename": "iou.bin", "path": "iou.bin", "filesize": 7, "md5sum": "e573e8f5c93c6c00783f20c7a170aa6c"}]
 
 
@@ -18,6 +18,8 @@
 import os
 import pytest
 
+from gns3server.compute.port_manager import PortManager
+
 
 async def test_udp_allocation(compute_api, compute_project):
 
@@ -26,6 +28,28 @@ async def test_udp_allocation(compute_api, compute_project):
     assert response.json['udp_port'] is not None
 
 
+async def test_udp_allocation_count(compute_api, compute_project):
+
+    response = await compute_api.post('/projects/{}/ports/udp?count=3'.format(compute_project.id), {})
+    assert response.status == 201
+    assert len(set(response.json['udp_ports'])) == 3
+    assert response.json['udp_port'] == response.json['udp_ports'][0]
+
+    response = await compute_api.post('/projects/{}/ports/udp?count=0'.format(compute_project.id), {})
+    assert response.status == 400
+
+
+async def test_udp_release(compute_api, compute_project):
+
+    response = await compute_api.post('/projects/{}/ports/udp?count=2'.format(compute_project.id), {})
+    udp_ports = response.json['udp_ports']
+    response = await compute_api.post('/projects/{}/ports/udp/release'.format(compute_project.id), {"udp_ports": udp_ports})
+    assert response.status == 204
+    for port in udp_ports:
+        assert port not in compute_project._used_udp_ports
+        assert port not in PortManager.instance()._used_udp_ports
+
+
 # Netfifaces is not available on Travis
 @pytest.mark.skipif(os.environ.get("TRAVIS", False) is not False, reason="Not supported on Travis")
 async def test_interfaces(compute_api):
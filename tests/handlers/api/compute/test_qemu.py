@@ -16,6 +16,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import pytest
+import asyncio
 import uuid
 import os
 import sys
@@ -23,6 +24,9 @@ import stat
 from tests.utils import asyncio_patch
 from unittest.mock import patch
 
+from gns3server.compute.qemu import Qemu
+from gns3server.utils.images import image_index
+
 
 @pytest.fixture
 def fake_qemu_bin(monkeypatch, tmpdir):
@@ -279,6 +283,11 @@ async def test_images(compute_api, fake_qemu_vm):
 
     response = await compute_api.get("/qemu/images")
     assert response.status == 200
+    assert {"filename": "linux载.img", "path": "linux载.img", "md5sum": None, "filesize": 7} in response.json
+
+    # the checksum is computed in the background
+    await asyncio.gather(*Qemu.instance()._image_checksum_tasks)
+    response = await compute_api.get("/qemu/images")
     assert {"filename": "linux载.img", "path": "linux载.img", "md5sum": "fcea920f7412b5da7be0cf42b8c93759", "filesize": 7} in response.json
 
 
@@ -297,6 +306,20 @@ async def test_upload_image(compute_api, tmpdir):
         assert checksum == "033bd94b1168d7e4f0d644c3c95e35bf"
 
 
+async def test_upload_image_checksums(compute_api, tmpdir, config):
+
+    config.set_section_config("Server", {"image_chunk_size": 4096, "image_sha256": True})
+    with patch("gns3server.compute.Qemu.get_images_directory", return_value=str(tmpdir)):
+        with patch("gns3server.compute.base_manager.md5sum") as mock:
+            response = await compute_api.post("/qemu/images/test2", body="TEST", raw=True)
+            assert response.status == 204
+            assert not mock.called
+
+    entry = image_index(str(tmpdir)).get("test2", os.stat(str(tmpdir / "test2")))
+    assert entry["md5sum"] == "033bd94b1168d7e4f0d644c3c95e35bf"
+    assert entry["sha256"] == "94ee059335e587e501cc4bf90613e0814f00a7b08bc7c648fd865a2af6a22cc2"
+
+
 async def test_upload_image_ova(compute_api, tmpdir):
 
     with patch("gns3server.compute.Qemu.get_images_directory", return_value=str(tmpdir)):
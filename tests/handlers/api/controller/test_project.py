@@ -191,9 +191,9 @@ async def test_notification(controller_api, http_client, project, controller):
         controller.notification.project_emit("node.created", {"a": "b"})
         response.body += await response.content.readany()
         assert response.status == 200
-        assert b'"action": "ping"' in response.body
+        assert b'"action":"ping"' in response.body
         assert b'"cpu_usage_percent"' in response.body
-        assert b'{"action": "node.created", "event": {"a": "b"}}\n' in response.body
+        assert b'{"action":"node.created","event":{"a":"b"}}\n' in response.body
         assert project.status == "opened"
         controller.notification.project_emit("node.updated", {"a": "b"})
         controller.notification.project_emit("node.deleted", {"a": "b"})
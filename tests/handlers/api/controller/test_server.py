@@ -60,6 +60,8 @@ async def test_debug(controller_api, config, tmpdir):
     debug_dir = os.path.join(config.config_dir, "debug")
     assert os.path.exists(debug_dir)
     assert os.path.exists(os.path.join(debug_dir, "controller.txt"))
+    with open(os.path.join(debug_dir, "controller.txt")) as f:
+        assert "Closed project topology cache" in f.read()
 
 
 async def test_debug_non_local(controller_api, config, tmpdir):
@@ -56,3 +56,16 @@ async def test_version_invalid_json(controller_api):
     params = "BOUM"
     response = await controller_api.post('/version', params, raw=True)
     assert response.status == 400
+
+
+async def test_version_pretty_output(controller_api):
+
+    response = await controller_api.get('/version')
+    assert b"\n" not in response.body
+
+    response = await controller_api.post('/version?pretty=1', {'version': __version__})
+    assert response.status == 200
+    assert response.body == '{{\n    "version": "{}"\n}}'.format(__version__).encode()
+
+    response = await controller_api.get('/version', headers={"Accept": "application/json; pretty=1"})
+    assert response.body.startswith(b"{\n    ")
@@ -16,12 +16,14 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
+import pytest
 
 from unittest.mock import patch
 
 from gns3server.version import __version__
 from gns3server.controller import Controller
 from gns3server.utils.get_resource import get_resource
+from gns3server.web.static_files import StaticFiles
 
 
 def get_static(filename):
@@ -82,3 +84,72 @@ async def test_v1(http_client):
 
     response = await http_client.get('/v1/version')
     assert response.status == 200
+
+
+@pytest.fixture
+def web_ui(tmpdir):
+
+    tmpdir.join("main.d74d38241f0602d1b3e0.js").write("var a = 1;\n" * 1000)
+    tmpdir.join("index.html").write("<html></html>")
+    static_files = StaticFiles(str(tmpdir))
+    with patch("gns3server.web.static_files.StaticFiles._instance", static_files, create=True):
+        yield static_files
+
+
+async def test_web_ui_sendfile(http_client, web_ui):
+
+    response = await http_client.get('/static/web-ui/main.d74d38241f0602d1b3e0.js', headers={"Accept-Encoding": "gzip"})
+    assert response.status == 200
+    assert response.headers["Content-Type"] == "application/javascript"
+    assert response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["ETag"] == web_ui.get("main.d74d38241f0602d1b3e0.js").etag
+    assert "X-Route" in response.headers
+    assert await response.read() == b"var a = 1;\n" * 1000
+
+    response = await http_client.get('/static/web-ui/main.d74d38241f0602d1b3e0.js', headers={"Range": "bytes=0-10"})
+    assert response.status == 206
+    assert await response.read() == b"var a = 1;\n"
+
+
+async def test_web_ui_compressed(http_client, web_ui):
+
+    await web_ui.precompress()
+    response = await http_client.get('/static/web-ui/main.d74d38241f0602d1b3e0.js', headers={"Accept-Encoding": "gzip"})
+    assert response.status == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["ETag"].endswith('-gzip"')
+    assert await response.read() == b"var a = 1;\n" * 1000
+
+    response = await http_client.get('/static/web-ui/main.d74d38241f0602d1b3e0.js', headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert await response.read() == b"var a = 1;\n" * 1000
+
+
+async def test_web_ui_not_modified(http_client, web_ui):
+
+    response = await http_client.get('/static/web-ui/index.html')
+    assert response.status == 200
+    assert response.headers["Cache-Control"] == "no-cache"
+    etag = response.headers["ETag"]
+
+    response = await http_client.get('/static/web-ui/index.html', headers={"If-None-Match": etag})
+    assert response.status == 304
+    assert await response.read() == b""
+
+    response = await http_client.get('/static/web-ui/index.html', headers={"If-None-Match": '"other"'})
+    assert response.status == 200
+
+
+async def test_web_ui_fallback_index(http_client, web_ui):
+
+    response = await http_client.get('/static/web-ui/bundled')
+    assert response.status == 200
+    assert await response.read() == b"<html></html>"
+
+
+async def test_web_ui_forbidden(http_client, web_ui):
+
+    response = await http_client.get('/static/web-ui/..%2F..%2Fsetup.py')
+    assert response.status == 403
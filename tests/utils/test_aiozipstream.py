@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import os
+import pytest
+import zipfile
+
+from gns3server.utils.asyncio import aiozipstream
+
+
+async def _build_archive(tmpdir, **kwargs):
+
+    for i in range(5):
+        with open(str(tmpdir / "file{}".format(i)), "wb") as f:
+            f.write(os.urandom(1024) * (i + 1) * 10)
+    os.makedirs(str(tmpdir / "dir"))
+
+    data = b""
+    with aiozipstream.ZipFile(**kwargs) as z:
+        for i in range(5):
+            z.write(str(tmpdir / "file{}".format(i)), arcname="file{}".format(i))
+        z.write(str(tmpdir / "dir"), arcname="dir")
+        z.writestr("project.gns3", b"{}")
+        async for chunk in z:
+            data += chunk
+    return data
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+@pytest.mark.parametrize("parallel", [1, 3])
+async def test_zip_file(tmpdir, compression, parallel):
+
+    data = await _build_archive(tmpdir, compression=compression, chunksize=4096, parallel=parallel)
+    with zipfile.ZipFile(io.BytesIO(data)) as myzip:
+        assert myzip.testzip() is None
+        assert myzip.namelist() == ["file0", "file1", "file2", "file3", "file4", "dir/", "project.gns3"]
+        for i in range(5):
+            with open(str(tmpdir / "file{}".format(i)), "rb") as f:
+                assert myzip.read("file{}".format(i)) == f.read()
+        assert myzip.read("project.gns3") == b"{}"
+
+
+async def test_zip_file_executor(tmpdir):
+
+    await _build_archive(tmpdir, compression=zipfile.ZIP_DEFLATED, chunksize=1024)
+    executor = aiozipstream._get_executor()
+    assert executor is aiozipstream._get_executor()
+    assert len(executor._threads) <= executor._max_workers
+
+
+async def test_zip_file_parallel_missing_file(tmpdir):
+
+    with aiozipstream.ZipFile(parallel=2) as z:
+        z.writestr("a", b"a")
+        z.write(str(tmpdir / "missing"), arcname="missing")
+        with pytest.raises(OSError):
+            async for _ in z:
+                pass
+
+
+def _reader(data):
+
+    stream = io.BytesIO(data)
+
+    async def read(size):
+        return stream.read(min(size, 1000))
+
+    return aiozipstream.ZipStreamReader(read, chunksize=1024)
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED, zipfile.ZIP_BZIP2, zipfile.ZIP_LZMA])
+async def test_zip_stream_reader(tmpdir, compression):
+
+    data = await _build_archive(tmpdir, compression=compression, chunksize=4096)
+    reader = _reader(data)
+    members = {}
+    async for zinfo, member_data in reader:
+        members[zinfo.filename] = b"".join([chunk async for chunk in member_data])
+
+    assert list(members.keys()) == ["file0", "file1", "file2", "file3", "file4", "dir/", "project.gns3"]
+    for i in range(5):
+        with open(str(tmpdir / "file{}".format(i)), "rb") as f:
+            assert members["file{}".format(i)] == f.read()
+    assert members["project.gns3"] == b"{}"
+    assert list(reader.external_attrs.keys()) == list(members.keys())
+    assert reader.bytes_read == len(data)
+
+
+async def test_zip_stream_reader_data_descriptor_signature_in_data():
+
+    # the size of a stored member is found by searching the data descriptor signature
+    content = aiozipstream.stringDataDescriptor * 1000 + b"\0" * 5000
+    with aiozipstream.ZipFile(compression=zipfile.ZIP_STORED) as z:
+        z.writestr("a", content)
+        z.writestr("b", b"b")
+        data = b"".join([chunk async for chunk in z])
+
+    members = {}
+    async for zinfo, member_data in _reader(data):
+        members[zinfo.filename] = b"".join([chunk async for chunk in member_data])
+    assert members == {"a": content, "b": b"b"}
+
+
+async def test_zip_stream_reader_skip_member_data():
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        z.writestr("a", os.urandom(10000))
+        z.writestr("b", b"b")
+
+    names = []
+    async for zinfo, member_data in _reader(buffer.getvalue()):
+        names.append(zinfo.filename)
+    assert names == ["a", "b"]
+
+
+async def test_zip_stream_reader_bad_crc():
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as z:
+        z.writestr("a", b"hello")
+    data = buffer.getvalue().replace(b"hello", b"world")
+
+    with pytest.raises(zipfile.BadZipFile):
+        async for zinfo, member_data in _reader(data):
+            async for _ in member_data:
+                pass
+
+
+async def test_zip_stream_reader_invalid_zip():
+
+    with pytest.raises(zipfile.BadZipFile):
+        async for _ in _reader(b"not a zip file"):
+            pass
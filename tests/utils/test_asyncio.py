@@ -22,6 +22,7 @@ import sys
 from unittest.mock import MagicMock
 
 from gns3server.utils.asyncio import wait_run_in_executor, subprocess_check_output, wait_for_process_termination, locking
+from gns3server.utils.asyncio.pool import KeyPool
 from tests.utils import AsyncioMagicMock
 
 
@@ -72,3 +73,41 @@ async def test_lock_decorator():
     i = TestLock()
     res = set(await asyncio.gather(i.method_to_lock(), i.method_to_lock()))
     assert res == set((0, 1,))  # We use a set to test this to avoid order issue
+
+
+async def test_key_pool():
+
+    running = {"a": 0, "b": 0}
+    maximum = {"a": 0, "b": 0}
+
+    async def task(keys):
+        for key in keys:
+            running[key] += 1
+            maximum[key] = max(maximum[key], running[key])
+        await asyncio.sleep(0.01)
+        for key in keys:
+            running[key] -= 1
+
+    pool = KeyPool(concurrency=lambda key: {"a": 2, "b": 1}[key])
+    for i in range(5):
+        pool.append(["a"], task, ["a"])
+        pool.append(["a", "b"], task, ["a", "b"])
+    await pool.join()
+    assert maximum == {"a": 2, "b": 1}
+
+
+async def test_key_pool_exception():
+
+    done = []
+
+    async def task(value):
+        if value == 2:
+            raise ValueError("test")
+        done.append(value)
+
+    pool = KeyPool(concurrency=lambda key: 1)
+    for i in range(5):
+        pool.append(["a"], task, i)
+    with pytest.raises(ValueError):
+        await pool.join()
+    assert done == [0, 1, 3, 4]
@@ -15,12 +15,14 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import sys
 import pytest
 import asyncio
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 
-from gns3server.utils.file_watcher import FileWatcher
+from gns3server.utils.file_watcher import FileWatcher, FileWatcherService, _hash_file
 
 
 @pytest.mark.parametrize("strategy", ['mtime', 'hash'])
@@ -63,3 +65,40 @@ async def test_file_watcher_list(tmpdir, strategy):
     file2.write("b")
     await asyncio.sleep(0.5)
     callback.assert_called_with(str(file2))
+
+
+async def test_file_watcher_service(tmpdir):
+
+    file = tmpdir / "test"
+    file.write("a")
+    callback = MagicMock()
+    watcher = FileWatcher(file, callback, delay=0.1)
+    watcher2 = FileWatcher([file, tmpdir / "test2"], callback, delay=0.1, strategy="hash")
+    stats = FileWatcherService.instance().stats()
+    assert stats["watchers"] == 2
+    assert stats["watched_paths"] == 2
+    if sys.platform.startswith("linux"):
+        assert stats["backend"] == "inotify"
+        assert stats["polled_watchers"] == 1
+    watcher.close()
+    watcher2.close()
+    assert FileWatcherService.instance().stats()["watchers"] == 0
+    assert FileWatcherService.instance().stats()["inotify_directories"] == 0
+
+
+async def test_file_watcher_hash_same_content(tmpdir):
+
+    file = tmpdir / "test"
+    file.write("a")
+    callback = MagicMock()
+    with patch("gns3server.utils.file_watcher._hash_file", wraps=_hash_file) as mock:
+        watcher = FileWatcher(file, callback, delay=0.1, strategy="hash")
+        await asyncio.sleep(0.3)
+        # the file is hashed only once when its modification time doesn't change
+        assert mock.call_count == 1
+        file.write("a")
+        os.utime(str(file), ns=(0, 0))
+        await asyncio.sleep(0.3)
+        assert mock.call_count == 2
+    watcher.close()
+    assert not callback.called
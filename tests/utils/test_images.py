@@ -22,7 +22,7 @@ from unittest.mock import patch
 
 
 from gns3server.utils import force_unix_path
-from gns3server.utils.images import md5sum, remove_checksum, images_directories, list_images
+from gns3server.utils.images import md5sum, remove_checksum, images_directories, list_images, image_index, IMAGE_INDEX_FILENAME
 
 
 def test_images_directories(tmpdir):
@@ -202,3 +202,74 @@ def test_list_images(tmpdir):
                 'path': 'qemu_image.qcow2'
             }
         ]
+
+
+def test_md5sum_index(tmpdir):
+
+    fake_img = str(tmpdir / 'hello')
+    with open(fake_img, 'w+') as f:
+        f.write('hello')
+
+    assert md5sum(fake_img) == '5d41402abc4b2a76b9719d911017c592'
+    assert os.path.exists(str(tmpdir / IMAGE_INDEX_FILENAME))
+
+    # the index is used even if the .md5sum file is lost
+    os.remove(str(tmpdir / 'hello.md5sum'))
+    with patch("hashlib.md5") as mock:
+        assert md5sum(fake_img) == '5d41402abc4b2a76b9719d911017c592'
+        assert not mock.called
+
+    # a stale .md5sum file is ignored when the image has changed
+    with open(fake_img, 'w+') as f:
+        f.write('hello world')
+    with open(str(tmpdir / 'hello.md5sum'), 'w+') as f:
+        f.write('5d41402abc4b2a76b9719d911017c592')
+    os.utime(fake_img, ns=(0, 0))
+    assert md5sum(fake_img) == '5eb63bbbe01eeed093cb22bb8f5acdc3'
+
+    remove_checksum(fake_img)
+    assert image_index(str(tmpdir)).get('hello', os.stat(fake_img)) is None
+
+
+def test_list_images_index(tmpdir):
+
+    qemu_image = tmpdir / "images1" / "QEMU" / "qemu_image.qcow2"
+    qemu_image.write("1234567", ensure=True)
+
+    with patch("gns3server.config.Config.get_section_config", return_value={
+            "images_path": str(tmpdir / "images1"),
+            "local": False}):
+
+        assert list_images("qemu")[0]["md5sum"] == "fcea920f7412b5da7be0cf42b8c93759"
+        os.remove(str(qemu_image) + ".md5sum")
+
+        # unchanged images are not opened again
+        with patch("builtins.open") as mock:
+            assert list_images("qemu")[0]["md5sum"] == "fcea920f7412b5da7be0cf42b8c93759"
+            assert not mock.called
+
+        qemu_image.write("7654321")
+        os.utime(str(qemu_image), ns=(0, 0))
+        assert list_images("qemu")[0]["md5sum"] == "f0898af949a373e72a4f6a34b4de9090"
+
+
+def test_list_images_import_md5sum_files(tmpdir):
+
+    qemu_image = tmpdir / "images1" / "QEMU" / "qemu_image.qcow2"
+    qemu_image.write("1234567", ensure=True)
+    (tmpdir / "images1" / "QEMU" / "qemu_image.qcow2.md5sum").write("fcea920f7412b5da7be0cf42b8c93759")
+
+    with patch("gns3server.config.Config.get_section_config", return_value={
+            "images_path": str(tmpdir / "images1"),
+            "local": False}):
+
+        # the images listed by a previous version are not read again
+        with patch("hashlib.md5") as mock:
+            unknown_images = []
+            assert list_images("qemu", unknown_images=unknown_images)[0]["md5sum"] == "fcea920f7412b5da7be0cf42b8c93759"
+            assert unknown_images == []
+            assert list_images("qemu")[0]["md5sum"] == "fcea920f7412b5da7be0cf42b8c93759"
+            assert not mock.called
+
+        index = image_index(str(tmpdir / "images1" / "QEMU"))
+        assert index.get("qemu_image.qcow2", os.stat(str(qemu_image)))["md5sum"] == "fcea920f7412b5da7be0cf42b8c93759"
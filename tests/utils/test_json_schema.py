@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+import jsonschema
+
+from gns3server.schemas.qemu import QEMU_CREATE_SCHEMA
+from gns3server.utils.json_schema import get_validator, validate, SchemaValidator
+
+
+def test_get_validator():
+
+    validator = get_validator(QEMU_CREATE_SCHEMA)
+    assert get_validator(QEMU_CREATE_SCHEMA) is validator
+    assert validator.schema is QEMU_CREATE_SCHEMA
+
+
+@pytest.mark.parametrize("instance", [
+    {"name": "test", "ram": 256},
+    {"name": "test", "ram": "256"},
+    {"ram": 256},
+    {"name": "test", "unknown": True},
+    {"name": "test", "console_type": "invalid"},
+])
+def test_validate_same_errors_as_jsonschema(instance):
+
+    try:
+        jsonschema.validate(instance, QEMU_CREATE_SCHEMA)
+        expected = None
+    except jsonschema.ValidationError as e:
+        expected = e.message
+
+    try:
+        validate(instance, QEMU_CREATE_SCHEMA)
+        message = None
+    except jsonschema.ValidationError as e:
+        message = e.message
+    assert message == expected
+
+
+def test_invalid_schema():
+
+    with pytest.raises(jsonschema.SchemaError):
+        get_validator({"type": "invalid"})
+
+
+def test_fast_validation(config):
+
+    pytest.importorskip("fastjsonschema")
+    config.set_section_config("Server", {"fast_schema_validation": True})
+    schema = {
+        "type": "object",
+        "properties": {"name": {"type": "string"}, "ram": {"type": "integer", "default": 256}},
+        "additionalProperties": False
+    }
+    validator = SchemaValidator(schema)
+    instance = {"name": "test"}
+    validator.validate(instance)
+    assert validator._fast_validator() is not None
+    # the default values are not added to the data
+    assert instance == {"name": "test"}
+    with pytest.raises(jsonschema.ValidationError):
+        validator.validate({"name": "test", "ram": "256"})
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import pytest
+
+from unittest.mock import patch, MagicMock
+
+from gns3server.utils.json_serializer import dumps, pretty_requested
+
+
+@pytest.mark.parametrize("orjson", [True, False])
+def test_dumps(orjson):
+
+    if orjson:
+        pytest.importorskip("orjson")
+    data = {"name": "R1", "properties": {"ram": 256, "slots": [None, "PA-FE-TX"]}, "ratio": 0.5, "running": True}
+    with patch("gns3server.utils.json_serializer.ORJSON_AVAILABLE", orjson):
+        assert dumps(data) == b'{"name":"R1","properties":{"ram":256,"slots":[null,"PA-FE-TX"]},"ratio":0.5,"running":true}'
+        # integer keys are not supported by orjson
+        assert dumps({1: "a"}) == b'{"1":"a"}'
+
+
+def test_dumps_pretty():
+
+    data = {"b": 1, "a": [1, 2]}
+    assert dumps(data, pretty=True) == json.dumps(data, indent=4, sort_keys=True).encode()
+
+
+@pytest.mark.parametrize("query,accept,pretty", [
+    ({}, None, False),
+    ({"pretty": "1"}, None, True),
+    ({"pretty": "true"}, None, True),
+    ({"pretty": "0"}, "application/json; pretty=1", False),
+    ({}, "application/json; pretty=1", True),
+    ({}, "text/html, application/json; q=0.9; pretty=\"true\"", True),
+    ({}, "application/json", False),
+])
+def test_pretty_requested(query, accept, pretty):
+
+    request = MagicMock()
+    request.query = query
+    request.headers = {"Accept": accept} if accept else {}
+    assert pretty_requested(request) is pretty
+    assert pretty_requested(None) is False
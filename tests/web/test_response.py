@@ -18,7 +18,7 @@
 import pytest
 
 from tests.utils import AsyncioMagicMock
-from aiohttp.web import HTTPNotFound
+from aiohttp.web import HTTPNotFound, HTTPBadRequest
 
 from gns3server.web.response import Response
 
@@ -44,3 +44,40 @@ async def test_response_file_not_found(tmpdir, response):
     filename = str(tmpdir / 'hello-not-found')
     with pytest.raises(HTTPNotFound):
         await response.stream_file(filename)
+
+
+def test_response_keep_alive(config):
+
+    request = AsyncioMagicMock()
+    request.headers = {"User-Agent": "Python/3.11 aiohttp/3.13.5"}
+    assert Response(request=request).keep_alive is None
+
+
+def test_response_close_legacy_user_agent(config):
+
+    config.set_section_config("Server", {"close_connection_user_agents": "GNS3 QT Client"})
+    request = AsyncioMagicMock()
+    request.headers = {"User-Agent": "GNS3 QT Client v1.5.0"}
+    assert Response(request=request).keep_alive is False
+    request.headers = {"User-Agent": "Python/3.11 aiohttp/3.13.5"}
+    assert Response(request=request).keep_alive is None
+
+
+def test_response_keep_alive_disabled(config):
+
+    config.set_section_config("Server", {"keep_alive": False})
+    request = AsyncioMagicMock()
+    request.headers = {}
+    assert Response(request=request).keep_alive is False
+
+
+def test_response_output_validation(config):
+
+    schema = {"type": "object", "properties": {"name": {"type": "string"}}}
+    response = Response(request=AsyncioMagicMock(), output_schema=schema)
+    with pytest.raises(HTTPBadRequest):
+        response.json({"name": 1})
+
+    config.set_section_config("Server", {"output_validation_rate": 0})
+    response.json({"name": 1})
+    assert response.body == b'{"name":1}'
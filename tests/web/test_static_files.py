@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 GNS3 Technologies Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import gzip
+import pytest
+
+from unittest.mock import patch
+
+from gns3server.web.static_files import StaticFiles, accepted_encodings, IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
+
+
+@pytest.fixture
+def static_files(tmpdir):
+
+    tmpdir.join("main.d74d38241f0602d1b3e0.js").write("var a = 1;\n" * 1000)
+    tmpdir.join("index.html").write("<html></html>")
+    tmpdir.join("logo.png").write_binary(os.urandom(4096))
+    return StaticFiles(str(tmpdir))
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, encodings",
+    (
+        (None, set()),
+        ("", set()),
+        ("gzip", {"gzip"}),
+        ("gzip, deflate, br", {"gzip", "deflate", "br"}),
+        ("br;q=1.0, gzip;q=0.8, *;q=0.1", {"br", "gzip", "*"}),
+        ("gzip;q=0, br", {"br"}),
+        ("gzip;q=invalid", set()),
+    )
+)
+def test_accepted_encodings(accept_encoding, encodings):
+
+    assert accepted_encodings(accept_encoding) == encodings
+
+
+def test_get(static_files):
+
+    static_file = static_files.get("main.d74d38241f0602d1b3e0.js")
+    assert static_file.content_type == "application/javascript"
+    assert static_file.size == 11000
+    assert static_file.immutable
+    assert static_file.cache_control == IMMUTABLE_CACHE_CONTROL
+    assert static_file.compressible
+    assert static_files.get("main.d74d38241f0602d1b3e0.js") is static_file
+
+    index = static_files.get("index.html")
+    assert index.content_type == "text/html"
+    assert not index.immutable
+    assert index.cache_control == REVALIDATE_CACHE_CONTROL
+    # too small to be compressed
+    assert not index.compressible
+
+    assert not static_files.get("logo.png").compressible
+    assert static_files.get("not-found.js") is None
+    assert static_files.get(".") is None
+
+
+def test_get_modified(static_files, tmpdir):
+
+    static_file = static_files.get("index.html")
+    tmpdir.join("index.html").write("<html><body></body></html>")
+    modified = static_files.get("index.html")
+    assert modified is not static_file
+    assert modified.etag != static_file.etag
+
+
+def test_compress(static_files):
+
+    static_file = static_files.get("main.d74d38241f0602d1b3e0.js")
+    static_file.compress()
+    assert gzip.decompress(static_file.variants["gzip"]) == b"var a = 1;\n" * 1000
+    assert static_file.variant("gzip, deflate") == ("gzip", static_file.variants["gzip"])
+    assert static_file.variant("deflate") == (None, None)
+    assert static_file.variant_etag("gzip") == static_file.etag[:-1] + '-gzip"'
+    assert static_file.variant_etag(None) == static_file.etag
+
+
+def test_compress_without_brotli(static_files):
+
+    with patch("gns3server.web.static_files.BROTLI_AVAILABLE", False):
+        static_file = static_files.get("main.d74d38241f0602d1b3e0.js")
+        static_file.compress()
+    assert list(static_file.variants) == ["gzip"]
+    assert static_file.variant("br") == (None, None)
+
+
+def test_compress_precompressed(static_files, tmpdir):
+
+    # variants created at install time are used as is
+    tmpdir.join("main.d74d38241f0602d1b3e0.js.gz").write_binary(b"precompressed")
+    static_file = static_files.get("main.d74d38241f0602d1b3e0.js")
+    static_file.compress()
+    assert static_file.variants["gzip"] == b"precompressed"
+
+
+async def test_precompress(static_files):
+
+    await static_files.precompress()
+    assert "gzip" in static_files.get("main.d74d38241f0602d1b3e0.js").variants
+    assert static_files.get("logo.png").variants == {}
+
+
+async def test_precompress_no_root():
+
+    static_files = StaticFiles(None)
+    await static_files.precompress()
+    assert static_files.get("index.html") is None